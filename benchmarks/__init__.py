@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+Performance benchmarks of py-trello, run with ``python -m benchmarks``.
+See benchmarks/runner.py for the options.
+"""
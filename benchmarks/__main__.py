@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import sys
+
+from benchmarks.runner import main
+
+sys.exit(main())
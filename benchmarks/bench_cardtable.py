@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar card table: building it from the json of a synthetic board, to
+compare with models.card_from_json, and aggregating it. Skipped when
+NumPy is not installed.
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+try:
+    from trello.cardtable import CardTable
+except ImportError:  # numpy is not installed
+    CardTable = None
+
+from benchmarks.fixtures import card_jsons, synthetic_board
+from benchmarks.runner import benchmark
+
+
+def _custom_fields(size):
+    server, board_id = synthetic_board(size)
+    return server.handle('GET', 'boards/%s/customFields' % board_id, {}).json()
+
+
+def cardtable_from_json(size):
+    jsons = card_jsons(size)
+    custom_fields = _custom_fields(size)
+    return lambda: CardTable.from_json(jsons, custom_fields)
+
+
+def cardtable_group_by(size):
+    table = CardTable.from_json(card_jsons(size), _custom_fields(size))
+    field = sorted(table.fields)[0]
+
+    def aggregate():
+        open_cards = table.filter(~table.closed)
+        open_cards.group_by('list').count()
+        open_cards.group_by('label').mean(field)
+        open_cards.group_by('member').percentile('last_activity', 50)
+        table.sort(['list', 'pos'])
+    return aggregate
+
+
+if CardTable is not None:
+    benchmark('cardtable.from_json')(cardtable_from_json)
+    benchmark('cardtable.group_by')(cardtable_group_by)
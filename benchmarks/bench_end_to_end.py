@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Loading a whole synthetic board through a TrelloClient served by the
+in-memory fake server. The time includes the fake server answering.
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+from benchmarks.fixtures import fake_client
+from benchmarks.runner import benchmark
+
+
+@benchmark('end_to_end.all_cards')
+def all_cards(size):
+    client, board_id = fake_client(size)
+    board = client.get_board(board_id)
+    return board.all_cards
+
+
+@benchmark('end_to_end.board_load')
+def board_load(size):
+    client, board_id = fake_client(size)
+
+    def run():
+        board = client.get_board(board_id)
+        board.list_lists()
+        board.get_labels(limit=1000)
+        board.get_custom_field_definitions()
+        board.all_cards(prefetch=['checklists', 'members'])
+    return run
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Time of ``import trello`` and of importing the client, in a new
+interpreter each time, so that a module imported again at package import
+shows up as a regression. Their memory is not measured, as tracemalloc
+only sees this process.
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+import os
+import subprocess
+import sys
+
+from benchmarks.runner import benchmark
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _python(code):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([_ROOT] + [path for path in [env.get('PYTHONPATH')] if path])
+    return lambda: subprocess.check_call([sys.executable, '-c', code], env=env)
+
+
+@benchmark('import.python', sized=False, memory=False)
+def import_python():
+    # The start of the interpreter alone, to subtract from the others
+    return _python('pass')
+
+
+@benchmark('import.trello', sized=False, memory=False)
+def import_trello():
+    return _python('import trello')
+
+
+@benchmark('import.trelloclient', sized=False, memory=False)
+def import_trelloclient():
+    return _python('from trello import TrelloClient')
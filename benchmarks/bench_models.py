@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Deserialization of cards, custom fields and checklists, from the json of a
+synthetic board.
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+from trello import Card, Checklist
+from trello.customfield import CustomField
+
+from benchmarks.fixtures import card_jsons, offline_board
+from benchmarks.runner import benchmark
+
+
+@benchmark('models.card_from_json')
+def card_from_json(size):
+    board = offline_board(size)
+    jsons = card_jsons(size)
+    return lambda: [Card.from_json(board, json_obj) for json_obj in jsons]
+
+
+@benchmark('models.custom_field_from_json_list')
+def custom_field_from_json_list(size):
+    board = offline_board(size)
+    cards = [(Card(board, json_obj['id']), json_obj['customFieldItems']) for json_obj in card_jsons(size)]
+    return lambda: [CustomField.from_json_list(card, items) for card, items in cards]
+
+
+@benchmark('models.checklist_init')
+def checklist_init(size):
+    client = offline_board(size).client
+    jsons = card_jsons(size)
+    return lambda: [Checklist(client, json_obj['checkItemStates'], checklist, trello_card=json_obj['id'])
+                    for json_obj in jsons for checklist in json_obj['checklists']]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+Building cards with worker processes, to compare with models.card_from_json
+which builds them in one process.
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+from concurrent.futures import ProcessPoolExecutor
+
+from trello.parallel import cards_from_json
+
+from benchmarks.fixtures import card_jsons, offline_board
+from benchmarks.runner import benchmark
+
+PROCESSES = 4
+
+_executors = {}
+
+
+def _executor():
+    # Started once, so the benchmark does not measure the start of the processes
+    if PROCESSES not in _executors:
+        _executors[PROCESSES] = ProcessPoolExecutor(max_workers=PROCESSES)
+    return _executors[PROCESSES]
+
+
+@benchmark('parallel.cards_from_json')
+def parallel_cards_from_json(size):
+    board = offline_board(size)
+    jsons = card_jsons(size)
+    executor = _executor()
+    return lambda: cards_from_json(board, jsons, processes=executor)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+Overhead of the client on the request path (building the request and
+handling the response), with an http_service answering immediately. The
+size is the number of requests.
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+from trello import TrelloClient
+
+from benchmarks.fixtures import StubHTTPService
+from benchmarks.runner import benchmark
+
+
+@benchmark('requests.fetch_json')
+def fetch_json(size):
+    client = TrelloClient('key', token='token', http_service=StubHTTPService({'id': 'x'}))
+
+    def run():
+        for i in range(size):
+            client.fetch_json('/cards/%d' % i, query_params={'fields': 'all'})
+    return run
+
+
+@benchmark('requests.fetch_json_post')
+def fetch_json_post(size):
+    client = TrelloClient('key', token='token', http_service=StubHTTPService({'id': 'x'}))
+
+    def run():
+        for i in range(size):
+            client.fetch_json('/cards', http_method='POST',
+                              post_args={'name': 'Card %d' % i, 'idList': 'list', 'desc': ''})
+    return run
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic fixtures shared by the benchmarks. Boards are generated by
+trello.fakeserver and cached by size, so each size is only built once per
+run.
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+import json
+
+from trello import TrelloClient
+from trello.fakeserver import FakeTrello, FakeResponse
+
+CARD_QUERY = {'filter': 'all', 'fields': 'all', 'customFieldItems': 'true', 'checklists': 'all'}
+
+_servers = {}
+_card_jsons = {}
+
+
+def synthetic_board(cards):
+    """
+    Fake server holding a board of the given number of cards, with 10
+    lists, 10 labels, 4 custom fields and a checklist of 5 items per card.
+
+    :return: (server, board id)
+    """
+    if cards not in _servers:
+        server = FakeTrello()
+        board_id = server.add_synthetic_board(
+            'Benchmark %d' % cards, lists=10, cards=cards, labels=10, custom_fields=4,
+            checklists=1, check_items=5, members=5)
+        _servers[cards] = (server, board_id)
+    return _servers[cards]
+
+
+def fake_client(cards):
+    """TrelloClient served by the fake server of synthetic_board(cards)"""
+    server, board_id = synthetic_board(cards)
+    return TrelloClient('key', token='token', http_service=server), board_id
+
+
+def card_jsons(cards):
+    """Json objects of the cards of a synthetic board, as listed with their
+    custom field items and checklists"""
+    if cards not in _card_jsons:
+        server, board_id = synthetic_board(cards)
+        _card_jsons[cards] = server.handle('GET', 'boards/%s/cards/all' % board_id, dict(CARD_QUERY)).json()
+    return _card_jsons[cards]
+
+
+def offline_board(cards):
+    """Board of synthetic_board(cards) with its custom field definitions
+    already loaded, so building cards makes no request"""
+    client, board_id = fake_client(cards)
+    board = client.get_board(board_id)
+    board.get_custom_field_definitions()
+    return board
+
+
+class StubHTTPService(object):
+    """
+    http_service answering every request with the same response, to
+    measure the overhead of the client itself.
+    """
+
+    def __init__(self, body=None):
+        self.response = FakeResponse(200, content=json.dumps(body or {}).encode('utf-8'))
+        self.requests = 0
+
+    def request(self, method, url, **kwargs):
+        self.requests += 1
+        return self.response
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark runner.
+
+Each benchmark is measured for each board size: the best time of several
+runs, and the peak memory allocated during one more run (traced
+separately, as tracing slows the code down). Results are written as JSON
+and can be compared with a saved baseline, in which case the exit status
+is 1 if a benchmark got slower or used more memory than the tolerance.
+
+    python -m benchmarks --sizes 1000,10000 --save-baseline baseline.json
+    # ... change the code ...
+    python -m benchmarks --sizes 1000,10000 --baseline baseline.json
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+import argparse
+import datetime
+import gc
+import importlib
+import json
+import platform
+import sys
+import time
+from collections import OrderedDict
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+try:
+    _timer = time.perf_counter
+except AttributeError:  # Python 2
+    _timer = time.time
+
+BENCHMARK_MODULES = (
+    'benchmarks.bench_cardtable',
+    'benchmarks.bench_import',
+    'benchmarks.bench_models',
+    'benchmarks.bench_parallel',
+    'benchmarks.bench_requests',
+    'benchmarks.bench_end_to_end',
+)
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+_benchmarks = OrderedDict()
+
+
+def benchmark(name, sized=True, memory=True):
+    """
+    Register a benchmark. The decorated function is called with the board
+    size, does the setup that is not measured and returns the function to
+    measure. A benchmark that does not depend on the board size (sized
+    False) is called without argument and measured once, its result key
+    being its name. The memory of a benchmark whose work is not done in
+    this process (eg. in a subprocess) is not measured (memory False).
+    """
+    def register(setup):
+        _benchmarks[name] = (setup, sized, memory)
+        return setup
+    return register
+
+
+def measure(func, repeat=3, memory=True):
+    """
+    :return: dict of the best time of repeat calls of func in seconds, and
+        of the peak memory allocated by one call in bytes (None when
+        memory is False or tracemalloc is not available)
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = _timer()
+        func()
+        times.append(_timer() - start)
+    peak = None
+    if memory and tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'seconds': min(times), 'peak_bytes': peak}
+
+
+def run(sizes=DEFAULT_SIZES, repeat=3, names=None, log=None):
+    """
+    Run the benchmarks whose name contains one of names (all by default).
+
+    :return: dict of the results by '<name>[<size>]' (or '<name>')
+    """
+    for module in BENCHMARK_MODULES:
+        importlib.import_module(module)
+    results = OrderedDict()
+    for name, (setup, sized, memory) in _benchmarks.items():
+        if names and not any(part in name for part in names):
+            continue
+        runs = [('%s[%d]' % (name, size), (size,)) for size in sizes] if sized else [(name, ())]
+        for key, args in runs:
+            results[key] = measure(setup(*args), repeat, memory)
+            if log is not None:
+                log(key, results[key])
+    return results
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Compare results with baseline results.
+
+    :return: list of (key, metric, ratio) of the benchmarks that regressed
+        by more than tolerance (0.25 means 25% slower or bigger)
+    """
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            if not result.get(metric) or not reference.get(metric):
+                continue
+            ratio = float(result[metric]) / reference[metric]
+            if ratio > 1 + tolerance:
+                regressions.append((key, metric, ratio))
+    return regressions
+
+
+def _format(key, result, reference=None):
+    line = '%-40s %10.4fs' % (key, result['seconds'])
+    if result['peak_bytes'] is not None:
+        line += ' %10.1f MB' % (result['peak_bytes'] / 1e6)
+    if reference:
+        line += '   x%.2f time' % (result['seconds'] / reference['seconds'])
+        if result['peak_bytes'] and reference.get('peak_bytes'):
+            line += ' x%.2f memory' % (float(result['peak_bytes']) / reference['peak_bytes'])
+    return line
+
+
+def _load(path):
+    with open(path) as results_file:
+        return json.load(results_file)['results']
+
+
+def _save(path, results):
+    with open(path, 'w') as results_file:
+        json.dump({
+            'date': datetime.datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, results_file, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the py-trello benchmarks.')
+    parser.add_argument('names', nargs='*', help='only run the benchmarks whose name contains one of these')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='comma separated numbers of cards of the synthetic boards')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs, the best is kept')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--save-baseline', help='write the results to this baseline file')
+    parser.add_argument('--baseline', help='compare the results with this baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='relative slowdown or memory growth reported as a regression')
+    args = parser.parse_args(argv)
+
+    baseline = _load(args.baseline) if args.baseline else {}
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = run(sizes, args.repeat, args.names,
+                  log=lambda key, result: print(_format(key, result, baseline.get(key))))
+    for path in (args.output, args.save_baseline):
+        if path:
+            _save(path, results)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for key, metric, ratio in regressions:
+        print('REGRESSION %s: %s x%.2f' % (key, metric, ratio), file=sys.stderr)
+    return 1 if regressions else 0
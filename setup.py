@@ -24,8 +24,12 @@ setup(
             'Programming Language :: Python :: 3',
             'Programming Language :: Python :: 3.3',
     ],
-    install_requires=["requests", "requests-oauthlib >= 0.4.1", "python-dateutil", "pytz"],
-    packages=find_packages(),
+    install_requires=["requests", "requests-oauthlib >= 0.4.1", "python-dateutil", "pytz",
+                      'futures; python_version < "3"'],
+    extras_require={
+        'analytics': ["numpy"],
+    },
+    packages=find_packages(exclude=['benchmarks']),
     include_package_data=True,
 )
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
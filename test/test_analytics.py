@@ -0,0 +1,159 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import datetime
+import unittest
+
+try:
+    from trello.analytics import CumulativeFlow, ListMovements, created_timestamps, parse_dates
+except ImportError:
+    CumulativeFlow = ListMovements = None
+
+CARD_ID = '5a0000000000000000000001'
+OTHER_CARD_ID = '5a0000100000000000000002'
+CREATED = int(CARD_ID[:8], 16)
+
+
+class FakeList(object):
+    def __init__(self, list_id):
+        self.id = list_id
+
+
+def _date(seconds):
+    date = datetime.datetime.utcfromtimestamp(CREATED + seconds)
+    return date.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def _move(card_id, seconds, source, destination):
+    return {'type': 'updateCard', 'date': _date(seconds),
+            'data': {'card': {'id': card_id},
+                     'listBefore': {'id': source},
+                     'listAfter': {'id': destination}}}
+
+
+@unittest.skipIf(ListMovements is None, "numpy is not installed")
+class ListMovementsTestCase(unittest.TestCase):
+    """
+    Tests for the board-wide list dwell analytics, built from synthetic
+    actions so no API access is needed.
+    """
+
+    def setUp(self):
+        actions = [
+            _move(CARD_ID, 300, 'B', 'A'),
+            _move(CARD_ID, 100, 'A', 'B'),
+        ]
+        self.movements = ListMovements.from_actions(
+            actions, {CARD_ID: 'A', OTHER_CARD_ID: 'B'})
+        self.lists = [FakeList('A'), FakeList('B')]
+
+    def test_parse_dates(self):
+        self.assertEqual(parse_dates([_date(0)]).tolist(), [float(CREATED)])
+
+    def test_created_timestamps(self):
+        self.assertEqual(created_timestamps([CARD_ID]).tolist(), [float(CREATED)])
+
+    def test_dwell_stats(self):
+        stats = self.movements.dwell_stats(self.lists, now=CREATED + 1000)
+        self.assertEqual(stats.by_card(CARD_ID), {
+            'A': {'time': 800.0, 'forward_moves': 1, 'backward_moves': 0},
+            'B': {'time': 200.0, 'forward_moves': 0, 'backward_moves': 1},
+        })
+        # Never moved, all its life has been in its current list
+        self.assertEqual(stats.by_card(OTHER_CARD_ID)['B']['time'], 984.0)
+
+    def test_dwell_stats_done_list(self):
+        stats = self.movements.dwell_stats(self.lists, done_list=FakeList('A'),
+                                           now=CREATED + 1000, time_unit='minutes')
+        self.assertEqual(stats.by_card(CARD_ID)['A']['time'], 100 / 60.0)
+
+    def test_percentiles(self):
+        stats = self.movements.dwell_stats(self.lists, now=CREATED + 1000)
+        percentiles = stats.percentiles([0, 100])
+        self.assertEqual(percentiles['B'].tolist(), [200.0, 984.0])
+
+
+def _action(action_id, date, action_type, **data):
+    return {'id': action_id, 'date': date, 'type': action_type, 'data': data}
+
+
+@unittest.skipIf(CumulativeFlow is None, "numpy is not installed")
+class CumulativeFlowTestCase(unittest.TestCase):
+    """
+    Tests for the cumulative flow and throughput series, built from
+    synthetic actions.
+    """
+
+    def setUp(self):
+        self.actions = [
+            _action('1', '2024-01-01T10:00:00.000Z', 'createCard',
+                    card={'id': 'c1'}, list={'id': 'A'}),
+            _action('2', '2024-01-02T10:00:00.000Z', 'createCard',
+                    card={'id': 'c2'}, list={'id': 'A'}),
+            _action('3', '2024-01-03T10:00:00.000Z', 'updateCard',
+                    card={'id': 'c1'}, listBefore={'id': 'A'}, listAfter={'id': 'D'}),
+        ]
+
+    def test_counts(self):
+        flow = CumulativeFlow(done_lists=['D'])
+        flow.update(reversed(self.actions))
+        days, counts = flow.counts()
+        self.assertEqual(flow.list_ids, ['A', 'D'])
+        self.assertEqual(str(days[0]), '2024-01-01')
+        self.assertEqual(counts.tolist(), [[1, 0], [2, 0], [1, 1]])
+
+    def test_incremental_update(self):
+        flow = CumulativeFlow(done_lists=['D'])
+        flow.update(self.actions[:2])
+        # Actions already replayed are skipped
+        flow.update(self.actions)
+        self.assertEqual(flow.counts()[1].tolist(), [[1, 0], [2, 0], [1, 1]])
+
+    def test_throughput(self):
+        flow = CumulativeFlow(done_lists=['D'])
+        flow.update(self.actions)
+        self.assertEqual(flow.throughput()[1].tolist(), [0, 0, 1])
+        weeks, counts = flow.throughput('week', until='2024-01-10T00:00:00.000Z')
+        self.assertEqual([str(week) for week in weeks], ['2024-01-01', '2024-01-08'])
+        self.assertEqual(counts.tolist(), [1, 0])
+
+    def test_throughput_closed_cards(self):
+        flow = CumulativeFlow()
+        flow.update(self.actions[:1] + [
+            _action('4', '2024-01-02T00:00:00.000Z', 'updateCard',
+                    card={'id': 'c1', 'closed': True}, old={'closed': False},
+                    list={'id': 'A'}),
+        ])
+        self.assertEqual(flow.counts()[1].tolist(), [[1], [0]])
+        self.assertEqual(flow.throughput()[1].tolist(), [0, 1])
+
+    def test_cards_created_before_the_actions(self):
+        flow = CumulativeFlow()
+        flow.update([
+            _action('5', '2024-01-01T10:00:00.000Z', 'updateCard',
+                    card={'id': 'c3'}, listBefore={'id': 'A'}, listAfter={'id': 'B'}),
+            _action('6', '2024-01-02T10:00:00.000Z', 'updateCard',
+                    card={'id': 'c4', 'closed': True}, old={'closed': False},
+                    list={'id': 'B'}),
+            _action('7', '2024-01-03T10:00:00.000Z', 'deleteCard',
+                    card={'id': 'c4'}, list={'id': 'B'}),
+        ])
+        self.assertEqual(flow.list_ids, ['A', 'B'])
+        # Deleting the archived card changes nothing
+        self.assertEqual(flow.counts(until='2024-01-03T10:00:00.000Z')[1].tolist(),
+                         [[0, 2], [0, 1], [0, 1]])
+
+    def test_other_creations(self):
+        flow = CumulativeFlow()
+        flow.update([
+            _action('8', '2024-01-01T10:00:00.000Z', 'copyCard',
+                    card={'id': 'c5'}, cardSource={'id': 'c1'}, list={'id': 'A'}),
+            _action('9', '2024-01-01T11:00:00.000Z', 'convertToCardFromCheckItem',
+                    card={'id': 'c6'}, list={'id': 'A'}),
+            _action('10', '2024-01-01T12:00:00.000Z', 'emailCard',
+                    card={'id': 'c7'}, list={'id': 'B'}),
+        ])
+        self.assertEqual(flow.counts()[1].tolist(), [[2, 1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -191,6 +191,17 @@ class TrelloBoardTestCase(unittest.TestCase):
         self.assertEqual(i2['name'], "item2")
         self.assertEqual(i2['state'], "incomplete")
 
+    def test140_all_cards_prefetch(self):
+        card = self._add_card('For prefetch testing')
+        card.comment('Prefetched comment')
+        self._add_checklist(card, "Prefetched Checklist", items=["item1"])
+        cards = self._board.all_cards(prefetch=['checklists', 'comments', 'attachments', 'members'])
+        prefetched = next(x for x in cards if x.id == card.id)
+        self.assertEqual(prefetched.checklists[0].name, "Prefetched Checklist")
+        self.assertEqual(prefetched.comments[0]['data']['text'], 'Prefetched comment')
+        self.assertEqual(prefetched.attachments, [])
+        self.assertEqual(prefetched.members, [])
+
     def test_last_activity(self):
         self.assertIsInstance(self._board.date_last_activity, datetime)
         self.assertIsInstance(self._board.get_last_activity(), datetime)
@@ -127,6 +127,24 @@ class TrelloCardTestCase(unittest.TestCase):
         card.fetch()
         self.assertTrue(card.closed)
 
+    def test_batch_update(self):
+        card = self._list.add_card("Testing batch update")
+        with card.batch_update():
+            card.set_name("Batch updated card")
+            card.set_description("Batch description")
+            card.set_closed(True)
+        self.assertEqual(card.name, "Batch updated card")
+        card.fetch()
+        self.assertEqual(card.name, "Batch updated card")
+        self.assertEqual(card.description, "Batch description")
+        self.assertTrue(card.closed)
+
+    def test_update(self):
+        card = self._list.add_card("Testing update")
+        card.update(name="Updated card", desc="Updated description")
+        self.assertEqual(card.name, "Updated card")
+        self.assertEqual(card.description, "Updated description")
+
     def test81_resource_unavailable(self):
         self.assertRaises(ResourceUnavailable,
                           self._trello.get_card, '0dsfkjhsdf87342ed')
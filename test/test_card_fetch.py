@@ -0,0 +1,49 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import unittest
+from trello import TrelloClient
+from trello.fakeserver import FakeTrello
+
+
+class CardFetchTestCase(unittest.TestCase):
+    """
+    Tests of loading a whole card with Card.fetch, counting the requests
+    made to the in-memory Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        board_id = self.server.add_synthetic_board(lists=1, cards=3, custom_fields=2, checklists=2)
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.card = self.client.get_board(board_id).all_cards()[0]
+        self.card.comment('First')
+        self.card.comment('Second')
+        self.card.attach(name='spec', url='https://example.com/spec.pdf')
+        self.server.cards[self.card.id]['pluginData'] = [{'id': 'p1', 'value': '{}'}]
+
+    def test_fetch_in_one_request(self):
+        card = self.client.get_card(self.card.id)
+        # Board metadata, loaded once per board to type the custom fields
+        card.board.get_custom_field_definitions()
+        with self.client.track_requests() as tracker:
+            card.fetch()
+            self.assertEqual(len(card.checklists), 2)
+            self.assertEqual(sorted(c['data']['text'] for c in card.comments), ['First', 'Second'])
+            self.assertEqual([a['name'] for a in card.attachments], ['spec'])
+            self.assertEqual(card.plugin_data, [{'id': 'p1', 'value': '{}'}])
+            self.assertEqual(len(card.customFields), 2)
+        self.assertEqual(tracker.count, 1)
+        self.assertEqual(dict(tracker.by_endpoint), {'GET /cards/{id}': 1})
+
+    def test_custom_fields(self):
+        # Loaded without its custom field items
+        card = self.client.get_card(self.card.id)
+        self.assertEqual(card.customFields, [])
+        card.fetch(eager=False)
+        self.assertFalse(hasattr(card, '_customFields'))
+        self.assertEqual(sorted(f.definition_id for f in card.customFields),
+                         sorted(f.definition_id for f in self.card.customFields))
+
+
+if __name__ == "__main__":
+    unittest.main()
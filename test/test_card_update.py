@@ -0,0 +1,90 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import datetime
+import json
+import unittest
+from trello import TrelloClient
+from trello.fakeserver import FakeTrello
+
+
+class RecordingService(object):
+    """http_service keeping the method, url and body of each request"""
+
+    def __init__(self, server):
+        self.server = server
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        data = kwargs.get('data')
+        self.requests.append((method, url.split('?')[0], json.loads(data) if data else None))
+        return self.server.request(method, url, **kwargs)
+
+
+class CardUpdateTestCase(unittest.TestCase):
+    """
+    Tests of Card.update and Card.batch_update against the in-memory
+    Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        board_id = self.server.add_synthetic_board(lists=2, cards=2)
+        self.service = RecordingService(self.server)
+        self.client = TrelloClient('key', token='token', http_service=self.service)
+        self.board = self.client.get_board(board_id)
+        self.lists = self.board.list_lists()
+        self.card = self.board.all_cards()[0]
+        del self.service.requests[:]
+
+    def assert_one_put(self, body):
+        self.assertEqual(len(self.service.requests), 1)
+        method, url, data = self.service.requests[0]
+        self.assertEqual((method, url), ('PUT', 'https://api.trello.com/1/cards/' + self.card.id))
+        for key in ('key', 'token'):
+            data.pop(key, None)
+        self.assertEqual(data, body)
+
+    def test_update(self):
+        due = datetime.datetime(2024, 1, 2, 3, 4, 5)
+        self.card.update(name='Renamed', desc='New description', due=due, closed=True)
+        self.assert_one_put({'name': 'Renamed', 'desc': 'New description',
+                             'due': '2024-01-02T03:04:05', 'closed': True})
+        stored = self.server.cards[self.card.id]
+        self.assertEqual((stored['name'], stored['desc'], stored['closed']),
+                         ('Renamed', 'New description', True))
+        self.assertEqual((self.card.name, self.card.desc, self.card.closed),
+                         ('Renamed', 'New description', True))
+        self.assertTrue(self.card.due.startswith('2024-01-02T03:04:05'))
+
+    def test_batch_update(self):
+        target = self.lists[1] if self.card.idList == self.lists[0].id else self.lists[0]
+        with self.card.batch_update():
+            self.card.set_name('Renamed')
+            self.card.set_description('New description')
+            self.card.change_list(target.id)
+            self.assertEqual(self.service.requests, [])
+        self.assert_one_put({'name': 'Renamed', 'desc': 'New description', 'idList': target.id})
+        self.assertEqual(self.server.cards[self.card.id]['idList'], target.id)
+        self.assertEqual((self.card.name, self.card.desc, self.card.idList),
+                         ('Renamed', 'New description', target.id))
+
+    def test_batch_update_raising(self):
+        name, desc, closed = self.card.name, self.card.desc, self.card.closed
+        with self.assertRaises(ValueError):
+            with self.card.batch_update():
+                self.card.set_name('Renamed')
+                self.card.set_description('New description')
+                self.card.set_closed(True)
+                raise ValueError()
+        self.assertEqual(self.service.requests, [])
+        self.assertEqual((self.card.name, self.card.desc, self.card.closed), (name, desc, closed))
+        self.assertEqual(self.server.cards[self.card.id]['name'], name)
+
+        # The next batch starts afresh
+        with self.card.batch_update():
+            self.card.set_pos(10)
+        self.assert_one_put({'pos': 10})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import math
+import unittest
+from trello import TrelloClient
+from trello.fakeserver import FakeTrello
+
+try:
+    from trello.cardtable import CardTable
+except ImportError:
+    CardTable = None
+
+CUSTOM_FIELDS = [{'id': 'f1', 'name': 'Estimate', 'type': 'number'},
+                 {'id': 'f2', 'name': 'Notes', 'type': 'text'}]
+
+
+def card(card_id, list_id, pos, labels=(), members=(), estimate=None, due=None, closed=False):
+    items = [{'idCustomField': 'f2', 'value': {'text': 'note'}}]
+    if estimate is not None:
+        items.append({'idCustomField': 'f1', 'value': {'number': str(estimate)}})
+    return {'id': card_id, 'idBoard': 'b1', 'idList': list_id, 'pos': pos, 'closed': closed,
+            'dateLastActivity': '2018-01-01T00:00:%02d.000Z' % pos, 'due': due, 'dueComplete': False,
+            'idLabels': list(labels), 'idMembers': list(members), 'customFieldItems': items}
+
+
+@unittest.skipIf(CardTable is None, "numpy is not installed")
+class CardTableTestCase(unittest.TestCase):
+    """
+    Tests of the columnar card table, built from synthetic card json objects
+    and from a board of the in-memory Trello API.
+    """
+
+    def setUp(self):
+        self.table = CardTable.from_json([
+            card('5a0000000000000000000001', 'A', 3, labels=['red'], members=['m1'], estimate=2,
+                 due='2018-02-01T00:00:00.000Z'),
+            card('5a0000100000000000000002', 'B', 1, labels=['red', 'blue'], estimate=4),
+            card('5a0000200000000000000003', 'A', 2, members=['m1', 'm2'], closed=True),
+        ], CUSTOM_FIELDS)
+
+    def test_columns(self):
+        table = self.table
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.list_ids.tolist(), ['A', 'B'])
+        self.assertEqual(table.list.tolist(), [0, 1, 0])
+        self.assertEqual(table.closed.tolist(), [False, False, True])
+        self.assertEqual(table.created.tolist(), [float(0x5a000000), float(0x5a000010), float(0x5a000020)])
+        self.assertEqual(table.due[0], 1517443200.0)
+        self.assertTrue(math.isnan(table.due[1]))
+        self.assertEqual(list(table.fields), ['f1'])
+        estimate = table.column('Estimate')
+        self.assertEqual(estimate[:2].tolist(), [2.0, 4.0])
+        self.assertTrue(math.isnan(estimate[2]))
+
+    def test_filter_and_sort(self):
+        table = self.table
+        open_in_a = table.filter(~table.closed & table.in_lists(['A']))
+        self.assertEqual(open_in_a.ids.tolist(), ['5a0000000000000000000001'])
+        self.assertEqual(table.has_label('blue').tolist(), [False, True, False])
+        self.assertEqual(table.has_member('m1').tolist(), [True, False, True])
+
+        ordered = table.sort(['list', 'pos'])
+        self.assertEqual(ordered.pos.tolist(), [2.0, 3.0, 1.0])
+        self.assertEqual(ordered.has_member('m2').tolist(), [True, False, False])
+        self.assertEqual(table.sort('pos', descending=True).pos.tolist(), [3.0, 2.0, 1.0])
+
+    def test_group_by(self):
+        table = self.table
+        self.assertEqual(table.group_by('list').count(), {'A': 2, 'B': 1})
+        self.assertEqual(table.group_by('label').count(), {'blue': 1, 'red': 2})
+        self.assertEqual(table.group_by('label').sum('Estimate'), {'blue': 4.0, 'red': 6.0})
+        self.assertEqual(table.group_by('member').max('pos'), {'m1': 3.0, 'm2': 2.0})
+        means = table.group_by('member').mean('Estimate')
+        self.assertEqual(means['m1'], 2.0)
+        self.assertTrue(math.isnan(means['m2']))
+        self.assertEqual(table.group_by('list').percentile('pos', 50)['A'], 2.5)
+        self.assertEqual(table.filter(~table.closed).group_by('member').count(), {'m1': 1, 'm2': 0})
+
+    def test_from_board(self):
+        server = FakeTrello()
+        board_id = server.add_synthetic_board(cards=120, custom_fields=5)
+        board = TrelloClient('key', token='token', http_service=server).get_board(board_id)
+        table = CardTable.from_board(board, card_filter='all', page_size=50)
+        cards = board.all_cards()
+        self.assertEqual(sorted(table.ids.tolist()), sorted(c.id for c in cards))
+        self.assertEqual(table.group_by('list').count(),
+                         dict((l.id, len([c for c in cards if c.list_id == l.id]))
+                              for l in board.all_lists() if any(c.list_id == l.id for c in cards)))
+        self.assertEqual(len(table.fields), 1)
+
+        snapshot = {'board': {'id': board_id}, 'cards': board.client.fetch_json(
+            '/boards/' + board_id + '/cards/all', query_params={'customFieldItems': 'true'}),
+            'custom_fields': board.client.fetch_json('/boards/' + board_id + '/customFields')}
+        from_snapshot = CardTable.from_snapshots([snapshot])
+        self.assertEqual(from_snapshot.group_by('member').count(), table.group_by('member').count())
+
+
+if __name__ == "__main__":
+    unittest.main()
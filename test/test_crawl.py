@@ -0,0 +1,110 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import os
+import shutil
+import tempfile
+import unittest
+from trello import TrelloClient
+from trello.crawl import DirectorySink, OrganizationCrawler
+from trello.fakeserver import FakeResponse, FakeTrello
+from trello.ratelimit import RateLimiter
+
+
+class RejectingService(object):
+    """http_service rejecting the first request of each card page with a 429"""
+
+    def __init__(self, server):
+        self.server = server
+        self.seen = set()
+        self.rejected = 0
+
+    def request(self, method, url, **kwargs):
+        if '/cards/all' in url:
+            key = (url, repr(sorted(kwargs.get('params', {}).items())))
+            if key not in self.seen:
+                self.seen.add(key)
+                self.rejected += 1
+                return FakeResponse(429, content=b'API_TOKEN_LIMIT_EXCEEDED')
+        return self.server.request(method, url, **kwargs)
+
+
+class CrawlTestCase(unittest.TestCase):
+    """
+    Tests of the organization crawl, against the in-memory Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        organization_id = self.server.add_organization('acme')
+        self.board_ids = [self.server.add_synthetic_board('Board %d' % i, lists=2, cards=15,
+                                                          organization_id=organization_id)
+                          for i in range(5)]
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.organization = self.client.get_organization(organization_id)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_crawl(self):
+        snapshots, reports = [], []
+        progress = self.organization.crawl(snapshots.append, max_workers=3, progress=reports.append)
+        self.assertEqual(sorted(s['board']['id'] for s in snapshots), sorted(self.board_ids))
+        self.assertEqual(len(snapshots[0]['cards']), 15)
+        self.assertEqual(len(snapshots[0]['cards'][0]['checklists']), 1)
+        self.assertEqual(len(snapshots[0]['lists']), 2)
+        self.assertEqual((progress.done, progress.total, progress.remaining), (5, 5, 0))
+        self.assertEqual(len(reports), 5)
+        self.assertEqual(reports[-1].eta, 0)
+
+    def test_paging(self):
+        snapshots = []
+        crawler = OrganizationCrawler(self.organization, snapshots.append, max_workers=2, page_size=5)
+        with self.client.track_requests() as tracker:
+            progress = crawler.run()
+        self.assertEqual([len(s['cards']) for s in snapshots], [15] * 5)
+        # 4 card pages per board, the last one empty
+        self.assertEqual(tracker.by_endpoint['GET /boards/{id}/cards/all'], 20)
+        self.assertEqual(progress.requests, tracker.count)
+
+    def test_retries_counted(self):
+        service = RejectingService(self.server)
+        client = TrelloClient('key', token='token', http_service=service,
+                              rate_limiter=RateLimiter(sleep=lambda seconds: None))
+        organization = client.get_organization(self.organization.id)
+        with client.track_requests() as tracker:
+            progress = OrganizationCrawler(organization, lambda snapshot: None, page_size=5).run()
+        self.assertEqual(progress.done, 5)
+        self.assertEqual(service.rejected, 20)
+        self.assertEqual(tracker.by_endpoint['GET /boards/{id}/cards/all'], 40)
+        self.assertEqual(progress.requests, tracker.count)
+
+    def test_resume(self):
+        checkpoint_path = os.path.join(self.directory, 'crawl.json')
+        sink = DirectorySink(os.path.join(self.directory, 'boards'), compress=True)
+        calls = []
+
+        def failing_sink(snapshot):
+            if len(calls) == 2:
+                raise KeyboardInterrupt()
+            calls.append(snapshot['board']['id'])
+            sink(snapshot)
+
+        self.assertRaises(KeyboardInterrupt, self.organization.crawl, failing_sink,
+                          checkpoint_path=checkpoint_path, max_workers=1)
+        progress = self.organization.crawl(sink, checkpoint_path=checkpoint_path)
+        self.assertEqual(progress.done, 5)
+        self.assertEqual(progress.total, 5)
+        self.assertEqual(sorted(os.listdir(sink.directory)),
+                         sorted(board_id + '.json.gz' for board_id in self.board_ids))
+        # Nothing left to do
+        self.assertEqual(self.organization.crawl(sink, checkpoint_path=checkpoint_path).requests, 1)
+
+    def test_rate_limited(self):
+        self.server.rate_limit = (20, 0.5)
+        self.client.rate_limiter = RateLimiter(40, 0.5)
+        progress = self.organization.crawl(lambda snapshot: None, max_workers=4)
+        self.assertEqual(progress.done, 5)
+        self.assertEqual(progress.failed, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
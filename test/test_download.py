@@ -0,0 +1,120 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from trello import TrelloClient
+from trello.attachments import Attachments
+from trello.download import AttachmentDownloader
+from trello.fakeserver import FakeTrello
+
+
+class BrokenStreamService(object):
+    """http_service whose first download breaks after some bytes"""
+
+    def __init__(self, server, broken_after):
+        self.server = server
+        self.broken_after = broken_after
+
+    def request(self, method, url, **kwargs):
+        response = self.server.request(method, url, **kwargs)
+        if '/download/' in url and self.broken_after is not None:
+            content, self.broken_after = response.content[:self.broken_after], None
+
+            def iter_content(chunk_size=1):
+                for i in range(0, len(content), chunk_size):
+                    yield content[i:i + chunk_size]
+                raise IOError('Connection reset')
+            response.iter_content = iter_content
+        return response
+
+
+class AttachmentDownloaderTestCase(unittest.TestCase):
+    """
+    Tests of the attachment downloader, on the in-memory Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        board = self.client.add_board('Archive')
+        self.card = board.add_list('Files').add_card('Card')
+        self.contents = {}
+        for i in range(6):
+            content = os.urandom(1000 + i * 537)
+            attachment = self.card.attach(name='file %d.bin' % i, file=io.BytesIO(content))
+            self.contents[attachment['id']] = content
+        self.card.attach(name='Link', url='https://example.com/page')
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertDownloaded(self, results):
+        for result in results:
+            if result.status != 'ignored':
+                with open(result.path, 'rb') as downloaded:
+                    self.assertEqual(downloaded.read(), self.contents[result.attachment.id])
+
+    def test_download(self):
+        downloader = AttachmentDownloader(self.client, self.directory, max_workers=3, chunk_size=100)
+        results = downloader.download(self.card.get_attachments())
+        self.assertEqual([r.status for r in results], ['downloaded'] * 6 + ['ignored'])
+        self.assertDownloaded(results)
+        self.assertEqual(os.path.basename(results[0].path), results[0].attachment.id + '_file 0.bin')
+        # Everything is on disk already
+        with self.client.track_requests() as tracker:
+            results = self.card.download_attachments(self.directory)
+        self.assertEqual([r.status for r in results], ['skipped'] * 6 + ['ignored'])
+        self.assertEqual(tracker.by_endpoint['GET /cards/{id}/attachments/{id}/download/{id}'], 0)
+
+    def test_resume(self):
+        downloader = AttachmentDownloader(self.client, self.directory)
+        attachment = self.card.get_attachments()[3]
+        content = self.contents[attachment.id]
+        with open(downloader.path(attachment) + '.part', 'wb') as part_file:
+            part_file.write(content[:500])
+        result = downloader.download_one(attachment)
+        self.assertEqual((result.status, result.bytes), ('resumed', len(content) - 500))
+        self.assertDownloaded([result])
+        self.assertFalse(os.path.exists(result.path + '.part'))
+
+        # A .part file too large is downloaded again
+        attachment = self.card.get_attachments()[4]
+        with open(downloader.path(attachment) + '.part', 'wb') as part_file:
+            part_file.write(b'x' * 10000)
+        result = downloader.download_one(attachment)
+        self.assertEqual(result.bytes, len(self.contents[attachment.id]))
+        self.assertDownloaded([result])
+
+    def test_retry_keeps_bytes(self):
+        client = TrelloClient('key', token='token', http_service=BrokenStreamService(self.server, 700))
+        attachment = self.card.get_attachments()[2]
+        result = AttachmentDownloader(client, self.directory, chunk_size=100).download_one(attachment)
+        # The 700 bytes of the broken attempt are kept and counted
+        self.assertEqual((result.status, result.bytes), ('downloaded', len(self.contents[attachment.id])))
+        self.assertDownloaded([result])
+
+    def test_failure(self):
+        attachment = self.card.get_attachments()[0]
+        del self.server.attachment_contents[attachment.id]
+        result = AttachmentDownloader(self.client, self.directory).download_one(attachment)
+        self.assertEqual(result.status, 'failed')
+        self.assertEqual(result.error._status, 404)
+
+    def test_preview_for(self):
+        attachment = Attachments.from_json({
+            'id': 'a', 'date': '2020-01-01T00:00:00.000Z', 'url': 'https://trello.com/a.png', 'previews': [
+                {'url': 'https://trello.com/p1.png', 'width': 1000, 'height': 800, 'bytes': 90000},
+                {'url': 'https://trello.com/p2.png', 'width': 150, 'height': 100, 'bytes': 2000},
+                {'url': 'https://trello.com/p3.png', 'width': 300, 'height': 200, 'bytes': 9000},
+            ]})
+        self.assertEqual(attachment.preview_for(200, 100).width, 300)
+        self.assertEqual(attachment.preview_for(100, 100).width, 150)
+        self.assertIsNone(attachment.preview_for(2000, 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
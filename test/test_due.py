@@ -0,0 +1,123 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import datetime
+import threading
+import unittest
+import pytz
+from trello import TrelloClient
+from trello.fakeserver import FakeTrello
+from trello.due import DueIndex, DueScheduler
+
+NOW = datetime.datetime(2030, 1, 1, 12, tzinfo=pytz.utc)
+
+
+def hours(n):
+    return NOW + datetime.timedelta(hours=n)
+
+
+class DueIndexTestCase(unittest.TestCase):
+    """
+    Tests of the due date index and scheduler, on the in-memory Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.board = self.client.add_board('Reminders')
+        self.list = self.board.add_list('Todo')
+        self.cards = [self.list.add_card('Card %d' % i, due=hours(i).strftime('%Y-%m-%dT%H:%M:%S'))
+                      for i in range(1, 4)]
+        self.list.add_card('No due date')
+        self.index = DueIndex.from_board(self.board)
+        self.index.watch(self.client)
+
+    def ids(self, *cards):
+        return [card.id for card in cards]
+
+    def test_due_between(self):
+        first, second, third = self.cards
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.due_between(before=hours(2) + datetime.timedelta(seconds=1)),
+                         self.ids(first, second))
+        self.assertEqual(self.index.next_due(after=hours(2)), (second.id, hours(2)))
+        self.assertEqual(self.index.due(third.id), hours(3))
+
+    def test_archived_cards(self):
+        first, second, third = self.cards
+        second.set_closed(True)
+        cards = self.board.get_cards({'filter': 'all', 'fields': 'all'})
+        index = DueIndex(cards)
+        self.assertEqual(index.due_between(), self.ids(first, third))
+        self.assertNotIn(second.id, index)
+        third.closed = True
+        index.add(third)
+        self.assertEqual(index.due_between(), self.ids(first))
+
+    def test_watch(self):
+        first, second, third = self.cards
+        first.set_due(hours(5).replace(tzinfo=None))
+        second.set_due_complete()
+        card = self.list.add_card('New', due=hours(4).strftime('%Y-%m-%dT%H:%M:%S'))
+        self.assertEqual(self.index.due_between(), self.ids(third, card, first))
+        second.remove_due_complete()
+        third.remove_due()
+        self.assertEqual(self.index.due_between(), self.ids(second, card, first))
+        card.update(dueComplete=True)
+        first.set_closed(True)
+        self.assertEqual(self.index.due_between(), self.ids(second))
+        second.delete()
+        self.assertEqual(len(self.index), 0)
+        self.index.unwatch(self.client)
+
+    def test_update_from_actions(self):
+        first, second, third = self.cards
+        self.index.unwatch(self.client)
+        since = self.board.fetch_actions('all', action_limit=1)[0]['id']
+        first.set_due(hours(10).replace(tzinfo=None))
+        second.set_closed(True)
+        self.index.update_from_actions(self.board.fetch_actions('updateCard', since=since))
+        self.assertEqual(self.index.due_between(), self.ids(third, first))
+
+    def test_scheduler(self):
+        first, second, third = self.cards
+        clock = [(NOW - datetime.datetime(1970, 1, 1, tzinfo=pytz.utc)).total_seconds()]
+        calls = []
+        scheduler = DueScheduler(self.index, clock=lambda: clock[0])
+        scheduler.add_handler(lambda card_id, due: calls.append(('due', card_id)))
+        scheduler.add_handler(lambda card_id, due: calls.append(('soon', card_id)),
+                              before=datetime.timedelta(minutes=90))
+        scheduler.reset()
+        self.assertEqual(scheduler.run_pending(), 1)
+        self.assertEqual(calls, [('soon', first.id)])
+
+        clock[0] += 3600
+        second.set_due_complete()
+        third.set_due(hours(1.5).replace(tzinfo=None))
+        self.assertEqual(scheduler.run_pending(), 2)
+        self.assertEqual(calls[1:], [('soon', third.id), ('due', first.id)])
+        # Nothing is handled twice
+        self.assertEqual(scheduler.run_pending(), 0)
+        second.remove_due_complete()
+        clock[0] += 3600
+        scheduler.run_pending()
+        self.assertEqual(sorted(calls[3:]), [('due', second.id), ('due', third.id), ('soon', second.id)])
+        scheduler.stop()
+
+    def test_scheduler_thread(self):
+        due = threading.Event()
+
+        def handler(card_id, when):
+            due.set()
+            raise ValueError(card_id)
+
+        scheduler = DueScheduler(self.index)
+        scheduler.add_handler(handler)
+        with scheduler:
+            card = self.cards[0]
+            card.set_due(datetime.datetime.utcnow() + datetime.timedelta(seconds=0.2))
+            self.assertTrue(due.wait(5))
+        self.assertEqual([card_id for card_id, _ in scheduler.errors], [card.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from trello import TrelloClient
+from trello.export import BoardExporter, read_export
+from trello.fakeserver import FakeTrello
+
+
+class Killed(Exception):
+    """Stands for the process being killed"""
+
+
+class KillingService(object):
+    """http_service killed on the nth request of a card page"""
+
+    def __init__(self, server, kill_at):
+        self.server = server
+        self.kill_at = kill_at
+        self.card_pages = 0
+
+    def request(self, method, url, **kwargs):
+        if '/cards/all' in url:
+            self.card_pages += 1
+            if self.card_pages == self.kill_at:
+                raise Killed()
+        return self.server.request(method, url, **kwargs)
+
+
+def read_csv(path):
+    """Rows of a CSV file, as dicts of unicode strings"""
+    if sys.version_info < (3,):
+        with open(path, 'rb') as csv_file:
+            return [dict((key.decode('utf-8'), value.decode('utf-8')) for key, value in row.items())
+                    for row in csv.DictReader(csv_file)]
+    with io.open(path, encoding='utf-8', newline='') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+class ExportTestCase(unittest.TestCase):
+    """
+    Tests of the board exporter against the in-memory Trello API, with
+    exports killed in the middle of the cards stream then resumed.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        board_id = self.server.add_synthetic_board(lists=3, cards=30, checklists=1, check_items=2)
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.board = self.client.get_board(board_id)
+        self.card_ids = sorted(card.id for card in self.board.all_cards())
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def exporter(self, http_service, format):
+        client = TrelloClient('key', token='token', http_service=http_service)
+        return BoardExporter(client.get_board(self.board.id), self.directory,
+                             format=format, page_size=7)
+
+    def read_ids(self, stream, format):
+        if format == 'jsonl':
+            return [row['id'] for row in read_export(self.directory, stream)]
+        return [row['id'] for row in read_csv(os.path.join(self.directory, stream + '.csv'))]
+
+    def assert_complete(self, format):
+        card_ids = self.read_ids('cards', format)
+        self.assertEqual(sorted(card_ids), self.card_ids)
+        checklist_ids = self.read_ids('checklists', format)
+        self.assertEqual(len(checklist_ids), 30)
+        self.assertEqual(len(set(checklist_ids)), 30)
+
+    def test_csv_non_ascii(self):
+        card_id = self.card_ids[0]
+        self.server.cards[card_id]['name'] = u'Caf\xe9 \u2615'
+        self.server.cards[card_id]['desc'] = u'\u00fcber "quoted", line\nbreak'
+        self.directory = os.path.join(self.root, 'non-ascii')
+        self.exporter(self.server, 'csv').export()
+        rows = dict((row['id'], row) for row in read_csv(os.path.join(self.directory, 'cards.csv')))
+        self.assertEqual(rows[card_id]['name'], u'Caf\xe9 \u2615')
+        self.assertEqual(rows[card_id]['desc'], u'\u00fcber "quoted", line\nbreak')
+        self.assertEqual(sorted(rows), self.card_ids)
+
+    def test_resume_after_failed_request(self):
+        for format in ('jsonl', 'csv'):
+            self.directory = os.path.join(self.root, 'failed-request-' + format)
+            exporter = self.exporter(KillingService(self.server, kill_at=3), format)
+            self.assertRaises(Killed, exporter.export)
+            self.assertEqual(len(self.read_ids('cards', format)), 14)
+
+            counts = self.exporter(self.server, format).export()
+            self.assertEqual(counts['cards'], 16)
+            self.assert_complete(format)
+
+    def test_resume_after_kill_before_checkpoint(self):
+        for format in ('jsonl', 'csv'):
+            self.directory = os.path.join(self.root, 'killed-' + format)
+            exporter = self.exporter(self.server, format)
+            update = exporter.checkpoint.update
+            cursor_saves = []
+
+            def killing_update(**kwargs):
+                # Killed once the third page is written, before it is saved
+                if 'cards' in kwargs.get('cursors', {}):
+                    cursor_saves.append(kwargs)
+                    if len(cursor_saves) == 3:
+                        raise Killed()
+                update(**kwargs)
+
+            exporter.checkpoint.update = killing_update
+            self.assertRaises(Killed, exporter.export)
+            self.assertEqual(len(self.read_ids('cards', format)), 21)
+
+            # The rows of the page not saved are written again, once
+            counts = self.exporter(self.server, format).export()
+            self.assertEqual(counts['cards'], 16)
+            self.assert_complete(format)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import shutil
+import tempfile
+import unittest
+from trello import TrelloClient, RateLimitExceeded, Unauthorized
+from trello.export import BoardExporter
+from trello.fakeserver import FakeTrello
+from trello.importer import BoardImporter
+
+
+class FakeTrelloTestCase(unittest.TestCase):
+    """
+    Tests of the in-memory Trello API, through a TrelloClient.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        self.board_id = self.server.add_synthetic_board(lists=3, cards=20)
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.board = self.client.get_board(self.board_id)
+
+    def test_synthetic_board(self):
+        self.assertEqual(self.board.name, 'Synthetic board')
+        self.assertEqual(len(self.board.list_lists()), 3)
+        cards = self.board.all_cards()
+        self.assertEqual(len(cards), 20)
+        self.assertEqual(len(cards[0].customFields), 2)
+        self.assertEqual(len(self.board.get_labels()), 6)
+
+    def test_mutations(self):
+        list_ = self.board.add_list('New list')
+        card = list_.add_card('New card', desc='Description')
+        card.comment('A comment')
+        card.set_closed(True)
+        self.assertEqual([c.id for c in list_.list_cards('closed')], [card.id])
+        actions = self.client.fetch_json('/boards/' + self.board_id + '/actions',
+                                         query_params={'filter': 'commentCard,updateCard:closed'})
+        self.assertEqual([a['type'] for a in actions], ['updateCard', 'commentCard'])
+
+        card.change_list(self.board.list_lists()[0].id)
+        moves = self.client.fetch_json('/boards/' + self.board_id + '/actions',
+                                       query_params={'filter': 'updateCard:idList'})
+        self.assertEqual(moves[0]['data']['listBefore']['id'], list_.id)
+
+    def test_nested_resources(self):
+        card = self.board.open_cards(prefetch=['checklists', 'members'])[0]
+        self.assertEqual(len(card.checklists), 1)
+        self.assertEqual(len(card.checklists[0].items), 4)
+        fetched = self.client.get_card(card.id)
+        self.assertEqual(fetched.name, card.name)
+
+    def test_paging(self):
+        pages = list(self.client.fetch_json_pages('/boards/' + self.board_id + '/cards/all',
+                                                  page_size=7))
+        self.assertEqual([len(page) for page in pages], [7, 7, 6])
+        ids = [card['id'] for page in pages for card in page]
+        self.assertEqual(len(set(ids)), 20)
+
+    def test_search_and_batch(self):
+        cards = self.client.search('Card 1', models=['cards'], cards_limit=50)
+        self.assertEqual(len(cards), 1)
+        results = self.client.fetch_json('/batch', query_params={
+            'urls': '/boards/%s,/lists/missing' % self.board_id})
+        self.assertEqual(results[0]['200']['id'], self.board_id)
+        self.assertEqual(results[1]['statusCode'], 404)
+
+    def test_webhooks(self):
+        self.client.create_hook('https://example.com/hook', self.board_id, desc='hook')
+        hooks = self.client.list_hooks()
+        self.assertEqual([hook.id_model for hook in hooks], [self.board_id])
+        hooks[0].delete()
+        self.assertEqual(self.client.list_hooks(), [])
+
+    def test_rate_limit(self):
+        server = FakeTrello(rate_limit=(3, 60.0))
+        client = TrelloClient('key', token='token', http_service=server)
+        for _ in range(3):
+            client.list_boards()
+        self.assertRaises(RateLimitExceeded, client.list_boards)
+        # Buckets are per token
+        TrelloClient('key', token='other', http_service=server).list_boards()
+
+    def test_unknown_token(self):
+        server = FakeTrello(tokens=['token'])
+        client = TrelloClient('key', token='other', http_service=server)
+        self.assertRaises(Unauthorized, client.list_boards)
+
+    def test_export_import(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        BoardExporter(self.board, directory, page_size=8).export()
+        board = BoardImporter(self.client, directory, board_name='Copy').run()
+        self.assertEqual(board.name, 'Copy')
+        self.assertEqual(sorted(card.name for card in board.all_cards()),
+                         sorted(card.name for card in self.board.all_cards()))
+
+
+if __name__ == "__main__":
+    unittest.main()
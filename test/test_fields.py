@@ -0,0 +1,61 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import unittest
+from trello import TrelloClient
+from trello.fakeserver import FakeTrello
+
+
+class FieldsTestCase(unittest.TestCase):
+    """
+    Tests of the fields projection of the listings, against the in-memory
+    Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        self.board_id = self.server.add_synthetic_board(lists=3, cards=60, members=3, custom_fields=2)
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.board = self.client.get_board(self.board_id)
+
+    def test_partial_cards(self):
+        cards = self.board.all_cards(fields='name,idList', custom_field_items='false')
+        full = self.board.all_cards()
+        self.assertEqual([(c.id, c.name, c.idList) for c in cards], [(c.id, c.name, c.idList) for c in full])
+        self.assertIsNone(cards[0].pos)
+        self.assertIsNone(cards[0].dateLastActivity)
+        self.assertIsNotNone(full[0].pos)
+        list_ = self.board.open_lists()[0]
+        self.assertEqual([c.pos for c in list_.list_cards(fields='pos')],
+                         [c.pos for c in list_.list_cards()])
+
+    def test_partial_lists_boards_members_labels(self):
+        lists = self.board.all_lists(fields='name')
+        self.assertEqual([l.name for l in lists], [l.name for l in self.board.all_lists()])
+        self.assertIsNone(lists[0].pos)
+        members = self.board.all_members(fields='username')
+        self.assertEqual(sorted(m.username for m in members), sorted(m.username for m in self.board.all_members()))
+        self.assertEqual(members[0].full_name, '')
+        labels = self.board.get_labels(fields='color')
+        self.assertEqual([l.color for l in labels], [l.color for l in self.board.get_labels()])
+        boards = self.client.list_boards(fields='name')
+        self.assertEqual([b.name for b in boards], ['Synthetic board'])
+        self.assertIsNone(boards[0].url)
+
+    def test_minimal_payloads(self):
+        list_ = self.board.open_lists()[0]
+        with self.client.track_requests() as full:
+            count = len(list_.list_cards())
+        with self.client.track_requests() as minimal:
+            self.assertEqual(list_.cardsCnt(), count)
+        self.assertEqual(minimal.count, 1)
+        self.assertLess(minimal.bytes * 10, full.bytes)
+
+        with self.client.track_requests() as ids:
+            card_ids = self.board.card_ids('all')
+        self.assertEqual(sorted(card_ids), sorted(c.id for c in self.board.all_cards()))
+        self.assertEqual(list_.card_ids(), [c.id for c in list_.list_cards()])
+        self.assertEqual(ids.count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import unittest
+from trello import TrelloClient
+from trello.fakeserver import FakeTrello
+from trello.fulltext import CardSearchIndex, tokenize
+
+
+class CardSearchIndexTestCase(unittest.TestCase):
+    """
+    Tests of the local full-text index, on a board of the in-memory Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.board = self.client.add_board('Search')
+        self.list = self.board.add_list('Todo')
+        self.deploy = self.list.add_card('Deploy staging', desc='Rollout of the new release')
+        self.release = self.list.add_card('Release notes', desc='Write about the deployment')
+        self.bug = self.list.add_card('Fix login bug')
+        self.bug.comment('Happens on staging only')
+        checklist = self.bug.add_checklist('Steps', ['Reproduce', 'Write regression test'])
+        self.checklist_id = checklist.id
+        self.index = CardSearchIndex.from_board(self.board)
+
+    def ids(self, query, **kwargs):
+        return [hit.card_id for hit in self.index.search(query, **kwargs)]
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize(u'Fix: login-bug (Staging)'), ['fix', 'login', 'bug', 'staging'])
+        self.assertEqual(tokenize(None), [])
+
+    def test_search(self):
+        self.assertEqual(len(self.index), 3)
+        # Matches in names rank first
+        self.assertEqual(self.ids('deploy'), [self.deploy.id, self.release.id])
+        self.assertEqual(self.ids('deploy', prefix=False), [self.deploy.id])
+        self.assertEqual(self.ids('stag'), [self.deploy.id, self.bug.id])
+        # All the words must match, in any field
+        self.assertEqual(self.ids('staging regression'), [self.bug.id])
+        self.assertEqual(self.ids('deploy regression'), [])
+        self.assertEqual(self.ids(''), [])
+        self.assertEqual(self.ids('e', limit=2), self.ids('e')[:2])
+        self.assertEqual(self.index.search('login')[0].name, 'Fix login bug')
+
+    def test_update_from_board(self):
+        self.deploy.set_name('Deploy production')
+        self.release.comment('Published on the blog')
+        self.bug.set_closed(True)
+        card = self.list.add_card('Staging database')
+        self.index.update_from_board(self.board)
+
+        self.assertEqual(self.ids('staging'), [card.id])
+        self.assertEqual(self.ids('production'), [self.deploy.id])
+        self.assertEqual(self.ids('blog'), [self.release.id])
+        self.assertNotIn(self.bug.id, self.index)
+        # Nothing new
+        self.index.update_from_board(self.board)
+        self.assertEqual(len(self.index), 3)
+
+    def test_archived_cards(self):
+        self.bug.set_closed(True)
+        self.bug.set_name('Fix logout bug')
+        self.index.update_from_board(self.board)
+        # Renaming an archived card does not index a partial card
+        self.assertNotIn(self.bug.id, self.index)
+        self.bug.set_closed(False)
+        self.index.update_from_board(self.board)
+        self.assertEqual(self.ids('logout'), [self.bug.id])
+        self.assertEqual(self.ids('regression staging'), [self.bug.id])
+
+    def test_update_from_actions(self):
+        card = {'id': self.bug.id}
+        comment_id = self.bug.fetch_comments(force=True)[0]['id']
+        self.index.update_from_actions([
+            {'id': 'a2', 'type': 'updateComment', 'data': {'card': card, 'action': {
+                'id': comment_id, 'text': 'Seen in production'}}},
+            {'id': 'a1', 'type': 'createCheckItem', 'data': {'card': card, 'checklist': {
+                'id': self.checklist_id}, 'checkItem': {'id': 'i1', 'name': 'Deploy the fix'}}},
+        ])
+        self.assertEqual(self.ids('production'), [self.bug.id])
+        self.assertEqual(self.ids('deploy fix'), [self.bug.id])
+        self.assertEqual(self.index.last_action_id, 'a2')
+        self.index.update_from_actions([
+            {'id': 'a3', 'type': 'removeChecklistFromCard', 'data': {'card': card, 'checklist': {
+                'id': self.checklist_id}}},
+        ])
+        self.assertEqual(self.ids('deploy fix'), [])
+        self.assertEqual(self.ids('regression'), [])
+        self.index.remove(self.bug.id)
+        self.assertEqual(self.ids('login'), [])
+        self.assertNotIn('login', self.index._vocabulary)
+
+    def test_fallback(self):
+        self.index.remove(self.deploy.id)
+        self.assertEqual(self.ids('rollout'), [])
+        hits = self.index.search('rollout', fallback=True, board_ids=[self.board.id])
+        self.assertEqual([(hit.card_id, hit.score) for hit in hits], [(self.deploy.id, 0.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('requests', 'requests_oauthlib', 'oauthlib', 'dateutil', 'pytz', 'concurrent.futures',
+                 'trello.card', 'trello.trelloclient', 'trello.positions')
+
+
+def loaded_after(code):
+    """Heavy modules imported by code, run in a new interpreter"""
+    script = code + '\nimport json, sys\nprint(json.dumps([m for m in %r if m in sys.modules]))' % (
+        HEAVY_MODULES,)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.check_output([sys.executable, '-c', script], env=env, cwd=ROOT)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+@unittest.skipIf(sys.version_info < (3, 7), 'trello is imported lazily on Python 3.7+')
+class ImportTestCase(unittest.TestCase):
+    """
+    Tests that importing trello does not import its submodules and their
+    dependencies before they are used.
+    """
+
+    def test_import_trello(self):
+        self.assertEqual(loaded_after('import trello'), [])
+
+    def test_names_imported_on_use(self):
+        self.assertEqual(loaded_after('import trello; trello.Unauthorized'), [])
+        self.assertIn('trello.card', loaded_after('import trello; trello.Card'))
+        self.assertIn('trello.trelloclient', loaded_after('from trello import TrelloClient'))
+
+    def test_dependencies_imported_on_use(self):
+        self.assertNotIn('dateutil', loaded_after('from trello import Card'))
+        self.assertNotIn('requests', loaded_after('from trello import TrelloClient'))
+        # Only needed to reorder cards or lists
+        loaded = loaded_after('from trello import TrelloClient; TrelloClient')
+        self.assertNotIn('concurrent.futures', loaded)
+        self.assertNotIn('trello.positions', loaded)
+        self.assertIn('requests', loaded_after(
+            'from trello import TrelloClient; TrelloClient("key", token="token")'))
+
+    def test_public_names(self):
+        import trello
+        from trello.card import Card
+        from trello.exceptions import ResourceUnavailable
+        from trello.util import create_oauth_token
+        self.assertIs(trello.Card, Card)
+        self.assertIs(trello.ResourceUnavailable, ResourceUnavailable)
+        self.assertIs(trello.create_oauth_token, create_oauth_token)
+        self.assertIn('Board', dir(trello))
+        for name in trello.__all__:
+            self.assertTrue(hasattr(trello, name), name)
+        self.assertRaises(AttributeError, getattr, trello, 'NoSuchThing')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import shutil
+import tempfile
+import threading
+import unittest
+from trello import TrelloClient
+from trello.exceptions import ResourceUnavailable
+from trello.export import BoardExporter
+from trello.fakeserver import FakeTrello, FakeResponse
+from trello.importer import BoardImporter
+
+
+class FailingService(object):
+    """http_service failing the nth card creation with a 500"""
+
+    def __init__(self, server, fail_at):
+        self.server = server
+        self.fail_at = fail_at
+        self.card_posts = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        if method == 'POST' and url.rstrip('/').endswith('/1/cards'):
+            with self._lock:
+                self.card_posts += 1
+                if self.card_posts == self.fail_at:
+                    return FakeResponse(500, content=b'server error')
+        return self.server.request(method, url, **kwargs)
+
+
+class ImporterTestCase(unittest.TestCase):
+    """
+    Tests of the board importer against the in-memory Trello API, with an
+    import interrupted in the middle of a stage then resumed.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        board_id = self.server.add_synthetic_board(lists=3, cards=30, checklists=1, check_items=2)
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.board = self.client.get_board(board_id)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        BoardExporter(self.board, self.directory).export()
+
+    def new_cards(self, importer):
+        return self.server.handle('GET', 'boards/%s/cards/all' % importer.board_id, {}).json()
+
+    def test_resume_after_failure(self):
+        failing = TrelloClient('key', token='token', http_service=FailingService(self.server, fail_at=12))
+        importer = BoardImporter(failing, self.directory, board_name='Copy', max_workers=4, chunk_size=5)
+        self.assertRaises(ResourceUnavailable, importer.run)
+
+        # The other cards of the failed chunk were created, and every card
+        # created is in the checkpoint
+        created = self.new_cards(importer)
+        self.assertEqual(len(created), 14)
+        resumed = BoardImporter(self.client, self.directory, max_workers=4, chunk_size=5)
+        old_ids = set(card.id for card in self.board.all_cards())
+        self.assertEqual(sorted(new_id for old_id, new_id in resumed.ids.items() if old_id in old_ids),
+                         sorted(card['id'] for card in created))
+
+        board = resumed.run()
+        self.assertEqual(board.name, 'Copy')
+        names = [card['name'] for card in self.new_cards(resumed)]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertEqual(sorted(names), sorted(card.name for card in self.board.all_cards()))
+        checklists = [c for c in self.server.checklists.values() if c['idBoard'] == board.id]
+        self.assertEqual(len(checklists), 30)
+
+    def test_checkpoint_per_chunk(self):
+        server = FakeTrello()
+        board_id = server.add_synthetic_board(lists=2, cards=40, custom_fields=5, checklists=0)
+        client = TrelloClient('key', token='token', http_service=server)
+        BoardExporter(client.get_board(board_id), self.directory + '/fields').export()
+        importer = BoardImporter(client, self.directory + '/fields', chunk_size=10)
+        saves = []
+        save = importer.checkpoint.save
+        importer.checkpoint.save = lambda: (saves.append(1), save())
+        board = importer.run()
+        # Once per chunk and once per stage (8), not once per object
+        self.assertGreater(len(importer.ids), 200)
+        self.assertLessEqual(len(saves), len(importer.ids) // 10 + 2 * 8)
+
+        # The list options were mapped for the values set afterwards
+        options = dict((option['id'], option['value']['text'])
+                       for field in server.handle('GET', 'boards/%s/customFields' % board.id, {}).json()
+                       for option in field.get('options') or [])
+        values = [item['idValue'] for items in server.custom_field_items.values()
+                  for item in items.values() if item.get('idValue') in options]
+        self.assertEqual(len(values), 40)
+
+    def test_import_again_is_a_no_op(self):
+        importer = BoardImporter(self.client, self.directory, chunk_size=7)
+        board = importer.run()
+        requests = self.server.request_count
+        self.assertEqual(BoardImporter(self.client, self.directory).run().id, board.id)
+        # Only the final get_board
+        self.assertLessEqual(self.server.request_count - requests, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
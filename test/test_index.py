@@ -0,0 +1,74 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import datetime
+import unittest
+import pytz
+from trello import TrelloClient
+from trello.fakeserver import FakeTrello
+from trello.index import CardIndex
+
+
+class CardIndexTestCase(unittest.TestCase):
+    """
+    Tests of the card index, on a synthetic board of the in-memory Trello API.
+    Every query is checked against a scan of all the cards.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        board_id = self.server.add_synthetic_board(lists=4, cards=200, labels=5, custom_fields=3)
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.board = self.client.get_board(board_id)
+        self.cards = self.board.all_cards()
+        self.index = CardIndex(self.cards)
+
+    def assertQuery(self, criteria, predicate):
+        expected = set(card.id for card in self.cards if predicate(card))
+        self.assertEqual(self.index.query_ids(**criteria), expected)
+        self.assertTrue(expected, 'the query should match some cards')
+
+    def test_hash_indexes(self):
+        card = self.cards[0]
+        list_id = self.cards[1].idList
+        label_id = [c for c in self.cards if c.idLabels][0].idLabels[0]
+        self.assertQuery({'list_id': list_id}, lambda c: c.idList == list_id)
+        self.assertQuery({'list_id': [list_id, card.idList]}, lambda c: c.idList in (list_id, card.idList))
+        self.assertQuery({'list_id': list_id, 'label_ids': [label_id]},
+                         lambda c: c.idList == list_id and label_id in c.idLabels)
+        member_id = [c for c in self.cards if c.idMembers][0].idMembers[0]
+        self.assertQuery({'member_ids': [member_id], 'closed': False},
+                         lambda c: member_id in c.idMembers and not c.closed)
+        self.assertEqual(len(self.index.query(list_id='missing')), 0)
+
+    def test_custom_fields(self):
+        field = [f for f in self.cards[0].customFields if f.type == 'number'][0]
+        by_id = self.index.query_ids(custom_fields={field.definition_id: field.value})
+        self.assertEqual(self.index.query_ids(custom_fields={field.name: field.value}), by_id)
+        self.assertIn(self.cards[0].id, by_id)
+
+    def test_sorted_indexes(self):
+        now = datetime.datetime.now(pytz.utc)
+        later = now + datetime.timedelta(days=1)
+        self.assertQuery({'due_before': later},
+                         lambda c: c.due and c.due_date < later)
+        self.assertQuery({'active_after': now - datetime.timedelta(days=1)},
+                         lambda c: c.dateLastActivity >= now - datetime.timedelta(days=1))
+        due = self.index.due_between(before=later)
+        self.assertEqual([c.due_date for c in due], sorted(c.due_date for c in due))
+
+    def test_update_and_remove(self):
+        card = self.cards[0]
+        old_list = card.idList
+        new_list = [c.idList for c in self.cards if c.idList != old_list][0]
+        card.idList = new_list
+        self.index.update(card)
+        self.assertIn(card.id, self.index.query_ids(list_id=new_list))
+        self.assertNotIn(card.id, self.index.query_ids(list_id=old_list))
+        self.index.remove(card.id)
+        self.assertNotIn(card.id, self.index)
+        self.assertNotIn(card.id, self.index.query_ids(list_id=new_list))
+        self.assertEqual(len(self.index), len(self.cards) - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
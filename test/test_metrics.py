@@ -0,0 +1,78 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import unittest
+from trello import TrelloClient, ResourceUnavailable
+from trello.fakeserver import FakeResponse, FakeTrello
+from trello.metrics import RequestRecord, endpoint_template
+
+
+class MetricsTestCase(unittest.TestCase):
+    """
+    Tests of the request hooks and metrics, against the in-memory Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        self.board_id = self.server.add_synthetic_board(lists=2, cards=5)
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+
+    def test_endpoint_template(self):
+        card_id = '5a1b2c3d4e5f60718293a4b5'
+        self.assertEqual(endpoint_template('/cards/' + card_id + '/checklists'),
+                         '/cards/{id}/checklists')
+        self.assertEqual(endpoint_template('cards/abcd1234/checklist/' + card_id + '/checkItem/x'),
+                         '/cards/{id}/checklist/{id}/checkItem/{id}')
+        self.assertEqual(endpoint_template('/boards/' + card_id + '/cards/open'),
+                         '/boards/{id}/cards/open')
+        self.assertEqual(endpoint_template('/members/me/boards/?filter=all'), '/members/{id}/boards')
+        self.assertEqual(endpoint_template('/search'), '/search')
+
+    def test_hooks(self):
+        requests, responses = [], []
+        self.client.request_hooks.append(lambda record: requests.append(record.response))
+        self.client.response_hooks.append(responses.append)
+        board = self.client.get_board(self.board_id)
+        board.all_cards()
+        self.assertEqual(requests, [None] * len(responses))
+        record = [r for r in responses if r.endpoint == '/boards/{id}/cards'][0]
+        self.assertEqual(record.method, 'GET')
+        self.assertEqual(record.caller, 'Board.get_cards')
+        self.assertEqual(record.status_code, 200)
+        self.assertTrue(record.size > 0)
+        self.assertTrue(record.elapsed >= 0)
+
+    def test_metrics(self):
+        board = self.client.get_board(self.board_id)
+        board.all_cards()
+        board.all_cards()
+        self.assertRaises(ResourceUnavailable, self.client.get_card, 'missing')
+        report = self.client.metrics.report()
+        self.assertEqual(report['GET /boards/{id}/cards']['count'], 2)
+        self.assertEqual(report['GET /boards/{id}/cards']['errors'], 0)
+        self.assertEqual(sum(report['GET /boards/{id}/cards']['histogram'].values()), 2)
+        self.assertEqual(report['GET /cards/{id}']['errors'], 1)
+        self.client.metrics.reset()
+        self.assertEqual(self.client.metrics.report(), {})
+
+    def test_failed(self):
+        record = RequestRecord('POST', '/cards', {}, {})
+        for status_code, failed in ((200, False), (201, False), (204, False), (304, True), (429, True)):
+            record.response = FakeResponse(status_code)
+            self.assertEqual(record.failed, failed)
+        record.response, record.error = None, IOError()
+        self.assertTrue(record.failed)
+
+    def test_track_requests(self):
+        card = self.client.get_board(self.board_id).all_cards()[0]
+        with self.client.track_requests() as tracker:
+            card.fetch(eager=False)
+            card.get_comments()
+        self.assertEqual(tracker.count, 2)
+        self.assertEqual(tracker.by_caller['Card.fetch'], 1)
+        self.assertEqual(tracker.by_endpoint['GET /cards/{id}/actions'], 1)
+        self.assertTrue(tracker.wall_time >= tracker.time)
+        self.assertEqual(self.client.response_hooks, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import os
+import shutil
+import tempfile
+import unittest
+from trello import TrelloClient
+from trello.fakeserver import FakeTrello
+
+
+class NotificationsTestCase(unittest.TestCase):
+    """
+    Tests of the paged notifications of a member, on the in-memory Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.ids = [self.server.add_notification(notification_type='mentionedOnCard' if i % 3 else 'commentCard')
+                    for i in range(25)]
+        self.member = self.client.get_member('me')
+        self.directory = tempfile.mkdtemp()
+        self.checkpoint_path = os.path.join(self.directory, 'notifications.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_iter_notifications(self):
+        with self.client.track_requests() as tracker:
+            notifications = list(self.member.iter_notifications(page_size=10))
+        self.assertEqual([n['id'] for n in notifications], self.ids[::-1])
+        self.assertEqual(tracker.count, 3)
+        comments = list(self.member.iter_notifications(filters=['commentCard'], since=self.ids[10]))
+        self.assertEqual([n['id'] for n in comments], [self.ids[24], self.ids[21], self.ids[18],
+                                                      self.ids[15], self.ids[12]])
+
+    def test_cursor(self):
+        first = list(self.member.iter_notifications(checkpoint_path=self.checkpoint_path, page_size=10))
+        self.assertEqual(len(first), 25)
+        new = self.server.add_notification()
+        with self.client.track_requests() as tracker:
+            second = list(self.member.iter_notifications(checkpoint_path=self.checkpoint_path, page_size=10))
+        self.assertEqual([n['id'] for n in second], [new])
+        self.assertEqual(tracker.count, 1)
+        self.assertEqual(list(self.member.iter_notifications(checkpoint_path=self.checkpoint_path)), [])
+        # Other filters have their own cursor
+        comments = list(self.member.iter_notifications(filters=['commentCard'],
+                                                       checkpoint_path=self.checkpoint_path))
+        self.assertEqual(len(comments), 10)
+
+    def test_mark_read(self):
+        self.member.mark_notifications_read(self.ids[:5])
+        unread = list(self.member.iter_notifications(read_filter='unread'))
+        self.assertEqual(len(unread), 20)
+        self.member.mark_notifications_read(unread[:2])
+        self.member.mark_notifications_read([])
+        self.assertEqual(len(list(self.member.iter_notifications(read_filter='read'))), 7)
+        self.member.mark_notifications_read()
+        self.assertEqual(list(self.member.iter_notifications(read_filter='unread')), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
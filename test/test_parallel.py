@@ -0,0 +1,56 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from trello import TrelloClient
+from trello.fakeserver import FakeTrello
+from trello.parallel import cards_from_json
+
+
+def describe(cards):
+    return [(card.id, card.name, card.dateLastActivity, card.idLabels, [l.name for l in card.labels or []],
+             [(type(f), f.definition_id, f.value) for f in card.customFields],
+             [(c.name, [(i['name'], i['checked']) for i in c.items]) for c in card.checklists])
+            for card in cards]
+
+
+class ParallelTestCase(unittest.TestCase):
+    """
+    Tests of building cards with worker processes, on a synthetic board of
+    the in-memory Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        board_id = self.server.add_synthetic_board(cards=250, custom_fields=5)
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.board = self.client.get_board(board_id)
+        self.filters = {'filter': 'all', 'fields': 'all', 'customFieldItems': 'true'}
+
+    def test_same_cards(self):
+        expected = describe(self.board.get_cards(self.filters, prefetch=['checklists']))
+        self.assertEqual(describe(self.board.get_cards(self.filters, prefetch=['checklists'], processes=2)),
+                         expected)
+        json_objs = self.client.fetch_json('/boards/' + self.board.id + '/cards',
+                                           query_params=dict(self.filters, checklists='all'))
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(describe(cards_from_json(self.board, json_objs, processes=executor, chunk_size=7)),
+                             expected)
+
+    def test_unknown_definition(self):
+        json_objs = self.client.fetch_json('/boards/' + self.board.id + '/cards', query_params=self.filters)
+        definitions = self.board.get_custom_field_definitions()
+        self.board.customFieldDefinitions = definitions[1:]
+        # The items of the deleted definition are skipped, in both paths
+        expected = describe(cards_from_json(self.board, json_objs))
+        self.assertTrue(any(item['idCustomField'] == definitions[0].id
+                            for json_obj in json_objs for item in json_obj['customFieldItems']))
+        self.assertTrue(all(definition_id != definitions[0].id
+                            for card in expected for _, definition_id, _ in card[5]))
+        self.assertEqual(describe(cards_from_json(self.board, json_objs, processes=2)), expected)
+        self.board.customFieldDefinitions = definitions
+        self.assertEqual(cards_from_json(self.board, [], processes=2), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
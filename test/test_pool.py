@@ -0,0 +1,69 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import unittest
+from trello.exceptions import RateLimitExceeded
+from trello.fakeserver import FakeResponse, FakeTrello
+from trello.pool import TrelloClientPool
+
+
+class ReadOnlyTokens(object):
+    """http_service refusing the writes of some tokens"""
+
+    def __init__(self, server, read_only):
+        self.server = server
+        self.read_only = read_only
+
+    def request(self, method, url, auth=None, **kwargs):
+        if method != 'GET' and auth.client.resource_owner_key in self.read_only:
+            return FakeResponse(401, content=b'unauthorized permission requested')
+        return self.server.request(method, url, auth=auth, **kwargs)
+
+
+class TrelloClientPoolTestCase(unittest.TestCase):
+    """
+    Tests of the client spreading requests over several tokens, on the
+    in-memory Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello(tokens=['t1', 't2', 't3'])
+        self.board_id = self.server.add_synthetic_board(cards=20)
+
+    def test_reads_are_spread(self):
+        pool = TrelloClientPool('key', tokens=['t1', 't2', 't3'], http_service=self.server, rate=10, period=100)
+        board = pool.get_board(self.board_id)
+        for card in board.all_cards()[:10]:
+            card.fetch()
+        counts = sorted(pool.requests_by_token.values())
+        self.assertLessEqual(counts[-1] - counts[0], 1)
+        self.assertEqual(self.server.requests_by_token, pool.requests_by_token)
+        self.assertEqual(pool.metrics.report()['GET /cards/{id}']['count'], 10)
+
+    def test_rate_limited_token(self):
+        self.server.rate_limit = (4, 100)
+        # Another process uses all the requests of t1
+        for _ in range(4):
+            self.server.request('GET', 'https://api.trello.com/1/boards/' + self.board_id, params={'token': 't1'})
+        pool = TrelloClientPool('key', tokens=['t1', 't2', 't3'], http_service=self.server, rate=100)
+        for _ in range(8):
+            pool.fetch_json('/boards/' + self.board_id, query_params={'fields': 'name'})
+        self.assertEqual(pool.requests_by_token, {'t1': 1, 't2': 4, 't3': 4})
+        self.assertRaises(RateLimitExceeded, pool.fetch_json, '/boards/' + self.board_id)
+
+    def test_writes_stick(self):
+        pool = TrelloClientPool('key', tokens=['t1', 't2', ('t3', None)],
+                                http_service=ReadOnlyTokens(self.server, ['t1', 't2']))
+        card = pool.get_board(self.board_id).all_cards()[0]
+        with pool.track_requests() as tracker:
+            card.set_name('Renamed')
+            card.set_description('Changed')
+        self.assertEqual(tracker.count, 4)
+        self.assertEqual(tracker.errors, 2)
+        with pool.track_requests() as tracker:
+            card.set_name('Renamed again')
+        self.assertEqual((tracker.count, tracker.errors), (1, 0))
+        self.assertEqual(pool.get_card(card.id).name, 'Renamed again')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import json
+import random
+import unittest
+from trello import TrelloClient
+from trello.fakeserver import FakeResponse, FakeTrello
+from trello.positions import longest_increasing_subsequence, plan_order
+
+
+def json_objs(positions):
+    return [{'id': 'c%d' % i, 'pos': pos} for i, pos in enumerate(positions)]
+
+
+class RoundingService(object):
+    """http_service storing the positions rounded down, answering PUTs only"""
+
+    def request(self, method, url, **kwargs):
+        card_id = url.split('?')[0].rstrip('/').split('/')[-1]
+        return FakeResponse(200, body={'id': card_id, 'pos': float(int(json.loads(kwargs['data'])['pos']))})
+
+
+class PositionsTestCase(unittest.TestCase):
+    """
+    Tests of the reordering planner, from cached positions and against the
+    in-memory Trello API.
+    """
+
+    def test_longest_increasing_subsequence(self):
+        self.assertEqual(longest_increasing_subsequence([]), [])
+        self.assertEqual(longest_increasing_subsequence([3, 1, 2, None, 5, 4]), [1, 2, 5])
+        rng = random.Random(1)
+        values = [rng.random() for _ in range(200)]
+        indexes = longest_increasing_subsequence(values)
+        chosen = [values[i] for i in indexes]
+        self.assertEqual(chosen, sorted(chosen))
+        self.assertEqual(indexes, sorted(indexes))
+
+    def test_minimal_moves(self):
+        objs = json_objs([1024, 2048, 3072, 4096, 5120])
+        # c4 to the top: only it moves, between 0 and c0
+        plan = plan_order(objs, ['c4', 'c0', 'c1', 'c2', 'c3'])
+        self.assertEqual([(obj['id'], pos) for obj, pos in plan.moves], [('c4', 512.0)])
+        self.assertFalse(plan.rebalanced)
+        # c1 between c3 and c4, c0 to the bottom
+        plan = plan_order(objs, ['c2', 'c3', 'c1', 'c4', 'c0'])
+        self.assertEqual(len(plan), 2)
+        self.assertEqual(plan.positions, sorted(plan.positions))
+        self.assertEqual(plan.positions[-1], 5120 + 65536)
+        self.assertEqual(len(plan_order(objs, [obj['id'] for obj in objs])), 0)
+        self.assertRaises(ValueError, plan_order, objs, ['c0', 'c1'])
+
+    def test_rebalance(self):
+        plan = plan_order(json_objs([1024, 1025, 3072]), ['c0', 'c2', 'c1'])
+        self.assertEqual([(obj['id'], pos) for obj, pos in plan.moves], [('c2', 1024.5)])
+        # No float left between c0 and c1
+        plan = plan_order(json_objs([1.0, 1.0 + 1e-12, 3.0]), ['c0', 'c2', 'c1'])
+        self.assertTrue(plan.rebalanced)
+        self.assertEqual(plan.positions, [65536.0, 131072.0, 196608.0])
+        self.assertEqual(len(plan), 3)
+
+    def test_apply(self):
+        server = FakeTrello()
+        board_id = server.add_synthetic_board(lists=3, cards=40)
+        client = TrelloClient('key', token='token', http_service=server)
+        board = client.get_board(board_id)
+        list_ = board.open_lists()[0]
+        cards = list_.list_cards()
+        order = list(reversed(cards[:5])) + cards[5:]
+        with client.track_requests() as tracker:
+            plan = list_.reorder_cards(order)
+        self.assertEqual(len(plan), 4)
+        self.assertEqual(tracker.count, 4)
+        self.assertEqual([c.id for c in list_.list_cards()], [c.id for c in order])
+
+        # By id, from the fetched positions
+        shuffled = [c.id for c in cards]
+        random.Random(2).shuffle(shuffled)
+        list_.reorder_cards(shuffled)
+        self.assertEqual([c.id for c in list_.list_cards()], shuffled)
+
+        lists = board.open_lists()
+        board.reorder_lists([lists[2].id, lists[0].id, lists[1].id])
+        self.assertEqual([l.id for l in board.open_lists()], [lists[2].id, lists[0].id, lists[1].id])
+
+
+    def test_apply_keeps_stored_positions(self):
+        client = TrelloClient('key', token='token', http_service=RoundingService())
+        objects = json_objs([1.0, 2.0, 3.0])
+        plan = plan_order(objects, ['c2', 'c0', 'c1'])
+        self.assertEqual(plan.moves, [(objects[2], 0.5)])
+        plan.apply(client, kind='cards')
+        self.assertEqual(objects[2]['pos'], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
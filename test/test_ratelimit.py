@@ -0,0 +1,79 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import unittest
+from trello import TrelloClient
+from trello.exceptions import RateLimitExceeded
+from trello.fakeserver import FakeResponse, FakeTrello
+from trello.ratelimit import RateLimiter, call_with_retries
+
+
+class FakeClock(object):
+    """Clock whose sleep only advances the time"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    """
+    Tests of the token bucket and of the retries of rate limited requests,
+    with a fake clock so nothing actually waits.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(rate=10, period=1.0, clock=self.clock.time, sleep=self.clock.sleep)
+
+    def test_bucket(self):
+        for _ in range(10):
+            self.assertTrue(self.limiter.try_acquire())
+        self.assertFalse(self.limiter.try_acquire())
+        self.clock.now += 0.25
+        self.assertAlmostEqual(self.limiter.available, 2.5)
+        # Never more than rate tokens
+        self.clock.now += 100
+        self.assertEqual(self.limiter.available, 10)
+
+    def test_acquire_waits(self):
+        for _ in range(15):
+            self.limiter.acquire()
+        # 10 at once, then one every 0.1s
+        self.assertAlmostEqual(self.clock.now - 1000.0, 0.5)
+
+    def test_penalize(self):
+        self.limiter.penalize(2.0)
+        self.limiter.acquire()
+        self.assertAlmostEqual(self.clock.now - 1000.0, 2.1)
+
+    def test_call_with_retries(self):
+        client = TrelloClient('key', token='token', http_service=FakeTrello(), rate_limiter=self.limiter)
+        calls = []
+
+        def request():
+            calls.append(self.clock.now)
+            if len(calls) <= 2:
+                raise RateLimitExceeded('API_TOKEN_LIMIT_EXCEEDED', FakeResponse(429))
+            return 'done'
+
+        self.assertEqual(call_with_retries(client, request, max_retries=3), 'done')
+        self.assertEqual(len(calls), 3)
+        # The backoffs (1 then 2 seconds) empty the limiter, so the next
+        # request waits for them
+        client.rate_limiter.acquire()
+        self.assertGreaterEqual(self.clock.now - calls[0], 3.0)
+
+        del calls[:]
+        self.assertRaises(RateLimitExceeded, call_with_retries, client, request, (), 1)
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
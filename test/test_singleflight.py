@@ -0,0 +1,107 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from trello import TrelloClient, ResourceUnavailable
+from trello.fakeserver import FakeTrello
+from trello.singleflight import SingleFlight
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    """
+    Tests of the coalescing of identical concurrent GETs.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello(latency=0.2)
+        self.board_id = self.server.add_synthetic_board(lists=2, cards=5)
+        self.client = TrelloClient('key', token='token', http_service=self.server,
+                                   coalesce_requests=True)
+        self.path = '/boards/' + self.board_id + '/customFields'
+
+    def test_threads(self):
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(lambda _: self.client.fetch_json(self.path), range(5)))
+        self.assertEqual(self.server.request_count, 1)
+        self.assertEqual(self.client.coalesced_requests, 4)
+        self.assertTrue(all(result == results[0] for result in results))
+        # Every caller gets its own objects
+        self.assertFalse(any(result is results[0] for result in results[1:]))
+
+    def test_different_requests(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(self.client.fetch_json, [self.path, self.path + '?x=1']))
+        self.assertEqual(self.server.request_count, 2)
+        self.assertEqual(self.client.coalesced_requests, 0)
+
+    def test_asyncio(self):
+        try:
+            import asyncio
+        except ImportError:
+            self.skipTest('asyncio is not available')
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        futures = [self.client.fetch_json_async(self.path, loop=loop) for _ in range(3)]
+        results = loop.run_until_complete(asyncio.gather(*futures))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.server.request_count, 1)
+
+    def test_asyncio_running_loop(self):
+        try:
+            import asyncio
+        except ImportError:
+            self.skipTest('asyncio is not available')
+        if not hasattr(asyncio, 'get_running_loop'):
+            self.skipTest('asyncio.get_running_loop is not available')
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        futures = []
+        # Called by the running loop, without passing it
+        loop.call_soon(lambda: futures.extend(self.client.fetch_json_async(self.path) for _ in range(2)))
+        loop.run_until_complete(asyncio.sleep(0))
+        results = loop.run_until_complete(asyncio.gather(*futures))
+        self.assertEqual(len(results), 2)
+        self.assertEqual(self.server.request_count, 1)
+
+    def test_disabled_by_default(self):
+        client = TrelloClient('key', token='token', http_service=self.server)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(lambda _: client.fetch_json(self.path), range(3)))
+        self.assertEqual(self.server.request_count, 3)
+
+    def test_errors_are_shared(self):
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            threading.Event().wait(0.1)
+            raise ValueError('failed')
+
+        single_flight = SingleFlight()
+        errors = []
+
+        def call():
+            try:
+                single_flight.do('key', failing)
+            except ValueError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        call()
+        leader.join()
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(single_flight.coalesced, 1)
+
+    def test_not_found(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(self.client.fetch_json, '/cards/missing') for _ in range(2)]
+        for future in futures:
+            self.assertRaises(ResourceUnavailable, future.result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import unittest
+from trello import TrelloClient
+from trello.fakeserver import FakeTrello
+from trello.sync import BoardModel, diff
+
+
+def _card(**fields):
+    card = {'name': 'card', 'desc': '', 'list': 'Todo', 'pos': 1, 'closed': False,
+            'due': None, 'dueComplete': False, 'labels': frozenset(),
+            'custom_fields': {}, 'checklists': {}}
+    card.update(fields)
+    return card
+
+
+class BoardDiffTestCase(unittest.TestCase):
+    """
+    Tests for the board diff engine, on models built by hand so no API
+    access is needed.
+    """
+
+    def setUp(self):
+        self.source = BoardModel()
+        self.target = BoardModel()
+        for model in (self.source, self.target):
+            model.lists['Todo'] = {'name': 'Todo', 'pos': 1}
+            model.labels['bug'] = {'name': 'bug', 'color': 'red'}
+            model.cards['same'] = _card(name='same', labels=frozenset(['bug']))
+
+    def _operations(self, **kwargs):
+        return [(op.action, op.kind, op.key, op.changes)
+                for op in diff(self.source, self.target, **kwargs)]
+
+    def test_unchanged(self):
+        self.assertEqual(self._operations(), [])
+
+    def test_create(self):
+        self.source.lists['Done'] = {'name': 'Done', 'pos': 2}
+        self.source.cards['new'] = _card(name='new', list='Done')
+        operations = self._operations()
+        # Placed after the lists of the target, whatever its position in the source
+        self.assertIn(('create', 'list', 'Done', {'name': 'Done', 'pos': 65537.0}), operations)
+        self.assertEqual([op[:3] for op in operations if op[1] == 'card'],
+                         [('create', 'card', 'new')])
+
+    def test_move_and_update(self):
+        self.source.lists['Done'] = {'name': 'Done', 'pos': 2}
+        self.target.lists['Done'] = {'name': 'Done', 'pos': 2}
+        self.source.cards['same']['list'] = 'Done'
+        self.source.cards['same']['desc'] = 'New description'
+        self.assertEqual(self._operations(), [
+            ('move', 'card', 'same', {'list': 'Done', 'desc': 'New description', 'pos': 65536.0}),
+        ])
+
+    def test_checklists_and_custom_fields(self):
+        self.source.cards['same']['checklists'] = {'Steps': {'items': [('a', True), ('b', False)]}}
+        self.target.cards['same']['checklists'] = {'Steps': {'items': [('b', False), ('a', True)]},
+                                                   'Extra': {'items': []}}
+        self.source.cards['same']['custom_fields'] = {'Estimate': 3.0}
+        self.assertEqual(self._operations(delete=True), [
+            ('delete', 'checklist', ('same', 'Extra'), {}),
+            ('update', 'custom_field', ('same', 'Estimate'), {'value': 3.0}),
+        ])
+
+    def test_archive(self):
+        self.target.lists['Old'] = {'name': 'Old', 'pos': 3}
+        self.target.cards['old'] = _card(name='old')
+        self.assertEqual(self._operations(), [
+            ('archive', 'list', 'Old', {}),
+            ('archive', 'card', 'old', {}),
+        ])
+        self.assertEqual(self._operations(archive=False), [])
+
+    def test_delete(self):
+        self.target.labels['old'] = {'name': 'old', 'color': 'blue'}
+        # Deleting labels is opt-in
+        self.assertEqual(self._operations(), [])
+        self.assertEqual(self._operations(delete=True), [('delete', 'label', 'old', {})])
+
+    def test_order(self):
+        for i, name in enumerate(['a', 'b', 'c']):
+            self.source.cards[name] = _card(name=name, pos=100 * (i + 2))
+            self.target.cards[name] = _card(name=name, pos=10 * (i + 2))
+        # Same order, other positions
+        self.assertEqual(self._operations(), [])
+        self.source.cards['c']['pos'] = 50
+        self.source.lists['Todo']['pos'] = 1000
+        # Only c moves, between 'same' and a
+        self.assertEqual(self._operations(), [('update', 'card', 'c', {'pos': 10.5})])
+
+
+class BoardSyncTestCase(unittest.TestCase):
+    """
+    Tests of diffs applied to a board of the in-memory Trello API, then
+    compared again with the source.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        self.source = self.client.get_board(self.server.add_synthetic_board(
+            lists=3, cards=10, labels=4, custom_fields=3, checklists=2, check_items=2, seed=0))
+
+    def _sync(self, target, **kwargs):
+        plan = diff(BoardModel.from_board(self.source), BoardModel.from_board(target), **kwargs)
+        plan.apply(max_workers=4)
+        return plan
+
+    def test_round_trip(self):
+        target = self.client.get_board(self.server.add_synthetic_board(
+            lists=4, cards=8, labels=2, custom_fields=3, checklists=1, check_items=3, seed=1))
+        plan = self._sync(target)
+        self.assertIn(('archive', 'list', 'List 3'), [op[:3] for op in plan])
+        self.assertEqual(len(diff(BoardModel.from_board(self.source), BoardModel.from_board(target))), 0)
+        self.assertEqual([l.name for l in target.get_lists('open')], ['List 0', 'List 1', 'List 2'])
+        self.assertEqual(sorted(card.name for card in target.open_cards()),
+                         sorted(card.name for card in self.source.open_cards()))
+
+    def test_keep_and_delete(self):
+        target = self.client.get_board(self.server.add_synthetic_board(
+            lists=4, cards=12, labels=6, custom_fields=0, checklists=3, check_items=2, seed=1))
+        target_cards = len(target.open_cards())
+        plan = self._sync(target, archive=False, delete=True)
+        self.assertNotIn('archive', [op.action for op in plan])
+        self.assertEqual(len(diff(BoardModel.from_board(self.source), BoardModel.from_board(target),
+                                  archive=False, delete=True)), 0)
+        # Lists and cards not in the source are kept, labels and checklists deleted
+        self.assertEqual(len(target.get_lists('open')), 4)
+        self.assertEqual(len(target.open_cards()), target_cards)
+        self.assertEqual(sorted(label.name for label in target.get_labels()),
+                         ['Label 0', 'Label 1', 'Label 2', 'Label 3'])
+        self.assertTrue(all(len(card.checklists) == 2 for card in target.get_cards(prefetch=['checklists'])
+                            if card.name in ('Card 0', 'Card 9')))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/python
+from __future__ import with_statement, print_function
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+import requests
+import trello.upload
+from trello import TrelloClient
+from trello.fakeserver import FakeResponse, FakeTrello
+from trello.ratelimit import RateLimiter
+from trello.upload import AttachmentUploader, MultipartFile, upload_attachment
+
+
+class RejectingService(object):
+    """http_service reading the first upload then rejecting it with a 429"""
+
+    def __init__(self, server):
+        self.server = server
+        self.rejected = 0
+
+    def request(self, method, url, **kwargs):
+        if '/attachments' in url and not self.rejected:
+            self.rejected += 1
+            list(kwargs['data'])
+            return FakeResponse(429, content=b'API_TOKEN_LIMIT_EXCEEDED')
+        return self.server.request(method, url, **kwargs)
+
+
+class UnseekableFile(io.BytesIO):
+    """File that cannot seek to its end"""
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_END:
+            raise IOError('Illegal seek')
+        return io.BytesIO.seek(self, offset, whence)
+
+
+class UploadTestCase(unittest.TestCase):
+    """
+    Tests of the streaming uploads, on the in-memory Trello API.
+    """
+
+    def setUp(self):
+        self.server = FakeTrello()
+        self.client = TrelloClient('key', token='token', http_service=self.server)
+        board = self.client.add_board('Uploads')
+        cards_list = board.add_list('Builds')
+        self.cards = [cards_list.add_card('Build %d' % i) for i in range(3)]
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(4):
+            path = os.path.join(self.directory, 'artifact-%d.tar.gz' % i)
+            with open(path, 'wb') as artifact:
+                artifact.write(os.urandom(100000 + i))
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def content(self, attachment):
+        return self.server.attachment_contents[attachment['id']]
+
+    def read(self, path):
+        with open(path, 'rb') as artifact:
+            return artifact.read()
+
+    def test_multipart_body(self):
+        body = MultipartFile(self.paths[0], fields={'name': 'Artifact'}, chunk_size=1000)
+        prepared = requests.Request('POST', 'https://api.trello.com/1/cards/x/attachments', data=body,
+                                    headers={'Content-Type': body.content_type}).prepare()
+        self.assertIs(prepared.body, body)
+        self.assertEqual(prepared.headers['Content-Length'], str(len(body)))
+        chunks = list(body)
+        self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks))
+        self.assertEqual(len(b''.join(chunks)), len(body))
+        self.assertEqual(body.mime_type, 'application/x-tar')
+        body.close()
+
+    def test_attach(self):
+        card = self.cards[0]
+        progress = []
+        attachment = card.attach(file=self.paths[0], progress=lambda sent, total: progress.append((sent, total)))
+        self.assertEqual(attachment['name'], 'artifact-0.tar.gz')
+        self.assertEqual(self.content(attachment), self.read(self.paths[0]))
+        self.assertEqual(progress[-1], (100000, 100000))
+        self.assertEqual(progress, sorted(progress))
+        self.assertGreater(len(progress), 1)
+
+        with open(self.paths[1], 'rb') as artifact:
+            mapped = mmap.mmap(artifact.fileno(), 0, access=mmap.ACCESS_READ)
+            attachment = card.attach(name='Mapped', mimeType='application/gzip', file=mapped)
+            mapped.close()
+        self.assertEqual((attachment['name'], attachment['mimeType']), ('Mapped', 'application/gzip'))
+        self.assertEqual(self.content(attachment), self.read(self.paths[1]))
+
+        attachment = card.attach(name='small.txt', file=io.BytesIO(b'hello'))
+        self.assertEqual(self.content(attachment), b'hello')
+
+    def test_uploader(self):
+        progress = {}
+
+        def report(source, sent, total):
+            progress[source] = sent
+
+        uploader = AttachmentUploader(self.client, max_workers=3, progress=report)
+        uploads = [(card, path) for card in self.cards for path in self.paths] + [(self.cards[0], 'missing')]
+        results = uploader.upload(uploads)
+        for (card, path), result in zip(uploads, results[:-1]):
+            self.assertIsNone(result.error)
+            self.assertEqual(result.card_id, card.id)
+            self.assertEqual(self.content(result.attachment), self.read(path))
+        self.assertIsInstance(results[-1].error, IOError)
+        self.assertEqual(progress[self.paths[3]], 100003)
+        self.assertEqual(len(self.cards[1].get_attachments()), 4)
+
+    def test_progress_after_retry(self):
+        client = TrelloClient('key', token='token', http_service=RejectingService(self.server),
+                              rate_limiter=RateLimiter(sleep=lambda seconds: None))
+        progress = []
+        attachment = upload_attachment(client, self.cards[0].id, self.paths[0],
+                                       progress=lambda sent, total: progress.append(sent))
+        self.assertEqual(self.content(attachment), self.read(self.paths[0]))
+        # The rejected upload, then the upload sent again from the start
+        restarts = [i for i in range(1, len(progress)) if progress[i] < progress[i - 1]]
+        self.assertEqual(len(restarts), 1)
+        self.assertEqual(progress[restarts[0] - 1], 100000)
+        self.assertEqual(progress[-1], 100000)
+
+    def test_file_closed_on_error(self):
+        opened = []
+
+        def unseekable_open(path, mode):
+            opened.append(UnseekableFile(b'content'))
+            return opened[-1]
+
+        trello.upload.open = unseekable_open
+        self.addCleanup(delattr, trello.upload, 'open')
+        self.assertRaises(IOError, MultipartFile, self.paths[0])
+        self.assertTrue(opened[0].closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,75 @@
 # -*- coding: utf-8 -*-
-from trello.attachments import *
-from trello.board import *
-from trello.card import *
-from trello.checklist import *
-from trello.exceptions import *
-from trello.label import *
-from trello.member import *
-from trello.organization import *
-from trello.star import*
-from trello.trelloclient import *
-from trello.trellolist import *
-from trello.webhook import *
-from trello.util import *
+import sys
+
+from trello.base import TrelloBase
+
+# Public names and the module defining them. On Python 3.7+ the modules
+# are only imported when one of their names is first used, so importing
+# trello does not import requests, dateutil... before they are needed.
+_LAZY_NAMES = {
+    'Attachments': 'trello.attachments',
+    'AttachmentsPreview': 'trello.attachments',
+    'Board': 'trello.board',
+    'Card': 'trello.card',
+    'Checklist': 'trello.checklist',
+    'ResourceUnavailable': 'trello.exceptions',
+    'Unauthorized': 'trello.exceptions',
+    'RateLimitExceeded': 'trello.exceptions',
+    'TokenError': 'trello.exceptions',
+    'Label': 'trello.label',
+    'Member': 'trello.member',
+    'Organization': 'trello.organization',
+    'Star': 'trello.star',
+    'TrelloClient': 'trello.trelloclient',
+    'List': 'trello.trellolist',
+    'WebHook': 'trello.webhook',
+    'create_oauth_token': 'trello.util',
+}
+
+# Modules whose names were all exported by trello before, looked up for
+# the names not listed above
+_STAR_MODULES = (
+    'trello.attachments', 'trello.board', 'trello.card', 'trello.checklist', 'trello.exceptions',
+    'trello.label', 'trello.member', 'trello.organization', 'trello.star', 'trello.trelloclient',
+    'trello.trellolist', 'trello.webhook', 'trello.util',
+)
+
+__all__ = ['TrelloBase'] + sorted(_LAZY_NAMES)
+
+if sys.version_info >= (3, 7):
+    import importlib
+
+    def __getattr__(name):
+        if name in _LAZY_NAMES:
+            value = getattr(importlib.import_module(_LAZY_NAMES[name]), name)
+        elif name.startswith('_'):
+            raise AttributeError("module 'trello' has no attribute %r" % name)
+        else:
+            for module_name in _STAR_MODULES:
+                module = importlib.import_module(module_name)
+                if hasattr(module, name):
+                    value = getattr(module, name)
+                    break
+            else:
+                raise AttributeError("module 'trello' has no attribute %r" % name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_NAMES))
+else:
+    from trello.attachments import *
+    from trello.board import *
+    from trello.card import *
+    from trello.checklist import *
+    from trello.exceptions import *
+    from trello.label import *
+    from trello.member import *
+    from trello.organization import *
+    from trello.star import*
+    from trello.trelloclient import *
+    from trello.trellolist import *
+    from trello.webhook import *
+    from trello.util import *
 
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+"""
+Board-wide analytics computed from the action history of a board.
+
+This module requires NumPy (``pip install py-trello[analytics]``). Actions
+are loaded once for the whole board and turned into arrays, so the stats
+of every card are computed with vectorized passes instead of one request
+and one Python loop per card as Card.get_stats_by_list does.
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+import time
+
+import numpy as np
+
+TIME_UNITS = {
+    'seconds': 1.0,
+    'minutes': 60.0,
+    'hours': 3600.0,
+    'days': 86400.0,
+}
+
+
+def parse_dates(date_strs):
+    """
+    Parse Trello dates (eg. '2017-05-29T10:12:00.123Z') to POSIX timestamps
+    in seconds, in a single vectorized pass.
+
+    :rtype: numpy array of float64
+    """
+    if len(date_strs) == 0:
+        return np.zeros(0, dtype=np.float64)
+    dates = np.char.rstrip(np.asarray(date_strs, dtype='U'), 'Z').astype('datetime64[ms]')
+    return dates.astype(np.int64) / 1000.0
+
+
+def created_timestamps(object_ids):
+    """
+    Creation timestamps of Trello objects, taken from the first 8 hexadecimal
+    digits of their ids.
+
+    :rtype: numpy array of float64
+    """
+    if len(object_ids) == 0:
+        return np.zeros(0, dtype=np.float64)
+    raw = np.frombuffer(np.asarray(object_ids, dtype='S8').tobytes(), dtype=np.uint8).reshape(-1, 8)
+    digits = np.where(raw >= ord('a'), raw - (ord('a') - 10), raw - ord('0')).astype(np.int64)
+    return (digits * (16 ** np.arange(7, -1, -1, dtype=np.int64))).sum(axis=1).astype(np.float64)
+
+
+def encode(values, categories=None):
+    """
+    Categorical encoding of a sequence of ids.
+
+    :values: sequence of ids
+    :categories: known categories, new ones are appended to them
+    :return: (categories, codes) where categories is a numpy array of ids
+        and codes the int64 index of each value in categories
+    """
+    values = np.asarray(values, dtype='U')
+    if categories is None:
+        categories, codes = np.unique(values, return_inverse=True)
+        return categories, codes.astype(np.int64)
+    categories = np.asarray(categories, dtype='U')
+    missing = np.setdiff1d(np.unique(values), categories)
+    if len(missing):
+        categories = np.concatenate([categories, missing])
+    order = np.argsort(categories, kind='mergesort')
+    codes = order[np.searchsorted(categories, values, sorter=order)]
+    return categories, codes.astype(np.int64)
+
+
+class ListMovements(object):
+    """
+    Columnar history of the moves of cards between lists: one row per
+    move, stored as arrays of card codes, source and destination list codes
+    and timestamps.
+    """
+
+    def __init__(self, card_ids, list_ids, card, from_list, to_list, timestamp, current_list=None):
+        """
+        :card_ids: array of card ids, indexed by card code
+        :list_ids: array of list ids, indexed by list code
+        :card: card code of each move
+        :from_list: source list code of each move
+        :to_list: destination list code of each move
+        :timestamp: POSIX timestamp of each move
+        :current_list: list code where each card currently is (-1 if unknown)
+        """
+        self.card_ids = card_ids
+        self.list_ids = list_ids
+        self.card = card
+        self.from_list = from_list
+        self.to_list = to_list
+        self.timestamp = timestamp
+        if current_list is None:
+            current_list = np.full(len(card_ids), -1, dtype=np.int64)
+        self.current_list = current_list
+
+    def __len__(self):
+        return len(self.card)
+
+    @classmethod
+    def from_actions(cls, actions, current_lists=None):
+        """
+        Build the movements from 'updateCard:idList' actions.
+
+        :actions: iterable of action json objects, other actions are ignored
+        :current_lists: optional dict {card_id: list_id} of the cards' current
+            lists, used for the time spent in the current list and for the
+            cards that never moved
+        """
+        card_ids, from_ids, to_ids, dates = [], [], [], []
+        for action in actions:
+            data = action['data']
+            if 'listBefore' not in data or 'listAfter' not in data:
+                continue
+            card_ids.append(data['card']['id'])
+            from_ids.append(data['listBefore']['id'])
+            to_ids.append(data['listAfter']['id'])
+            dates.append(action['date'])
+
+        current_lists = current_lists or {}
+        current_card_ids = list(current_lists.keys())
+        card_categories, codes = encode(card_ids + current_card_ids)
+        card, current_card = codes[:len(card_ids)], codes[len(card_ids):]
+
+        list_categories, list_codes = encode(from_ids + to_ids + [current_lists[c] for c in current_card_ids])
+        n = len(card_ids)
+        from_list, to_list, current = list_codes[:n], list_codes[n:2 * n], list_codes[2 * n:]
+
+        current_list = np.full(len(card_categories), -1, dtype=np.int64)
+        current_list[current_card] = current
+        return cls(card_categories, list_categories, card, from_list, to_list,
+                   parse_dates(dates), current_list)
+
+    @classmethod
+    def from_board(cls, board, since=None, before=None):
+        """
+        Load the movements of all the cards of a board with paged board
+        actions, plus one request for the current list of every card.
+
+        :board: the Board
+        :since: only consider moves after this date or action id
+        :before: only consider moves before this date or action id
+        """
+        query_params = {'filter': 'updateCard:idList', 'fields': 'data,date,type'}
+        if since:
+            query_params['since'] = since
+        if before:
+            query_params['before'] = before
+        actions = board.client.fetch_json_paged(
+            '/boards/' + board.id + '/actions', query_params=query_params)
+        cards = board.client.fetch_json(
+            '/boards/' + board.id + '/cards/all', query_params={'fields': 'idList'})
+        return cls.from_actions(actions, dict((c['id'], c['idList']) for c in cards))
+
+    def list_codes(self, list_ids):
+        """Codes of the given list ids, -1 for the ones never seen"""
+        index = dict((list_id, code) for code, list_id in enumerate(self.list_ids))
+        return np.array([index.get(list_id, -1) for list_id in list_ids], dtype=np.int64)
+
+    def dwell_stats(self, lists=None, done_list=None, now=None, time_unit='seconds'):
+        """
+        Time spent by every card in every list, and forward/backward moves
+        out of every list.
+
+        :lists: lists of the board, ordered by position, used to tell forward
+            from backward moves. If None, only times are computed.
+        :done_list: list that implies that the card is done, time is not
+            counted for cards currently in it
+        :now: POSIX timestamp the time in the current list is counted to,
+            defaults to the current time
+        :time_unit: 'seconds', 'minutes', 'hours' or 'days'
+        :rtype: DwellStats
+        """
+        if now is None:
+            now = time.time()
+        n_cards, n_lists = len(self.card_ids), len(self.list_ids)
+        created = created_timestamps(self.card_ids)
+
+        order = np.lexsort((self.timestamp, self.card))
+        card = self.card[order]
+        from_list = self.from_list[order]
+        to_list = self.to_list[order]
+        timestamp = self.timestamp[order]
+
+        # Each move ends the stay in its source list, which started at the
+        # previous move of the same card or at the creation of the card
+        first = np.ones(len(card), dtype=bool)
+        first[1:] = card[1:] != card[:-1]
+        start = np.empty_like(timestamp)
+        start[first] = created[card[first]]
+        start[~first] = timestamp[:-1][~first[1:]]
+
+        times = np.zeros((n_cards, n_lists), dtype=np.float64)
+        np.add.at(times, (card, from_list), timestamp - start)
+
+        # Stay in the current list, up to now
+        last_list = self.current_list.copy()
+        last_time = created.copy()
+        last = np.ones(len(card), dtype=bool)
+        last[:-1] = card[:-1] != card[1:]
+        last_list[card[last]] = np.where(last_list[card[last]] >= 0,
+                                         last_list[card[last]], to_list[last])
+        last_time[card[last]] = timestamp[last]
+        ongoing = last_list >= 0
+        if done_list is not None:
+            ongoing &= last_list != self.list_codes([done_list.id])[0]
+        times[np.nonzero(ongoing)[0], last_list[ongoing]] += now - last_time[ongoing]
+
+        forward = np.zeros((n_cards, n_lists), dtype=np.int64)
+        backward = np.zeros((n_cards, n_lists), dtype=np.int64)
+        if lists is not None:
+            rank = np.full(n_lists, -1, dtype=np.int64)
+            codes = self.list_codes([list_.id for list_ in lists])
+            known = codes >= 0
+            rank[codes[known]] = np.arange(len(codes))[known]
+            ranked = (rank[from_list] >= 0) & (rank[to_list] >= 0)
+            moving_forward = ranked & (rank[to_list] > rank[from_list])
+            moving_backward = ranked & (rank[to_list] < rank[from_list])
+            np.add.at(forward, (card[moving_forward], from_list[moving_forward]), 1)
+            np.add.at(backward, (card[moving_backward], from_list[moving_backward]), 1)
+
+        return DwellStats(self.card_ids, self.list_ids,
+                          times / TIME_UNITS[time_unit], forward, backward)
+
+
+class DwellStats(object):
+    """
+    Per card and per list stats: time spent in the list and number of
+    forward and backward moves out of it. Arrays are indexed by
+    [card code, list code].
+    """
+
+    def __init__(self, card_ids, list_ids, time, forward_moves, backward_moves):
+        self.card_ids = card_ids
+        self.list_ids = list_ids
+        self.time = time
+        self.forward_moves = forward_moves
+        self.backward_moves = backward_moves
+
+    def _card_code(self, card_id):
+        codes = np.nonzero(self.card_ids == card_id)[0]
+        if not len(codes):
+            raise KeyError(card_id)
+        return codes[0]
+
+    def _list_code(self, list_id):
+        codes = np.nonzero(self.list_ids == list_id)[0]
+        if not len(codes):
+            raise KeyError(list_id)
+        return codes[0]
+
+    def by_card(self, card_id):
+        """
+        Stats of a card, in the format of Card.get_stats_by_list
+
+        :return: dict of the form {list_id: {time: <time card was in that list>,
+            forward_moves: <number>, backward_moves: <number>}}
+        """
+        code = self._card_code(card_id)
+        return dict(
+            (list_id, {
+                'time': float(self.time[code, i]),
+                'forward_moves': int(self.forward_moves[code, i]),
+                'backward_moves': int(self.backward_moves[code, i]),
+            })
+            for i, list_id in enumerate(self.list_ids.tolist()))
+
+    def total_time(self):
+        """Total time spent by all the cards in each list
+
+        :return: dict {list_id: time}
+        """
+        return dict(zip(self.list_ids.tolist(), self.time.sum(axis=0).tolist()))
+
+    def percentiles(self, q=(50, 85, 95)):
+        """
+        Percentiles of the time spent in each list, over the cards that have
+        been in that list.
+
+        :q: percentiles to compute, between 0 and 100
+        :return: dict {list_id: numpy array of the percentiles} (NaN for lists
+            no card has been in)
+        """
+        spent = np.where(self.time > 0, self.time, np.nan)
+        empty = np.isnan(spent).all(axis=0)
+        result = np.full((len(q), len(self.list_ids)), np.nan)
+        if (~empty).any():
+            result[:, ~empty] = np.nanpercentile(spent[:, ~empty], q, axis=0)
+        return dict((list_id, result[:, i]) for i, list_id in enumerate(self.list_ids.tolist()))
+
+
+class CumulativeFlow(object):
+    """
+    Daily number of cards in each list (cumulative flow diagram) and
+    throughput, computed by replaying the action stream of a board in a
+    single pass. New actions can be fed as they arrive with update().
+
+    Cards whose first action replayed is not their creation (eg. when the
+    history is cut by the action limit) are counted in the list they were
+    in at the start, from the first action that tells it.
+    """
+
+    # Actions needed to follow the cards of a board
+    ACTION_FILTER = ('createCard,copyCard,convertToCardFromCheckItem,emailCard,'
+                     'updateCard:idList,updateCard:closed,moveCardToBoard,moveCardFromBoard,deleteCard')
+
+    # Actions adding a card to the board
+    CREATE_ACTIONS = ('createCard', 'copyCard', 'convertToCardFromCheckItem', 'emailCard', 'moveCardToBoard')
+
+    def __init__(self, done_lists=None):
+        """
+        :done_lists: ids of the lists where cards are done, entering them
+            counts in the throughput. If None, archiving a card does.
+        """
+        self.done_lists = set(done_lists) if done_lists is not None else None
+        self.list_ids = []
+        self._list_codes = {}
+        self._card_lists = {}
+        self._seen_cards = set()
+        self._initial = {}
+        self._event_days = []
+        self._event_lists = []
+        self._event_deltas = []
+        self._done_days = []
+        self._last_date = None
+        self._last_ids = set()
+
+    @classmethod
+    def from_board(cls, board, done_lists=None):
+        """Replay the whole action history of a board"""
+        flow = cls(done_lists=done_lists)
+        flow.update_from_board(board)
+        return flow
+
+    def update_from_board(self, board):
+        """Fetch and replay the actions of the board newer than the last ones seen"""
+        query_params = {'filter': self.ACTION_FILTER}
+        if self._last_date is not None:
+            query_params['since'] = self._last_date
+        actions = board.client.fetch_json_paged(
+            '/boards/' + board.id + '/actions', query_params=query_params)
+        self.update(actions)
+
+    def update(self, actions):
+        """
+        Replay new actions. Actions already seen or older than the last one
+        seen are skipped.
+
+        :actions: iterable of action json objects, in any order
+        """
+        actions = sorted(
+            (a for a in actions if self._last_date is None or a['date'] > self._last_date or
+             (a['date'] == self._last_date and a['id'] not in self._last_ids)),
+            key=lambda action: action['date'])
+        if not actions:
+            return
+        days = (parse_dates([a['date'] for a in actions]) // 86400).astype(np.int64).tolist()
+
+        for day, action in zip(days, actions):
+            data = action['data']
+            card_id = data.get('card', {}).get('id')
+            action_type = action['type']
+            if action_type in self.CREATE_ACTIONS:
+                self._enter(card_id, data.get('list', {}).get('id'), day)
+            elif action_type in ('moveCardFromBoard', 'deleteCard'):
+                self._leave(card_id, data.get('list', {}).get('id'), day)
+            elif 'listAfter' in data:
+                self._leave(card_id, data['listBefore']['id'], day)
+                self._enter(card_id, data['listAfter']['id'], day)
+            elif 'closed' in data.get('old', {}):
+                if data['card'].get('closed'):
+                    self._leave(card_id, data.get('list', {}).get('id'), day)
+                    if self.done_lists is None:
+                        self._done_days.append(day)
+                else:
+                    self._enter(card_id, data.get('list', {}).get('id'), day)
+
+        last_date = actions[-1]['date']
+        if last_date != self._last_date:
+            self._last_ids = set()
+        self._last_date = last_date
+        self._last_ids.update(a['id'] for a in actions if a['date'] == last_date)
+
+    def _list_code(self, list_id):
+        if list_id not in self._list_codes:
+            self._list_codes[list_id] = len(self.list_ids)
+            self.list_ids.append(list_id)
+        return self._list_codes[list_id]
+
+    def _event(self, day, list_id, delta):
+        self._event_days.append(day)
+        self._event_lists.append(self._list_code(list_id))
+        self._event_deltas.append(delta)
+
+    def _enter(self, card_id, list_id, day):
+        self._seen_cards.add(card_id)
+        if list_id is None:
+            return
+        self._card_lists[card_id] = list_id
+        self._event(day, list_id, 1)
+        if self.done_lists is not None and list_id in self.done_lists:
+            self._done_days.append(day)
+
+    def _leave(self, card_id, list_id, day):
+        if card_id in self._card_lists:
+            # The list the card is known to be in wins over the action data
+            list_id = self._card_lists.pop(card_id)
+        elif card_id in self._seen_cards:
+            # Already out of the lists, eg. deleted after being archived
+            return
+        elif list_id is not None:
+            # First seen leaving list_id, so it was there from the start
+            self._seen_cards.add(card_id)
+            self._list_code(list_id)
+            self._initial[list_id] = self._initial.get(list_id, 0) + 1
+        if list_id is not None:
+            self._event(day, list_id, -1)
+
+    def _day_range(self, until=None):
+        first = min(self._event_days + self._done_days)
+        last = max(self._event_days + self._done_days)
+        if until is not None:
+            last = max(last, int(parse_dates([until])[0] // 86400))
+        return first, last
+
+    def counts(self, until=None):
+        """
+        Number of cards in each list at the end of each day, from the day of
+        the first action to the last one (or until the given date).
+
+        :until: optional Trello date string to extend the series to
+        :return: (days, counts) where days is an array of datetime64[D] and
+            counts an int64 array indexed by [day, list code] (see list_ids)
+        """
+        if not self._event_days:
+            return np.zeros(0, dtype='datetime64[D]'), np.zeros((0, len(self.list_ids)), dtype=np.int64)
+        first, last = self._day_range(until)
+        deltas = np.zeros((last - first + 1, len(self.list_ids)), dtype=np.int64)
+        np.add.at(deltas, (np.asarray(self._event_days) - first, np.asarray(self._event_lists)),
+                  np.asarray(self._event_deltas))
+        deltas[0] += [self._initial.get(list_id, 0) for list_id in self.list_ids]
+        days = np.arange(first, last + 1).astype('datetime64[D]')
+        return days, np.cumsum(deltas, axis=0)
+
+    def throughput(self, period='day', until=None):
+        """
+        Number of cards done per day or per week.
+
+        :period: 'day' or 'week' (weeks start on Monday)
+        :until: optional Trello date string to extend the series to
+        :return: (periods, counts) where periods is an array of datetime64[D]
+            with the first day of each period and counts an int64 array
+        """
+        if not self._done_days:
+            return np.zeros(0, dtype='datetime64[D]'), np.zeros(0, dtype=np.int64)
+        first, last = self._day_range(until)
+        done_days = np.asarray(self._done_days)
+        if period == 'week':
+            # Day 0 of the epoch is a Thursday
+            offset = (first + 3) % 7
+            first -= offset
+            bins = (done_days - first) // 7
+            counts = np.bincount(bins, minlength=(last - first) // 7 + 1)
+            periods = np.arange(first, last + 1, 7).astype('datetime64[D]')
+        elif period == 'day':
+            counts = np.bincount(done_days - first, minlength=last - first + 1)
+            periods = np.arange(first, last + 1).astype('datetime64[D]')
+        else:
+            raise ValueError('Unknown period ({})'.format(period))
+        return periods, counts.astype(np.int64)
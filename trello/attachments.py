@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
-from dateutil import parser as dateparser
-
 from trello.base import TrelloBase
+from trello.compat import lazy_import
+
+dateparser = lazy_import('dateutil.parser')
 
 
 class Attachments(TrelloBase):
@@ -36,6 +37,19 @@ class Attachments(TrelloBase):
 
         return Attachments(id, bytes, date, edge_color, idMember, is_upload, mime_type, name, previews, url)
 
+    def preview_for(self, width, height):
+        """
+        Smallest preview at least width x height pixels, None if there is
+        no such preview (the attachment itself is then the best fit)
+
+        :rtype: AttachmentsPreview
+        """
+        previews = [preview for preview in self.previews or []
+                    if preview.url and (preview.width or 0) >= width and (preview.height or 0) >= height]
+        if not previews:
+            return None
+        return min(previews, key=lambda preview: (preview.width * preview.height, preview.bytes or 0))
+
     def __repr__(self):
         return u"<Attachments {0}>".format(self.name)
 
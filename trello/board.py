@@ -4,12 +4,13 @@ from __future__ import with_statement, print_function, absolute_import
 from trello.base import TrelloBase
 from trello.member import Member
 from trello.card import Card
-from trello.compat import force_str
+from trello.compat import force_str, lazy_import
 from trello.trellolist import List
 from trello.label import Label
 from trello.checklist import Checklist
 from trello.customfield import CustomFieldDefinition
-from dateutil import parser as dateparser
+
+dateparser = lazy_import('dateutil.parser')
 
 
 class Board(TrelloBase):
@@ -57,13 +58,13 @@ class Board(TrelloBase):
 		:json_obj: the json board object
 		"""
 		if organization is None:
-			board = Board(client=trello_client, board_id=json_obj['id'], name=json_obj['name'])
+			board = Board(client=trello_client, board_id=json_obj['id'], name=json_obj.get('name', ''))
 		else:
-			board = Board(organization=organization, board_id=json_obj['id'], name=json_obj['name'])
+			board = Board(organization=organization, board_id=json_obj['id'], name=json_obj.get('name', ''))
 
 		board.description = json_obj.get('desc', '')
-		board.closed = json_obj['closed']
-		board.url = json_obj['url']
+		board.closed = json_obj.get('closed')
+		board.url = json_obj.get('url')
 
 		return board
 
@@ -132,44 +133,72 @@ class Board(TrelloBase):
 		obj = self.client.fetch_json('/lists/' + list_id)
 		return List.from_json(board=self, json_obj=obj)
 
-	def all_lists(self):
+	def all_lists(self, fields=None):
 		"""Returns all lists on this board
 
 		:rtype: list of List
 		"""
-		return self.get_lists('all')
+		return self.get_lists('all', fields=fields)
 
-	def open_lists(self):
+	def open_lists(self, fields=None):
 		"""Returns all open lists on this board
 
 		:rtype: list of List
 		"""
-		return self.get_lists('open')
+		return self.get_lists('open', fields=fields)
 
-	def closed_lists(self):
+	def closed_lists(self, fields=None):
 		"""Returns all closed lists on this board
 
 		:rtype: list of List
 		"""
-		return self.get_lists('closed')
+		return self.get_lists('closed', fields=fields)
 
-	def get_lists(self, list_filter):
+	def get_lists(self, list_filter, fields=None):
 		"""Get lists from filter
 
+		:fields: comma separated list fields to load, eg. 'name,pos'
+			(Trello's default fields by default)
 		:rtype: list of List
 		"""
-		# error checking
+		query_params = {'cards': 'none', 'filter': list_filter}
+		if fields:
+			query_params['fields'] = fields
 		json_obj = self.client.fetch_json(
 				'/boards/' + self.id + '/lists',
-				query_params={'cards': 'none', 'filter': list_filter})
+				query_params=query_params)
 		return [List.from_json(board=self, json_obj=obj) for obj in json_obj]
 
-	def list_lists(self, list_filter='all'):
+	def list_lists(self, list_filter='all', fields=None):
 		"""Get lists from filter
 
 		:rtype: list of List
 		"""
-		return self.get_lists(list_filter=list_filter)
+		return self.get_lists(list_filter=list_filter, fields=fields)
+
+	def reorder_lists(self, order, lists=None, max_workers=8):
+		"""
+		Put the lists of this board in a new order, moving as few of them
+		as possible, in parallel (see trello.positions).
+
+		:order: the Lists of this board or their ids, in the new order
+		:lists: the Lists with their current positions. By default the
+			Lists of order, or if it holds ids, the ids and positions of
+			the open lists fetched with one request.
+		:max_workers: number of lists moved in parallel
+		:rtype: trello.positions.PositionPlan
+		"""
+		from trello.positions import plan_order
+		if lists is None:
+			if any(isinstance(list_, (str, type(u''))) for list_ in order):
+				lists = self.client.fetch_json(
+					'/boards/' + self.id + '/lists',
+					query_params={'cards': 'none', 'filter': 'open', 'fields': 'pos'})
+			else:
+				lists = order
+		plan = plan_order(lists, order)
+		plan.apply(self.client, 'lists', max_workers=max_workers)
+		return plan
 
 	def get_custom_field_definitions(self):
 		"""Get all custom field definitions for this board
@@ -251,100 +280,140 @@ class Board(TrelloBase):
 		    	post_args={'id': label_id}, )
 		return json_obj
 
-	def all_cards(self, custom_field_items='true'):
+	def all_cards(self, custom_field_items='true', prefetch=None, fields='all'):
 		"""Returns all cards on this board
 
+		:prefetch: card resources to load along with the cards, see get_cards
+		:fields: comma separated card fields to load, eg. 'name,idList'
+
 		:rtype: list of Card
 		"""
 		filters = {
 			'filter': 'all',
-			'fields': 'all',
+			'fields': fields,
 			'customFieldItems': custom_field_items
 		}
-		return self.get_cards(filters)
+		return self.get_cards(filters, prefetch=prefetch)
 
-	def open_cards(self, custom_field_items='true'):
+	def open_cards(self, custom_field_items='true', prefetch=None, fields='all'):
 		"""Returns all open cards on this board
 
+		:prefetch: card resources to load along with the cards, see get_cards
+		:fields: comma separated card fields to load, eg. 'name,idList'
+
 		:rtype: list of Card
 		"""
 		filters = {
 			'filter': 'open',
-			'fields': 'all',
+			'fields': fields,
 			'customFieldItems': custom_field_items
 		}
-		return self.get_cards(filters)
+		return self.get_cards(filters, prefetch=prefetch)
 
-	def closed_cards(self, custom_field_items='true'):
+	def closed_cards(self, custom_field_items='true', prefetch=None, fields='all'):
 		"""Returns all closed cards on this board
 
+		:prefetch: card resources to load along with the cards, see get_cards
+		:fields: comma separated card fields to load, eg. 'name,idList'
+
 		:rtype: list of Card
 		"""
 		filters = {
 			'filter': 'closed',
-			'fields': 'all',
+			'fields': fields,
 			'customFieldItems': custom_field_items
 		}
-		return self.get_cards(filters)
+		return self.get_cards(filters, prefetch=prefetch)
 
-	def get_cards(self, filters=None, card_filter=""):
+	def get_cards(self, filters=None, card_filter="", prefetch=None, processes=None):
 		"""
 		:filters: dict containing query parameters. Eg. {'fields': 'all'}
 		:card_filter: filters on card status ('open', 'closed', 'all')
+		:prefetch: list of card resources to load for all the cards at once,
+			among 'checklists', 'comments', 'attachments', 'members' and
+			'plugin_data'. Comments cost one extra board-level request, the
+			other resources are nested in the card listing.
+		:processes: number of processes (or a process pool executor)
+			building the cards of a large board, see trello.parallel. Off by
+			default: it only pays off with several cores, on a single core
+			starting the workers and sending them the cards makes it slower.
 
 		More info on card queries:
 		https://trello.com/docs/api/board/index.html#get-1-boards-board-id-cards
 
 		:rtype: list of Card
 		"""
+		query_params = dict(filters or {})
+		query_params.update(Card.prefetch_query_params(prefetch))
 		json_obj = self.client.fetch_json(
 				'/boards/' + self.id + '/cards/' + card_filter,
-				query_params=filters
+				query_params=query_params
 		)
 
-		return list([Card.from_json(self, json) for json in json_obj])
+		if processes:
+			from trello.parallel import cards_from_json
+			cards = cards_from_json(self, json_obj, processes=processes)
+		else:
+			cards = list([Card.from_json(self, json) for json in json_obj])
+		if prefetch and 'comments' in prefetch:
+			comments = self.client.fetch_json_paged(
+					'/boards/' + self.id + '/actions',
+					query_params={'filter': 'commentCard'})
+			Card.set_prefetched_comments(cards, comments)
+		return cards
+
+	def card_ids(self, card_filter='open'):
+		"""Ids of the cards of this board, listed without any other field
+
+		:card_filter: 'open', 'closed' or 'all'
+		:rtype: list of str
+		"""
+		json_obj = self.client.fetch_json(
+				'/boards/' + self.id + '/cards/' + card_filter,
+				query_params={'fields': 'id'})
+		return [card['id'] for card in json_obj]
 
-	def all_members(self):
+	def all_members(self, fields='all'):
 		"""Returns all members on this board
 
 		:rtype: list of Member
 		"""
 		filters = {
 			'filter': 'all',
-			'fields': 'all'
+			'fields': fields
 		}
 		return self.get_members(filters)
 
-	def normal_members(self):
+	def normal_members(self, fields='all'):
 		"""Returns all normal members on this board
 
 		:rtype: list of Member
 		"""
 		filters = {
 			'filter': 'normal',
-			'fields': 'all'
+			'fields': fields
 		}
 		return self.get_members(filters)
 
-	def admin_members(self):
+	def admin_members(self, fields='all'):
 		"""Returns all admin members on this board
 
 		:rtype: list of Member
 		"""
 		filters = {
 			'filter': 'admins',
-			'fields': 'all'
+			'fields': fields
 		}
 		return self.get_members(filters)
 
-	def owner_members(self):
+	def owner_members(self, fields='all'):
 		"""Returns all owner members on this board
 
 		:rtype: list of Member
 		"""
 		filters = {
 			'filter': 'owners',
-			'fields': 'all'
+			'fields': fields
 		}
 		return self.get_members(filters)
 
@@ -369,8 +438,8 @@ class Board(TrelloBase):
 			m.id = obj.get('id', '')
 			m.bio = obj.get('bio', '')
 			m.url = obj.get('url', '')
-			m.username = obj['username']
-			m.full_name = obj['fullName']
+			m.username = obj.get('username', '')
+			m.full_name = obj.get('fullName', '')
 			m.initials = obj.get('initials', '')
 			m.member_type = obj.get('memberType', '')
 			members.append(m)
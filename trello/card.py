@@ -2,19 +2,21 @@
 from __future__ import with_statement, print_function, absolute_import
 
 import datetime
+from contextlib import contextmanager
 from operator import itemgetter
 
-import pytz
-from dateutil import parser as dateparser
-
 from trello import TrelloBase
 from trello.attachments import Attachments
 from trello.checklist import Checklist
-from trello.compat import force_str
+from trello.compat import force_str, lazy_import
 from trello.label import Label
+from trello.member import Member
 from trello.organization import Organization
 from trello.customfield import CustomField, CustomFieldText, CustomFieldCheckbox, CustomFieldNumber, CustomFieldDate, CustomFieldList
 
+dateparser = lazy_import('dateutil.parser')
+pytz = lazy_import('pytz')
+
 
 class Card(TrelloBase):
     """
@@ -24,6 +26,19 @@ class Card(TrelloBase):
     https://developers.trello.com/advanced-reference/card
     """
 
+    # Query parameters nesting each prefetchable resource in a card listing.
+    # Comments are not nested, they are loaded from the parent actions.
+    PREFETCH_QUERY_PARAMS = {
+        'checklists': {'checklists': 'all'},
+        'attachments': {'attachments': 'true'},
+        'members': {'members': 'true'},
+        'plugin_data': {'pluginData': 'true'},
+        'comments': {},
+    }
+
+    # Local attributes changed by the setters, restored when a batch fails
+    _BATCH_ATTRIBUTES = ('name', 'desc', 'due', 'is_due_complete', 'pos', 'closed')
+
     @property
     def short_url(self):
         return self.shortUrl
@@ -103,6 +118,15 @@ class Card(TrelloBase):
             self._attachments = self.fetch_attachments()
         return self._attachments
 
+    @property
+    def members(self):
+        """
+        Lazily loads and returns the members
+        """
+        if self._members is None:
+            self._members = self.fetch_members()
+        return self._members
+
     def __init__(self, parent, card_id, name=''):
         """
         :parent: reference to the parent trello list
@@ -124,45 +148,59 @@ class Card(TrelloBase):
         self._comments = None
         self._plugin_data = None
         self._attachments = None
+        self._members = None
         self._labels = None
         self._json_obj = None
+        self._pending_update = None
 
     @classmethod
-    def from_json(cls, parent, json_obj):
+    def from_json(cls, parent, json_obj, prepared=None):
         """
         Deserialize the card json object to a Card object
 
         :parent: the list object that the card belongs to
         :json_obj: json object
+        :prepared: (dateLastActivity datetime, list of the CustomField
+            classes of the customFieldItems, None for the items of unknown
+            definitions) when already computed, see trello.parallel
 
         :rtype: Card
         """
         if 'id' not in json_obj:
             raise Exception("key 'id' is not in json_obj")
+        # The json object may only hold some fields (eg. a listing with
+        # fields='name,idList'), the others are None
         card = cls(parent,
                    json_obj['id'],
-                   name=json_obj['name'])
+                   name=json_obj.get('name', ''))
         card._json_obj = json_obj
         card.desc = json_obj.get('desc', '')
         card.due = json_obj.get('due', '')
-        card.is_due_complete = json_obj['dueComplete']
-        card.closed = json_obj['closed']
-        card.url = json_obj['url']
-        card.pos = json_obj['pos']
-        card.shortUrl = json_obj['shortUrl']
-        card.idMembers = json_obj['idMembers']
-        card.member_ids = json_obj['idMembers']
-        card.idLabels = json_obj['idLabels']
-        card.idBoard = json_obj['idBoard']
-        card.idList = json_obj['idList']
-        card.idShort = json_obj['idShort']
-        card.customFields = card.fetch_custom_fields(json_obj=json_obj)
-        card._labels = Label.from_json_list(card.board, json_obj['labels'])
-        card.dateLastActivity = dateparser.parse(json_obj['dateLastActivity'])
-        if "attachments" in json_obj:
-            card._attachments = []
-            for attachment_json in json_obj["attachments"]:
-                card._attachments.append(attachment_json)
+        card.is_due_complete = json_obj.get('dueComplete')
+        card.closed = json_obj.get('closed')
+        card.url = json_obj.get('url')
+        card.pos = json_obj.get('pos')
+        card.shortUrl = json_obj.get('shortUrl')
+        card.idMembers = json_obj.get('idMembers')
+        card.member_ids = json_obj.get('idMembers')
+        card.idLabels = json_obj.get('idLabels')
+        card.idBoard = json_obj.get('idBoard')
+        card.idList = json_obj.get('idList')
+        card.idShort = json_obj.get('idShort')
+        if prepared is None:
+            card.customFields = card.fetch_custom_fields(json_obj=json_obj)
+        else:
+            card.customFields = [field_class.from_json(card, item) for field_class, item
+                                 in zip(prepared[1], json_obj.get('customFieldItems', {}))
+                                 if field_class is not None]
+        if 'labels' in json_obj:
+            card._labels = Label.from_json_list(card.board, json_obj['labels'])
+        if prepared is None:
+            date_last_activity = json_obj.get('dateLastActivity')
+            card.dateLastActivity = dateparser.parse(date_last_activity) if date_last_activity else None
+        else:
+            card.dateLastActivity = prepared[0]
+        card._load_nested_resources(json_obj)
         if 'actions' in json_obj:
             card.actions = json_obj['actions']
         return card
@@ -174,11 +212,22 @@ class Card(TrelloBase):
         """
         Fetch all attributes for this card
 
-        :param eager: If eager, comments, checklists and attachments will be fetched immediately, otherwise on demand
-        """
+        :param eager: If eager, comments, checklists, attachments and plugin data
+            are fetched immediately, within the same request, otherwise on demand
+        """
+        query_params = {'badges': False, 'customFieldItems': 'true'}
+        if eager:
+            # Nested resources, so the whole card is loaded in one request
+            query_params.update({
+                'checklists': 'all',
+                'attachments': 'true',
+                'actions': 'commentCard',
+                'actions_limit': 1000,
+                'pluginData': 'true',
+            })
         json_obj = self.client.fetch_json(
             '/cards/' + self.id,
-            query_params={'badges': False, 'customFieldItems': 'true'})
+            query_params=query_params)
         self.id = json_obj['id']
         self.name = json_obj['name']
         self.desc = json_obj.get('desc', '')
@@ -200,11 +249,63 @@ class Card(TrelloBase):
         self.checked = json_obj['checkItemStates']
         self.dateLastActivity = dateparser.parse(json_obj['dateLastActivity'])
 
-        self._customFields = self.fetch_custom_fields(json_obj=json_obj)
-        self._plugin_data = self.fetch_plugin_data() if eager else None
-        self._checklists = self.fetch_checklists() if eager else None
-        self._comments = self.fetch_comments() if eager else None
-        self._attachments = self.fetch_attachments() if eager else None
+        self.customFields = self.fetch_custom_fields(json_obj=json_obj)
+        self._plugin_data = None
+        self._checklists = None
+        self._comments = None
+        self._attachments = None
+        self._load_nested_resources(json_obj)
+        if 'actions' in json_obj:
+            comments = [action for action in json_obj['actions'] if action['type'] == 'commentCard']
+            self._comments = sorted(comments, key=lambda comment: comment['date'])
+
+    @classmethod
+    def prefetch_query_params(cls, prefetch):
+        """
+        Query parameters to add to a card listing so the given resources
+        are loaded along with the cards.
+
+        :prefetch: iterable of resource names among 'checklists', 'comments',
+            'attachments', 'members' and 'plugin_data'
+        """
+        query_params = {}
+        for resource in prefetch or []:
+            if resource not in cls.PREFETCH_QUERY_PARAMS:
+                raise ValueError('Unknown resource to prefetch ({})'.format(resource))
+            query_params.update(cls.PREFETCH_QUERY_PARAMS[resource])
+        return query_params
+
+    @staticmethod
+    def set_prefetched_comments(cards, actions):
+        """
+        Distribute comment actions, eg. fetched for a whole board, to the
+        comments of the given cards. Cards without comments get an empty list.
+        """
+        comments_by_card = dict((card.id, []) for card in cards)
+        for action in actions:
+            card_id = action['data'].get('card', {}).get('id')
+            if card_id in comments_by_card:
+                comments_by_card[card_id].append(action)
+        for card in cards:
+            card._comments = sorted(comments_by_card[card.id], key=lambda comment: comment['date'])
+
+    def _load_nested_resources(self, json_obj):
+        """
+        Fill the lazy properties from the nested resources of a card json
+        object (checklists, attachments, members and plugin data), for the
+        ones that are present.
+        """
+        if 'checklists' in json_obj:
+            checked = json_obj.get('checkItemStates') or []
+            checklists = sorted(json_obj['checklists'], key=lambda checklist: checklist['pos'])
+            self._checklists = [Checklist(self.client, checked, cl, trello_card=self.id)
+                                for cl in checklists]
+        if 'attachments' in json_obj:
+            self._attachments = json_obj['attachments']
+        if 'members' in json_obj:
+            self._members = [Member.from_json(self.client, obj) for obj in json_obj['members']]
+        if 'pluginData' in json_obj:
+            self._plugin_data = json_obj['pluginData']
 
     def fetch_custom_fields(self, json_obj=None):
         """
@@ -261,6 +362,11 @@ class Card(TrelloBase):
             '/cards/' + self.id + '/pluginData')
         return items
 
+    def fetch_members(self):
+        json_obj = self.client.fetch_json(
+            '/cards/' + self.id + '/members')
+        return [Member.from_json(self.client, obj) for obj in json_obj]
+
     def fetch_attachments(self, force=False):
         if (force is True) or (self.badges['attachments'] > 0):
             items = self.client.fetch_json(
@@ -272,6 +378,15 @@ class Card(TrelloBase):
     def get_attachments(self):
         return [Attachments.from_json(attachments_json) for attachments_json in self.fetch_attachments(force=True)]
 
+    def download_attachments(self, directory, **kwargs):
+        """Download the files attached to this card to a directory, see
+        trello.download.AttachmentDownloader for the options
+
+        :rtype: list of DownloadResult
+        """
+        from trello.download import AttachmentDownloader
+        return AttachmentDownloader(self.client, directory, **kwargs).download(self.get_attachments())
+
     def fetch_actions(self, action_filter='createCard', since=None, before=None, action_limit=50):
         """
         Fetch actions for this card can give more argv to action_filter,
@@ -637,19 +752,27 @@ class Card(TrelloBase):
             '/cards/' + self.id + '/idMembers/' + member.id,
             http_method='DELETE')
 
-    def attach(self, name=None, mimeType=None, file=None, url=None):
+    def attach(self, name=None, mimeType=None, file=None, url=None, progress=None):
         """
         Add an attachment to the card. The attachment can be either a
         file or a url. Setting the name and/or mime type is optional.
         :param name: The name of the attachment
         :param mimeType: mime type for the attachement
-        :param file: a file-like, binary object that supports read()
+        :param file: a file-like, binary object that supports read(), or
+            the path of a file. Files that can seek (files on disk, mmaps...)
+            are streamed instead of being loaded in memory.
         :param url: a URL pointing to the resource to be attached
+        :param progress: function called with (bytes sent, total bytes)
+            while a streamed file is uploaded, from 0 again if the upload
+            is retried
         """
         if (file and url) or (not file and not url):
             raise Exception('Please provide either a file or url, and not both!')
 
         kwargs = {}
+        if file and (isinstance(file, (str, type(u''))) or _seekable(file)):
+            from trello.upload import upload_attachment
+            return upload_attachment(self.client, self.id, file, name, mimeType, progress=progress)
         if file:
             kwargs['files'] = dict(file=(name, file, mimeType))
         else:
@@ -670,18 +793,17 @@ class Card(TrelloBase):
             http_method='DELETE')
 
     def change_pos(self, position):
-        self.client.fetch_json(
-            '/cards/' + self.id + '/pos',
-            http_method='PUT',
-            post_args={'value': position})
+        self._set_remote_attribute('pos', position)
 
     def change_list(self, list_id):
-        self.client.fetch_json(
-            '/cards/' + self.id + '/idList',
-            http_method='PUT',
-            post_args={'value': list_id})
+        self._set_remote_attribute('idList', list_id)
 
     def change_board(self, board_id, list_id=None):
+        if self._pending_update is not None:
+            self._pending_update['idBoard'] = board_id
+            if list_id is not None:
+                self._pending_update['idList'] = list_id
+            return
         args = {'value': board_id}
         if list_id is not None:
             args['idList'] = list_id
@@ -724,11 +846,110 @@ class Card(TrelloBase):
         :param is_complete: boolean
         :return: None
         """
-        self.client.fetch_json('/cards/' + self.id + '/dueComplete',
-                               http_method='PUT',
-                               post_args={'value': is_complete})
+        self._set_remote_attribute('dueComplete', is_complete)
+        self.is_due_complete = is_complete
+
+    def update(self, **fields):
+        """Update several attributes of this card with a single request
+
+        The fields are given by their Trello name (name, desc, due,
+        dueComplete, pos, closed, idList, idBoard, idMembers, idLabels...).
+        Dates may be passed as datetime objects and idMembers/idLabels as
+        lists of ids.
+
+        :return: the updated card json object
+        """
+        post_args = {}
+        for attribute, value in fields.items():
+            if isinstance(value, datetime.datetime):
+                value = value.strftime('%Y-%m-%dT%H:%M:%S')
+            elif isinstance(value, (list, tuple)):
+                value = ','.join(value)
+            post_args[attribute] = value
+
+        json_obj = self.client.fetch_json(
+            '/cards/' + self.id,
+            http_method='PUT',
+            post_args=post_args)
+        self._update_from_json(json_obj)
+        return json_obj
+
+    @contextmanager
+    def batch_update(self):
+        """Context manager collecting the changes made by the setters of
+        this card (set_name, set_description, set_due, set_pos, set_closed,
+        change_list, change_board...) and sending them as one request
+        when the block exits. Nothing is sent if the block raises, and the
+        attributes changed by the setters get back their previous values.
+
+            with card.batch_update():
+                card.set_name('New name')
+                card.set_due(due)
+                card.change_list(list_id)
+        """
+        if self._pending_update is not None:
+            # Nested block, the outermost one sends the request
+            yield self
+            return
+
+        snapshot = dict((attribute, self.__dict__[attribute])
+                        for attribute in self._BATCH_ATTRIBUTES
+                        if attribute in self.__dict__)
+        self._pending_update = {}
+        try:
+            try:
+                yield self
+                pending = self._pending_update
+            finally:
+                self._pending_update = None
+            if pending:
+                self.update(**pending)
+        except BaseException:
+            for attribute in self._BATCH_ATTRIBUTES:
+                if attribute in snapshot:
+                    setattr(self, attribute, snapshot[attribute])
+                else:
+                    self.__dict__.pop(attribute, None)
+            raise
+
+    def _update_from_json(self, json_obj):
+        """Refresh the attributes of this card from a card json object"""
+        if 'name' in json_obj:
+            self.name = json_obj['name']
+        if 'desc' in json_obj:
+            self.desc = json_obj['desc']
+        if 'due' in json_obj:
+            self.due = json_obj['due'] or ''
+        if 'dueComplete' in json_obj:
+            self.is_due_complete = json_obj['dueComplete']
+        if 'closed' in json_obj:
+            self.closed = json_obj['closed']
+        if 'url' in json_obj:
+            self.url = json_obj['url']
+        if 'shortUrl' in json_obj:
+            self.shortUrl = json_obj['shortUrl']
+        if 'pos' in json_obj:
+            self.pos = json_obj['pos']
+        if 'idMembers' in json_obj:
+            self.idMembers = json_obj['idMembers']
+            self.member_ids = json_obj['idMembers']
+        if 'idLabels' in json_obj:
+            self.idLabels = json_obj['idLabels']
+        if 'labels' in json_obj:
+            self._labels = Label.from_json_list(self.board, json_obj['labels'])
+        if 'idBoard' in json_obj:
+            self.idBoard = json_obj['idBoard']
+        if 'idList' in json_obj:
+            self.idList = json_obj['idList']
+        if 'idShort' in json_obj:
+            self.idShort = json_obj['idShort']
+        if json_obj.get('dateLastActivity'):
+            self.dateLastActivity = dateparser.parse(json_obj['dateLastActivity'])
 
     def _set_remote_attribute(self, attribute, value):
+        if self._pending_update is not None:
+            self._pending_update[attribute] = value
+            return
         self.client.fetch_json(
             '/cards/' + self.id + '/' + attribute,
             http_method='PUT',
@@ -765,4 +986,14 @@ class Card(TrelloBase):
             raise ValueError('Unknown custom field name specified ({})'.format(cf_name))
         return cf_class(self, 'unknown', cf_def_id, '')
 
+
+def _seekable(file_obj):
+    if hasattr(file_obj, 'seekable'):
+        return file_obj.seekable()
+    try:
+        file_obj.tell()
+    except Exception:
+        return False
+    return hasattr(file_obj, 'seek')
+
 from trello.trellolist import List
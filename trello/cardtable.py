@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar table of cards for reporting over large boards.
+
+This module requires NumPy (``pip install py-trello[analytics]``). Instead
+of one Card object per card, a CardTable holds one array per attribute,
+so filtering, sorting and aggregating hundreds of thousands of cards are
+vectorized operations:
+
+    table = CardTable.from_board(board, card_filter='all')
+    open_cards = table.filter(~table.closed)
+    open_cards.group_by('list').count()
+    open_cards.group_by('member').mean('Estimate')
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+import gzip
+import json
+
+import numpy as np
+
+from trello.analytics import created_timestamps, encode, parse_dates
+
+# Card fields the table is built from
+CARD_FIELDS = 'id,idBoard,idList,pos,closed,dateLastActivity,due,dueComplete,idLabels,idMembers'
+
+
+class CardTable(object):
+    """
+    Cards stored as NumPy arrays, one row per card.
+
+    :ids: card ids
+    :board, list: int64 codes of the board and list of each card, indexing
+        board_ids and list_ids
+    :pos: float64 positions
+    :closed, due_complete: bool flags
+    :last_activity, due, created: float64 POSIX timestamps of the last
+        activity, of the due date (NaN when there is none) and of the
+        creation (taken from the id)
+    :fields: dict {custom field id: float64 array} of the numeric custom
+        fields, NaN for the cards without a value
+
+    Labels and members, of which a card can have several, are stored as
+    (row, code) pairs indexing label_ids and member_ids.
+    """
+
+    COLUMNS = ('ids', 'board', 'list', 'pos', 'closed', 'due_complete', 'last_activity', 'due', 'created')
+
+    # Categorical columns: name -> attribute holding the ids of the codes
+    CATEGORIES = {
+        'board': 'board_ids',
+        'list': 'list_ids',
+        'label': 'label_ids',
+        'member': 'member_ids',
+    }
+
+    def __init__(self, columns, board_ids, list_ids, labels, label_ids, members, member_ids,
+                 fields=None, field_names=None):
+        """
+        :columns: dict of the arrays of COLUMNS, all of the same length
+        :board_ids, list_ids, label_ids, member_ids: arrays of the ids of the
+            codes
+        :labels, members: (rows, codes) int64 arrays of the labels and
+            members of the cards
+        :fields: dict {custom field id: float64 array}
+        :field_names: dict {custom field name: custom field id}
+        """
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+        self.board_ids = board_ids
+        self.list_ids = list_ids
+        self.labels = labels
+        self.label_ids = label_ids
+        self.members = members
+        self.member_ids = member_ids
+        self.fields = fields or {}
+        self.field_names = field_names or {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return '<CardTable %d cards, %d lists>' % (len(self), len(self.list_ids))
+
+    @classmethod
+    def from_json(cls, cards, custom_fields=None):
+        """
+        Build the table from card json objects, eg. a card listing with
+        customFieldItems.
+
+        :cards: list of card json objects, with at least the CARD_FIELDS
+        :custom_fields: optional custom field definition json objects, to
+            look fields up by name and keep only the numeric ones
+        :rtype: CardTable
+        """
+        ids = [card['id'] for card in cards]
+        n = len(ids)
+        board_ids, board = encode([card.get('idBoard') or '' for card in cards])
+        list_ids, list_codes = encode([card.get('idList') or '' for card in cards])
+
+        due_strs = [card.get('due') for card in cards]
+        has_due = np.array([date is not None for date in due_strs], dtype=bool)
+        due = np.full(n, np.nan)
+        due[has_due] = parse_dates([date for date in due_strs if date is not None])
+
+        columns = {
+            'ids': np.asarray(ids, dtype='U24'),
+            'board': board,
+            'list': list_codes,
+            'pos': np.array([card.get('pos') or 0 for card in cards], dtype=np.float64),
+            'closed': np.array([bool(card.get('closed')) for card in cards], dtype=bool),
+            'due_complete': np.array([bool(card.get('dueComplete')) for card in cards], dtype=bool),
+            'last_activity': parse_dates([card['dateLastActivity'] for card in cards]),
+            'due': due,
+            'created': created_timestamps(ids),
+        }
+        label_ids, labels = _multi_valued(cards, 'idLabels')
+        member_ids, members = _multi_valued(cards, 'idMembers')
+        fields, field_names = _numeric_fields(cards, custom_fields)
+        return cls(columns, board_ids, list_ids, labels, label_ids, members, member_ids, fields, field_names)
+
+    @classmethod
+    def from_board(cls, board, card_filter='open', page_size=1000):
+        """
+        Fetch the cards of a board, page by page, into a table.
+
+        :card_filter: 'open', 'closed' or 'all'
+        :rtype: CardTable
+        """
+        cards = list(board.client.fetch_json_paged(
+            '/boards/' + board.id + '/cards/' + card_filter,
+            query_params={'fields': CARD_FIELDS, 'customFieldItems': 'true'}, page_size=page_size))
+        custom_fields = board.client.fetch_json('/boards/' + board.id + '/customFields')
+        return cls.from_json(cards, custom_fields)
+
+    @classmethod
+    def from_snapshots(cls, snapshots):
+        """
+        Build one table of the cards of board snapshots, as made by
+        trello.crawl.OrganizationCrawler.
+
+        :snapshots: snapshot dicts, or paths of the .json or .json.gz files
+            written by trello.crawl.DirectorySink
+        :rtype: CardTable
+        """
+        cards, custom_fields = [], []
+        for snapshot in snapshots:
+            if not isinstance(snapshot, dict):
+                opener = gzip.open if snapshot.endswith('.gz') else open
+                with opener(snapshot, 'rb') as snapshot_file:
+                    snapshot = json.loads(snapshot_file.read().decode('utf-8'))
+            board_id = snapshot['board']['id']
+            for card in snapshot['cards']:
+                if 'idBoard' not in card:
+                    card = dict(card, idBoard=board_id)
+                cards.append(card)
+            custom_fields.extend(snapshot.get('custom_fields') or [])
+        return cls.from_json(cards, custom_fields)
+
+    def column(self, name):
+        """
+        Array of a column, or of a numeric custom field by id or name.
+
+        :rtype: numpy array
+        """
+        if name in self.COLUMNS:
+            return getattr(self, name)
+        field_id = self.field_names.get(name, name)
+        if field_id in self.fields:
+            return self.fields[field_id]
+        raise KeyError(name)
+
+    def codes(self, name, ids):
+        """Codes of ids in the categories of a categorical column, -1 for the unknown ones"""
+        categories = getattr(self, self.CATEGORIES[name])
+        index = dict((category, code) for code, category in enumerate(categories.tolist()))
+        return np.array([index.get(category, -1) for category in ids], dtype=np.int64)
+
+    def in_lists(self, list_ids):
+        """:rtype: bool array of the cards in one of the lists"""
+        return np.isin(self.list, self.codes('list', list_ids))
+
+    def in_boards(self, board_ids):
+        """:rtype: bool array of the cards on one of the boards"""
+        return np.isin(self.board, self.codes('board', board_ids))
+
+    def has_label(self, label_id):
+        """:rtype: bool array of the cards with the label"""
+        return self._has(self.labels, self.codes('label', [label_id])[0])
+
+    def has_member(self, member_id):
+        """:rtype: bool array of the cards the member is assigned to"""
+        return self._has(self.members, self.codes('member', [member_id])[0])
+
+    def _has(self, pairs, code):
+        mask = np.zeros(len(self), dtype=bool)
+        rows, codes = pairs
+        mask[rows[codes == code]] = True
+        return mask
+
+    def take(self, rows):
+        """
+        Table of some of the cards, in the given order. The categories are
+        kept, so codes mean the same in both tables.
+
+        :rows: int array of row numbers
+        :rtype: CardTable
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        # New row number of each old row, -1 for the dropped ones
+        renumber = np.full(len(self), -1, dtype=np.int64)
+        renumber[rows] = np.arange(len(rows))
+        columns = dict((name, getattr(self, name)[rows]) for name in self.COLUMNS)
+        fields = dict((field_id, values[rows]) for field_id, values in self.fields.items())
+        return CardTable(columns, self.board_ids, self.list_ids, _take_pairs(self.labels, renumber),
+                         self.label_ids, _take_pairs(self.members, renumber), self.member_ids,
+                         fields, self.field_names)
+
+    def filter(self, mask):
+        """
+        Table of the cards where mask is True, eg.
+        table.filter(~table.closed & (table.due < time.time()))
+
+        :rtype: CardTable
+        """
+        return self.take(np.nonzero(mask)[0])
+
+    def sort(self, by, descending=False):
+        """
+        Table of the cards sorted by one or more columns. Categorical columns
+        are sorted by code, that is by id.
+
+        :by: column name, or list of column names, the first one sorting first
+        :rtype: CardTable
+        """
+        names = [by] if isinstance(by, (str, type(u''))) else list(by)
+        # lexsort sorts by its last key first
+        order = np.lexsort([self.column(name) for name in reversed(names)])
+        if descending:
+            order = order[::-1]
+        return self.take(order)
+
+    def group_by(self, name):
+        """
+        Group the cards by board, list, label or member. A card with several
+        labels (members) is in the group of each of them, a card without
+        any is in none.
+
+        :name: 'board', 'list', 'label' or 'member'
+        :rtype: CardGroups
+        """
+        categories = getattr(self, self.CATEGORIES[name])
+        if name in ('label', 'member'):
+            rows, codes = self.labels if name == 'label' else self.members
+        else:
+            rows, codes = np.arange(len(self)), getattr(self, name)
+        return CardGroups(self, categories, rows, codes)
+
+
+class CardGroups(object):
+    """
+    Groups of the rows of a CardTable. The aggregates are dicts
+    {group id: value} over all the groups, computed in one pass.
+    """
+
+    def __init__(self, table, categories, rows, codes):
+        self.table = table
+        self.categories = categories
+        self.rows = rows
+        self.codes = codes
+
+    def _result(self, values):
+        return dict(zip(self.categories.tolist(), values.tolist()))
+
+    def _values(self, column):
+        values = self.table.column(column)[self.rows].astype(np.float64)
+        known = ~np.isnan(values)
+        return values[known], self.codes[known]
+
+    def count(self):
+        """Number of cards of each group"""
+        return self._result(np.bincount(self.codes, minlength=len(self.categories)))
+
+    def sum(self, column):
+        """Sum of a column over each group, ignoring NaN"""
+        values, codes = self._values(column)
+        return self._result(np.bincount(codes, weights=values, minlength=len(self.categories)))
+
+    def mean(self, column):
+        """Mean of a column over each group, ignoring NaN (NaN for a group without values)"""
+        values, codes = self._values(column)
+        sums = np.bincount(codes, weights=values, minlength=len(self.categories))
+        counts = np.bincount(codes, minlength=len(self.categories))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._result(sums / counts)
+
+    def min(self, column):
+        """Smallest value of a column in each group (NaN for a group without values)"""
+        return self._extreme(column, np.minimum, np.inf)
+
+    def max(self, column):
+        """Largest value of a column in each group (NaN for a group without values)"""
+        return self._extreme(column, np.maximum, -np.inf)
+
+    def _extreme(self, column, ufunc, initial):
+        values, codes = self._values(column)
+        result = np.full(len(self.categories), initial)
+        ufunc.at(result, codes, values)
+        result[result == initial] = np.nan
+        return self._result(result)
+
+    def percentile(self, column, q):
+        """
+        Percentiles of a column over each group, ignoring NaN.
+
+        :q: percentile or sequence of percentiles, between 0 and 100
+        :return: dict {group id: percentile, or array of the percentiles}
+            (NaN for a group without values)
+        """
+        values, codes = self._values(column)
+        order = np.lexsort((values, codes))
+        values, codes = values[order], codes[order]
+        bounds = np.searchsorted(codes, np.arange(len(self.categories) + 1))
+        empty = np.full(np.shape(q), np.nan)
+        return dict((category, np.percentile(values[start:end], q) if end > start else empty)
+                    for category, start, end in zip(self.categories.tolist(), bounds[:-1], bounds[1:]))
+
+
+def _multi_valued(cards, key):
+    """(categories, (rows, codes)) of a field holding a list of ids"""
+    rows, values = [], []
+    for row, card in enumerate(cards):
+        ids = card.get(key) or ()
+        rows.extend([row] * len(ids))
+        values.extend(ids)
+    if not values:
+        return np.zeros(0, dtype='U24'), (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    categories, codes = encode(values)
+    return categories, (np.asarray(rows, dtype=np.int64), codes)
+
+
+def _take_pairs(pairs, renumber):
+    rows, codes = pairs
+    new_rows = renumber[rows]
+    kept = new_rows >= 0
+    new_rows, codes = new_rows[kept], codes[kept]
+    # Keep the pairs ordered by row
+    order = np.argsort(new_rows, kind='mergesort')
+    return new_rows[order], codes[order]
+
+
+def _numeric_fields(cards, custom_fields):
+    """dict {field id: float64 array} of the number custom fields, and dict {field name: field id}"""
+    numeric = None
+    field_names = {}
+    if custom_fields:
+        numeric = set(field['id'] for field in custom_fields if field.get('type') == 'number')
+        field_names = dict((field['name'], field['id']) for field in custom_fields if field['id'] in numeric)
+
+    rows, field_ids, values = [], [], []
+    for row, card in enumerate(cards):
+        for item in card.get('customFieldItems') or ():
+            value = item.get('value') or {}
+            if 'number' not in value or (numeric is not None and item['idCustomField'] not in numeric):
+                continue
+            rows.append(row)
+            field_ids.append(item['idCustomField'])
+            values.append(float(value['number']))
+
+    fields = {}
+    if rows:
+        categories, codes = encode(field_ids)
+        rows, values = np.asarray(rows, dtype=np.int64), np.asarray(values, dtype=np.float64)
+        for code, field_id in enumerate(categories.tolist()):
+            column = np.full(len(cards), np.nan)
+            selected = codes == code
+            column[rows[selected]] = values[selected]
+            fields[field_id] = column
+    if numeric is not None:
+        for field_id in numeric:
+            fields.setdefault(field_id, np.full(len(cards), np.nan))
+    return fields, field_names
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import json
+import os
+import threading
+
+
+class Checkpoint(object):
+    """
+    Small JSON state persisted to a file, used by long running jobs
+    (exports, imports, crawls...) to resume where they stopped.
+
+    Writes go to a temporary file which then replaces the checkpoint, so a
+    crash never leaves a truncated checkpoint behind.
+    """
+
+    def __init__(self, path):
+        """
+        :path: path of the checkpoint file, loaded if it exists
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self.state = {}
+        if os.path.exists(path):
+            with open(path) as checkpoint_file:
+                self.state = json.load(checkpoint_file)
+
+    def __contains__(self, key):
+        return key in self.state
+
+    def __getitem__(self, key):
+        return self.state[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self.state[key] = value
+
+    def get(self, key, default=None):
+        return self.state.get(key, default)
+
+    def update(self, *args, **kwargs):
+        """Update the state and save it"""
+        with self._lock:
+            self.state.update(*args, **kwargs)
+            self.save()
+
+    def save(self):
+        """Write the state to the checkpoint file"""
+        with self._lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as checkpoint_file:
+                json.dump(self.state, checkpoint_file)
+            getattr(os, 'replace', os.rename)(tmp_path, self.path)
+
+    def clear(self):
+        """Forget the state and remove the checkpoint file"""
+        with self._lock:
+            self.state = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -13,3 +13,25 @@ def force_str(s, encoding='utf-8'):
     if PY2 and isinstance(s, unicode):  # noqa
         s = s.encode(encoding)
     return s
+
+
+class _LazyModule(object):
+    """Module imported when one of its attributes is first used"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            import importlib
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+
+def lazy_import(name):
+    """
+    Stand-in for a module that is slow to import, eg. dateutil.parser,
+    imported the first time one of its attributes is used
+    """
+    return _LazyModule(name)
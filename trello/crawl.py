@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from trello.checkpoint import Checkpoint
+from trello.exceptions import ResourceUnavailable
+from trello.ratelimit import call_with_retries
+
+
+class CrawlProgress(object):
+    """
+    Progress of a crawl, passed to the progress callback after each board.
+
+    :total: number of boards to crawl, including the ones already done
+    :done: number of boards crawled, including by previous runs
+    :failed: dict of the error messages of the boards that failed, by id
+    :requests: number of requests made by this run, retries included
+        (counted on the client, so requests made through the same client
+        by other code during the crawl are counted too)
+    """
+
+    def __init__(self, total, done, clock=time.time):
+        self.total = total
+        self.done = done
+        self.failed = {}
+        self.requests = 0
+        self._resumed = done
+        self._clock = clock
+        self.started = clock()
+
+    @property
+    def elapsed(self):
+        return self._clock() - self.started
+
+    @property
+    def remaining(self):
+        return self.total - self.done - len(self.failed)
+
+    @property
+    def eta(self):
+        """Estimated number of seconds until the end, None until a board is done"""
+        crawled = self.done - self._resumed
+        if not crawled:
+            return None
+        return self.elapsed / crawled * self.remaining
+
+    def __repr__(self):
+        eta = self.eta
+        return '<CrawlProgress %d/%d boards, %d failed, ETA %s>' % (
+            self.done, self.total, len(self.failed), '?' if eta is None else '%.0fs' % eta)
+
+
+class OrganizationCrawler(object):
+    """
+    Snapshot every board of an organization: the board with its lists,
+    labels, members, custom field definitions, cards (with their checklists
+    and custom field values) and actions.
+
+    Boards are fetched in parallel by a pool of workers, each snapshot is
+    passed to the sink as soon as it is complete, then the board is
+    recorded in the checkpoint. A crawl that was interrupted skips the
+    boards already recorded when run again. Requests go through the
+    client, so they follow its rate limiter, and requests rejected by the
+    rate limit anyway are retried.
+
+        crawler = OrganizationCrawler(organization, DirectorySink('warehouse/'),
+                                      checkpoint_path='warehouse/crawl.json')
+        crawler.run()
+    """
+
+    def __init__(self, organization, sink, checkpoint_path=None, max_workers=8,
+                 board_filter='open', actions_filter='all', page_size=1000, max_retries=5,
+                 progress=None):
+        """
+        :organization: the Organization to crawl
+        :sink: function called with the snapshot of each board, a dict with
+            the keys 'board', 'lists', 'labels', 'members', 'custom_fields',
+            'cards' and 'actions'. It is always called from the thread
+            running the crawl.
+        :checkpoint_path: file recording the boards already crawled, no
+            resuming if None
+        :max_workers: number of boards fetched in parallel
+        :board_filter: boards to crawl, 'open', 'closed' or 'all'
+        :actions_filter: actions to fetch, eg. 'all' or 'commentCard', None
+            for no actions
+        :page_size: number of cards or actions fetched per request
+        :max_retries: number of retries of a request rejected by the rate limit
+        :progress: function called with a CrawlProgress after each board
+        """
+        self.organization = organization
+        self.client = organization.client
+        self.sink = sink
+        self.checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+        self.max_workers = max_workers
+        self.board_filter = board_filter
+        self.actions_filter = actions_filter
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self.progress = progress
+
+    def run(self):
+        """
+        Crawl the boards that were not crawled yet.
+
+        :rtype: CrawlProgress
+        """
+        with self.client.track_requests() as tracker:
+            return self._run(tracker)
+
+    def _run(self, tracker):
+        boards = self._fetch('/organizations/' + self.organization.id + '/boards',
+                             {'filter': self.board_filter, 'lists': 'none'})
+        done = set(self.checkpoint.get('done', [])) if self.checkpoint else set()
+        todo = [board for board in boards if board['id'] not in done]
+        progress = CrawlProgress(len(boards), len(boards) - len(todo))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            todo = iter(todo)
+            while True:
+                # Keep a bounded number of snapshots in memory
+                for board in todo:
+                    pending[executor.submit(self.snapshot, board)] = board
+                    if len(pending) >= 2 * self.max_workers:
+                        break
+                if not pending:
+                    break
+                finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    board = pending.pop(future)
+                    try:
+                        snapshot = future.result()
+                    except ResourceUnavailable as e:
+                        progress.failed[board['id']] = str(e)
+                    else:
+                        self.sink(snapshot)
+                        progress.done += 1
+                        if self.checkpoint is not None:
+                            self.checkpoint.update(done=self.checkpoint.get('done', []) + [board['id']])
+                    progress.requests = tracker.count
+                    if self.progress is not None:
+                        self.progress(progress)
+        progress.requests = tracker.count
+        return progress
+
+    def snapshot(self, board_json):
+        """
+        Fetch the snapshot of a board.
+
+        :board_json: the board json object, as listed by the organization
+        """
+        path = '/boards/' + board_json['id']
+        snapshot = {
+            'board': board_json,
+            'lists': self._fetch(path + '/lists', {'filter': 'all', 'cards': 'none'}),
+            'labels': self._fetch(path + '/labels', {'limit': 1000}),
+            'members': self._fetch(path + '/members', {'filter': 'all'}),
+            'custom_fields': self._fetch(path + '/customFields'),
+            'cards': self._fetch_paged(path + '/cards/all', {
+                'fields': 'all', 'checklists': 'all', 'customFieldItems': 'true'}),
+            'actions': [],
+        }
+        if self.actions_filter:
+            snapshot['actions'] = self._fetch_paged(path + '/actions', {'filter': self.actions_filter})
+        return snapshot
+
+    def _fetch(self, uri_path, query_params=None):
+        return call_with_retries(self.client,
+                                 lambda: self.client.fetch_json(uri_path, query_params=query_params),
+                                 max_retries=self.max_retries)
+
+    def _fetch_paged(self, uri_path, query_params):
+        return list(self.client.fetch_json_paged(uri_path, query_params, self.page_size,
+                                                 max_retries=self.max_retries))
+
+
+class DirectorySink(object):
+    """
+    Crawl sink writing the snapshot of each board to <board id>.json (or
+    .json.gz) in a directory.
+    """
+
+    def __init__(self, directory, compress=False):
+        self.directory = directory
+        self.compress = compress
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def path(self, board_id):
+        return os.path.join(self.directory, board_id + ('.json.gz' if self.compress else '.json'))
+
+    def __call__(self, snapshot):
+        path = self.path(snapshot['board']['id'])
+        data = json.dumps(snapshot).encode('utf-8')
+        opener = gzip.open if self.compress else open
+        # Written next to the final file and renamed, so a file is complete
+        with opener(path + '.tmp', 'wb') as snapshot_file:
+            snapshot_file.write(data)
+        getattr(os, 'replace', os.rename)(path + '.tmp', path)
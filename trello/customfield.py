@@ -118,7 +118,16 @@ class CustomField(TrelloBase):
 
 	@classmethod
 	def from_json_list(cls, card, json_objs):
-		return [cls.get_class(card.board, obj).from_json(card, obj) for obj in json_objs]
+		"""
+		The custom fields of a card, skipping the items whose definition is
+		not on the board (eg. deleted since)
+		"""
+		fields = []
+		for obj in json_objs:
+			field_class = cls.get_class(card.board, obj)
+			if field_class is not None:
+				fields.append(field_class.from_json(card, obj))
+		return fields
 
 	def __repr__(self):
 		return force_str(u'<CustomField%s %s=%r>' % (self.type.capitalize(), self.name, self.value))
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from trello.attachments import Attachments
+from trello.exceptions import ResourceUnavailable
+from trello.ratelimit import call_with_retries
+
+try:
+    from urllib.parse import unquote
+except ImportError:  # Python 2
+    from urllib import unquote
+
+_UNSAFE_RE = re.compile(r'[^\w.\- ]+', re.UNICODE)
+
+
+class DownloadResult(object):
+    """
+    Outcome of the download of an attachment.
+
+    :attachment: the Attachments
+    :path: the file the attachment was written to
+    :status: 'downloaded', 'resumed' (completed a previous partial
+        download), 'skipped' (already on disk), 'ignored' (a link, not an
+        uploaded file) or 'failed'
+    :bytes: number of bytes downloaded
+    :error: the exception of a failed download
+    """
+
+    def __init__(self, attachment, path, status, bytes=0, error=None):
+        self.attachment = attachment
+        self.path = path
+        self.status = status
+        self.bytes = bytes
+        self.error = error
+
+    def __repr__(self):
+        return '<DownloadResult %s %s>' % (self.status, self.path)
+
+
+class AttachmentDownloader(object):
+    """
+    Download the files uploaded as attachments to a directory, several at
+    a time, streaming each of them to disk in chunks.
+
+        downloader = AttachmentDownloader(client, 'archive/')
+        for card in board.all_cards():
+            downloader.download(card.get_attachments())
+
+    A file is first written to <path>.part and renamed once complete. A
+    download that was interrupted is resumed from the end of its .part
+    file with a Range request, and files already on disk with the expected
+    size are skipped, so running the same download again only fetches what
+    is missing.
+    """
+
+    def __init__(self, client, directory, max_workers=4, chunk_size=1024 * 1024,
+                 preview_size=None, max_retries=5, progress=None):
+        """
+        :client: the TrelloClient
+        :directory: directory the files are written to
+        :max_workers: number of files downloaded in parallel
+        :chunk_size: number of bytes read and written at a time
+        :preview_size: (width, height) to download the smallest preview at
+            least this large instead of the original file, when there is one
+        :max_retries: number of times a failed or rate limited download is
+            resumed before giving up
+        :progress: function called with the DownloadResult of each file
+        """
+        self.client = client
+        self.directory = directory
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.preview_size = preview_size
+        self.max_retries = max_retries
+        self.progress = progress
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def path(self, attachment, preview=None):
+        """File an attachment (or one of its previews) is written to"""
+        name = attachment.name or unquote(attachment.url.rstrip('/').rsplit('/', 1)[-1])
+        name = _UNSAFE_RE.sub('_', name).strip(' .') or 'file'
+        if preview is not None:
+            name = '%dx%d_%s' % (preview.width, preview.height, name)
+        return os.path.join(self.directory, attachment.id + '_' + name)
+
+    def download(self, attachments):
+        """
+        Download attachments in parallel.
+
+        :attachments: Attachments objects or attachment json objects, eg.
+            from Card.get_attachments
+        :rtype: list of DownloadResult, in the order of the attachments
+        """
+        attachments = [a if isinstance(a, Attachments) else Attachments.from_json(a) for a in attachments]
+        results = [None] * len(attachments)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            todo = iter(enumerate(attachments))
+            while True:
+                for i, attachment in todo:
+                    pending[executor.submit(self.download_one, attachment)] = i
+                    if len(pending) >= 2 * self.max_workers:
+                        break
+                if not pending:
+                    break
+                finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i = pending.pop(future)
+                    results[i] = future.result()
+                    if self.progress is not None:
+                        self.progress(results[i])
+        return results
+
+    def download_one(self, attachment):
+        """
+        Download an attachment, resuming or skipping it if it is already
+        (partly) on disk.
+
+        :rtype: DownloadResult
+        """
+        preview = attachment.preview_for(*self.preview_size) if self.preview_size else None
+        path = self.path(attachment, preview)
+        if not attachment.is_upload and preview is None:
+            return DownloadResult(attachment, path, 'ignored')
+        url, size = (preview.url, preview.bytes) if preview is not None else (attachment.url, attachment.bytes)
+        if os.path.exists(path) and (size is None or os.path.getsize(path) == size):
+            return DownloadResult(attachment, path, 'skipped')
+
+        part_path = path + '.part'
+        resumed = os.path.exists(part_path) and os.path.getsize(part_path) > 0
+        # Bytes written to the .part file, counted as they are written so
+        # the ones kept by a failed attempt count too
+        downloaded = [0]
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._fetch(url, part_path, size, downloaded)
+                break
+            except (ResourceUnavailable, IOError) as e:
+                if attempt == self.max_retries or _status(e) in (401, 403, 404):
+                    return DownloadResult(attachment, path, 'failed', downloaded[0], e)
+        getattr(os, 'replace', os.rename)(part_path, path)
+        return DownloadResult(attachment, path, 'resumed' if resumed else 'downloaded', downloaded[0])
+
+    def _fetch(self, url, part_path, size, downloaded):
+        """Write the rest of a file to its .part file, adding the number of
+        bytes written to downloaded[0]"""
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if size is not None and offset >= size:
+            if offset == size:
+                return
+            offset = 0
+        try:
+            response = call_with_retries(self.client, lambda: self.client.open_download(url, offset),
+                                         max_retries=self.max_retries)
+        except ResourceUnavailable as e:
+            if _status(e) != 416:
+                raise
+            # The range is past the end of the file: start over
+            offset = 0
+            response = call_with_retries(self.client, lambda: self.client.open_download(url),
+                                         max_retries=self.max_retries)
+
+        try:
+            # A 200 response to a Range request holds the whole file
+            with open(part_path, 'ab' if response.status_code == 206 else 'wb') as part_file:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if chunk:
+                        part_file.write(chunk)
+                        downloaded[0] += len(chunk)
+        finally:
+            response.close()
+        if size is not None and os.path.getsize(part_path) != size:
+            raise IOError('%s: expected %d bytes, got %d' % (url, size, os.path.getsize(part_path)))
+
+
+def _status(error):
+    return getattr(error, '_status', None)
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import datetime
+import heapq
+import itertools
+import threading
+import time
+
+import pytz
+
+from trello.index import _SortedIndex, _timestamp
+from trello.metrics import endpoint_template
+
+
+def _datetime(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, pytz.utc)
+
+
+class DueIndex(object):
+    """
+    Due dates of cards, sorted, to find the cards due in a period without
+    fetching or parsing every card. Completed and archived cards are left
+    out.
+
+        index = DueIndex.from_board(board)
+        index.watch(client)
+        index.due_between(before=datetime.now(pytz.utc) + timedelta(hours=1))
+
+    The index follows the changes made through a client it watches
+    (Card.set_due, remove_due, set_due_complete, update, set_closed,
+    delete...) and the changes made by others from the board actions, see
+    update_from_actions.
+    """
+
+    def __init__(self, cards=()):
+        """
+        :cards: the Card objects to index, the archived ones are left out
+        """
+        self._entries = {}
+        self._sorted = _SortedIndex()
+        self._listeners = []
+        self._lock = threading.RLock()
+        for card in cards:
+            if not card.closed:
+                self._set(card.id, card.due or None, getattr(card, 'is_due_complete', False), False, False)
+        self._sorted.sort()
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Index the open cards of a board.
+
+        :rtype: DueIndex
+        """
+        return cls(board.get_cards({'filter': 'open', 'fields': 'all'}))
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def __contains__(self, card_id):
+        return card_id in self._entries
+
+    def add(self, card):
+        """Index a card, replacing its previous due date (or forgetting it if
+        it is archived)"""
+        if card.closed:
+            self.remove(card.id)
+        else:
+            self._set(card.id, card.due or None, getattr(card, 'is_due_complete', False))
+
+    def set_due(self, card_id, due):
+        """Record the due date (a datetime or a date string, None for none) of a card"""
+        self._set(card_id, due, None)
+
+    def set_due_complete(self, card_id, complete):
+        self._set(card_id, False, complete)
+
+    def remove(self, card_id):
+        """Forget a card, eg. when it is archived or deleted"""
+        with self._lock:
+            entry = self._entries.pop(card_id, None)
+            if entry is None:
+                return
+            if entry[0] is not None and not entry[1]:
+                self._sorted.remove(entry[0], card_id)
+        self._notify(card_id, None)
+
+    def _set(self, card_id, due=False, complete=None, keep_sorted=True, notify=True):
+        """Change the due date (unless False) and completion (unless None) of a card"""
+        with self._lock:
+            old = self._entries.get(card_id, (None, False))
+            due = old[0] if due is False else (_timestamp(due) if due else None)
+            complete = old[1] if complete is None else bool(complete)
+            if card_id in self._entries and (due, complete) == old:
+                return
+            if old[0] is not None and not old[1]:
+                self._sorted.remove(old[0], card_id)
+            self._entries[card_id] = (due, complete)
+            active = due is not None and not complete
+            if active:
+                self._sorted.add(due, card_id, keep_sorted)
+        if notify:
+            self._notify(card_id, due if active else None)
+
+    def _notify(self, card_id, due):
+        for listener in list(self._listeners):
+            listener(card_id, due)
+
+    def due(self, card_id):
+        """
+        :return: the due datetime of a card, None if it has none or is complete
+        """
+        with self._lock:
+            due, complete = self._entries.get(card_id, (None, False))
+        return None if due is None or complete else _datetime(due)
+
+    def next_due(self, after=None):
+        """
+        :return: (card id, due datetime) of the first card due at or after
+            a datetime (by default the first of all), None if there is none
+        """
+        with self._lock:
+            start, end = self._sorted.bounds(after)
+            if start == end:
+                return None
+            due, card_id = self._sorted._entries[start]
+        return card_id, _datetime(due)
+
+    def due_between(self, after=None, before=None):
+        """
+        Ids of the cards due in [after, before), sorted by due date.
+
+        :rtype: list of card ids
+        """
+        with self._lock:
+            return self._sorted.range(after, before)
+
+    # Following the changes
+
+    def watch(self, client):
+        """Follow the due dates changed through a client"""
+        client.response_hooks.append(self._on_response)
+
+    def unwatch(self, client):
+        client.response_hooks.remove(self._on_response)
+
+    def _on_response(self, record):
+        if record.failed:
+            return
+        segments = record.uri_path.split('?', 1)[0].strip('/').split('/')
+        if segments and segments[0] == '1':
+            segments = segments[1:]
+        args = record.post_args or {}
+        if record.method == 'POST' and endpoint_template(record.uri_path) in ('/cards', '/lists/{id}/cards'):
+            if args.get('due') not in (None, '', 'null'):
+                card = record.response.json()
+                self._set(card['id'], card.get('due'), card.get('dueComplete'))
+            return
+        if len(segments) < 2 or segments[0] != 'cards':
+            return
+        card_id = segments[1]
+        if record.method == 'DELETE' and len(segments) == 2:
+            self.remove(card_id)
+        elif record.method != 'PUT':
+            return
+        elif len(segments) == 2:
+            if _true(args.get('closed')):
+                self.remove(card_id)
+            elif 'due' in args or 'dueComplete' in args:
+                self._set(card_id, (args.get('due') or None) if 'due' in args else False,
+                          _true(args['dueComplete']) if 'dueComplete' in args else None)
+        elif segments[2:] == ['due']:
+            self.set_due(card_id, args.get('value'))
+        elif segments[2:] == ['dueComplete']:
+            self.set_due_complete(card_id, _true(args.get('value')))
+        elif segments[2:] == ['closed'] and _true(args.get('value')):
+            self.remove(card_id)
+
+    def update_from_actions(self, actions):
+        """
+        Apply the card actions of a board (eg. fetched since the last
+        synchronization) to the index
+        """
+        for action in sorted(actions, key=lambda action: action['id']):
+            data = action['data']
+            card = data.get('card') or {}
+            if action['type'] in ('deleteCard', 'moveCardFromBoard'):
+                self.remove(card['id'])
+            elif action['type'] in ('createCard', 'copyCard', 'moveCardToBoard', 'updateCard'):
+                old = data.get('old', {})
+                if 'closed' in old and card.get('closed'):
+                    self.remove(card['id'])
+                elif 'due' in old or 'due' in card:
+                    self.set_due(card['id'], card.get('due'))
+                if 'dueComplete' in old:
+                    self.set_due_complete(card['id'], card.get('dueComplete'))
+
+
+def _true(value):
+    return value in (True, 'true', 'True', '1', 1)
+
+
+class DueScheduler(object):
+    """
+    Calls handlers when cards become due, or some time before, from a
+    thread that sleeps until the next due date of a DueIndex. Changes to
+    the index are taken into account as they happen, so there is nothing
+    to poll.
+
+        scheduler = DueScheduler(index)
+        scheduler.add_handler(remind, before=timedelta(hours=1))
+        scheduler.start()
+
+    Handlers are called with the card id and its due datetime, once per
+    due date. A card whose due date is changed, even to a past date, or
+    which is marked not complete again, is handled again. Exceptions
+    raised by the handlers are collected in errors.
+    """
+
+    def __init__(self, index, clock=time.time):
+        """
+        :index: the DueIndex to follow
+        :clock: function returning the current timestamp
+        """
+        self.index = index
+        self.clock = clock
+        self.errors = []
+        self._handlers = []
+        self._events = []
+        self._pending = set()
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._since = None
+
+    def add_handler(self, handler, before=datetime.timedelta(0)):
+        """
+        :handler: function called with (card id, due datetime)
+        :before: how long before the due date the handler is called
+        """
+        with self._condition:
+            self._handlers.append((handler, before.total_seconds() if isinstance(before, datetime.timedelta)
+                                   else before))
+            if self._since is not None:
+                self._schedule_all(len(self._handlers) - 1)
+
+    def start(self, since=None):
+        """
+        Start handling the due dates, in a thread.
+
+        :since: datetime from which the due dates are handled, eg. when
+            the process last stopped; by default the ones already passed
+            are not handled. Handlers whose lead time is already reached
+            are called at once.
+        """
+        self.reset(since)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def reset(self, since=None):
+        """Schedule the cards of the index, without starting the thread"""
+        with self._condition:
+            self._since = self.clock() if since is None else _timestamp(since)
+            self._events = []
+            self._pending = set()
+            for handler_index in range(len(self._handlers)):
+                self._schedule_all(handler_index)
+            if self._on_change not in self.index._listeners:
+                self.index._listeners.append(self._on_change)
+            self._condition.notify()
+
+    def stop(self):
+        """Stop the thread and stop following the index"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._on_change in self.index._listeners:
+            self.index._listeners.remove(self._on_change)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _schedule_all(self, handler_index):
+        lead = self._handlers[handler_index][1]
+        with self.index._lock:
+            entries = list(self.index._sorted._entries)
+        for due, card_id in entries[self.index._sorted.bounds(_datetime(self._since))[0]:]:
+            self._push(due - lead, card_id, due, handler_index)
+
+    def _push(self, when, card_id, due, handler_index):
+        key = (card_id, due, handler_index)
+        if key not in self._pending:
+            self._pending.add(key)
+            heapq.heappush(self._events, (when, next(self._sequence), key))
+
+    def _on_change(self, card_id, due):
+        if due is None:
+            # Events of the previous due date are dropped when they fire
+            return
+        with self._condition:
+            for handler_index, (_, lead) in enumerate(self._handlers):
+                self._push(due - lead, card_id, due, handler_index)
+            self._condition.notify()
+
+    def run_pending(self):
+        """
+        Call the handlers of the due dates reached.
+
+        :return: the number of handler calls
+        """
+        calls = []
+        with self._condition:
+            now = self.clock()
+            while self._events and self._events[0][0] <= now:
+                _, _, key = heapq.heappop(self._events)
+                self._pending.discard(key)
+                card_id, due, handler_index = key
+                # Skip the due dates that changed since they were scheduled
+                if self.index._entries.get(card_id) == (due, False):
+                    calls.append((self._handlers[handler_index][0], card_id, _datetime(due)))
+        for handler, card_id, due in calls:
+            try:
+                handler(card_id, due)
+            except Exception as e:
+                self.errors.append((card_id, e))
+        return len(calls)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    delay = self._events[0][0] - self.clock() if self._events else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if self._stopping:
+                    return
+            self.run_pending()
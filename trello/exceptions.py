@@ -17,5 +17,10 @@ class Unauthorized(ResourceUnavailable):
     pass
 
 
+class RateLimitExceeded(ResourceUnavailable):
+    """The request was rejected because too many requests were made"""
+    pass
+
+
 class TokenError(Exception):
     pass
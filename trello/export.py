@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import csv
+import gzip
+import io
+import json
+import os
+
+from trello.checkpoint import Checkpoint
+from trello.compat import PY2
+
+
+class BoardExporter(object):
+    """
+    Export a board to one JSONL or CSV file per kind of object (the board
+    itself, lists, labels, custom field definitions, cards, checklists, custom field
+    items, comments and actions).
+
+    Cards and actions are written page by page as they are fetched, so the
+    memory used does not depend on the size of the board. The progress is
+    saved in a checkpoint after each page and an interrupted export resumes
+    from there when run again. Once complete, the checkpoint makes further
+    runs no-ops; clear it (exporter.checkpoint.clear()) to export again.
+
+        BoardExporter(board, 'backup/', compress=True).export()
+    """
+
+    STREAMS = ('board', 'lists', 'labels', 'custom_fields', 'cards', 'checklists',
+               'custom_field_items', 'comments', 'actions')
+
+    CSV_COLUMNS = {
+        'board': ['id', 'name', 'desc', 'closed', 'idOrganization', 'url'],
+        'lists': ['id', 'name', 'closed', 'pos', 'idBoard'],
+        'labels': ['id', 'name', 'color', 'idBoard'],
+        'custom_fields': ['id', 'name', 'type', 'pos', 'options', 'idModel'],
+        'cards': ['id', 'name', 'desc', 'idList', 'idBoard', 'pos', 'closed', 'due',
+                  'dueComplete', 'idLabels', 'idMembers', 'dateLastActivity', 'shortUrl', 'url'],
+        'checklists': ['id', 'name', 'idCard', 'pos', 'checkItems'],
+        'custom_field_items': ['id', 'idModel', 'idCustomField', 'value', 'idValue'],
+        'comments': ['id', 'date', 'idMemberCreator', 'type', 'data'],
+        'actions': ['id', 'date', 'idMemberCreator', 'type', 'data'],
+    }
+
+    CHECKPOINT_NAME = 'export-checkpoint.json'
+
+    def __init__(self, board, directory, format='jsonl', compress=False, page_size=1000):
+        """
+        :board: the Board to export
+        :directory: directory the files are written to, created if needed
+        :format: 'jsonl' or 'csv'. In CSV files, nested values are JSON encoded.
+        :compress: gzip the files
+        :page_size: number of cards or actions fetched per request
+        """
+        if format not in ('jsonl', 'csv'):
+            raise ValueError('Unknown export format ({})'.format(format))
+        self.board = board
+        self.client = board.client
+        self.directory = directory
+        self.format = format
+        self.compress = compress
+        self.page_size = page_size
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.checkpoint = Checkpoint(os.path.join(directory, self.CHECKPOINT_NAME))
+        self.files = dict((stream, _StreamFile(self.path(stream), format,
+                                               self.CSV_COLUMNS[stream], compress))
+                          for stream in self.STREAMS)
+
+    def path(self, stream):
+        """Path of the file of the given stream"""
+        extension = '.' + self.format + ('.gz' if self.compress else '')
+        return os.path.join(self.directory, stream + extension)
+
+    def export(self):
+        """
+        Export the board, resuming a previous interrupted export if any.
+
+        :return: dict of the number of objects written by this run, by stream
+        """
+        self.counts = dict((stream, 0) for stream in self.STREAMS)
+        board_path = '/boards/' + self.board.id
+        self._export_listing('board', board_path)
+        self._export_listing('lists', board_path + '/lists', {'filter': 'all', 'cards': 'none'})
+        self._export_listing('labels', board_path + '/labels', {'limit': 1000})
+        self._export_listing('custom_fields', board_path + '/customFields')
+        self._export_pages('cards', board_path + '/cards/all',
+                           {'fields': 'all', 'customFieldItems': 'true', 'checklists': 'all'},
+                           self._split_card)
+        self._export_pages('comments', board_path + '/actions', {'filter': 'commentCard'})
+        self._export_pages('actions', board_path + '/actions', {'filter': 'all'})
+        return self.counts
+
+    def _done(self, name):
+        return name in self.checkpoint.get('done', [])
+
+    def _mark_done(self, name):
+        cursors = self.checkpoint.get('cursors', {})
+        cursors.pop(name, None)
+        self.checkpoint.update(done=self.checkpoint.get('done', []) + [name], cursors=cursors)
+
+    def _write(self, stream, rows):
+        self.files[stream].write(rows)
+        self.counts[stream] += len(rows)
+
+    def _export_listing(self, stream, uri_path, query_params=None):
+        """Export a listing small enough to be fetched in one request"""
+        if self._done(stream):
+            return
+        self.files[stream].truncate(0)
+        json_obj = self.client.fetch_json(uri_path, query_params=query_params)
+        self._write(stream, json_obj if isinstance(json_obj, list) else [json_obj])
+        self._mark_done(stream)
+
+    def _export_pages(self, name, uri_path, query_params, split=None):
+        """
+        Export a paged listing. split(obj) returns the rows to write by
+        stream for each object, by default the object goes to the stream
+        of the same name.
+        """
+        if self._done(name):
+            return
+        split = split or (lambda obj: {name: [obj]})
+        query_params = dict(query_params)
+        streams = [name] + (['checklists', 'custom_field_items'] if name == 'cards' else [])
+
+        # Drop whatever was written after the last checkpoint of this stream
+        cursor = self.checkpoint.get('cursors', {}).get(name)
+        for stream in streams:
+            self.files[stream].truncate(cursor['offsets'][stream] if cursor else 0)
+        if cursor:
+            query_params['before'] = cursor['before']
+
+        for page in self.client.fetch_json_pages(uri_path, query_params, self.page_size):
+            rows = dict((stream, []) for stream in streams)
+            for obj in page:
+                for stream, stream_rows in split(obj).items():
+                    rows[stream].extend(stream_rows)
+            for stream in streams:
+                self._write(stream, rows[stream])
+            cursors = self.checkpoint.get('cursors', {})
+            cursors[name] = {
+                'before': page[-1]['id'],
+                'offsets': dict((stream, self.files[stream].size()) for stream in streams),
+            }
+            self.checkpoint.update(cursors=cursors)
+        self._mark_done(name)
+
+    @staticmethod
+    def _split_card(card_json):
+        card_json = dict(card_json)
+        checklists = card_json.pop('checklists', [])
+        custom_field_items = card_json.pop('customFieldItems', [])
+        return {'cards': [card_json], 'checklists': checklists,
+                'custom_field_items': custom_field_items}
+
+
+class _StreamFile(object):
+    """
+    Append-only export file. Each write appends a complete chunk (a gzip
+    member when compressed), so the file can be truncated back to any
+    offset returned by size().
+    """
+
+    def __init__(self, path, format, columns, compress):
+        self.path = path
+        self.format = format
+        self.columns = columns
+        self.compress = compress
+
+    def size(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def truncate(self, offset):
+        if offset == 0:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        elif self.size() > offset:
+            with open(self.path, 'r+b') as stream_file:
+                stream_file.truncate(offset)
+
+    def write(self, rows):
+        if not rows:
+            return
+        if self.format == 'jsonl':
+            data = u''.join(json.dumps(row) + u'\n' for row in rows).encode('utf-8')
+        else:
+            # The csv module of Python 2 writes bytes
+            buf = io.BytesIO() if PY2 else io.StringIO()
+            writer = csv.writer(buf)
+            if self.size() == 0:
+                writer.writerow([_csv_cell(column) for column in self.columns])
+            for row in rows:
+                writer.writerow([_csv_cell(_csv_value(row.get(column))) for column in self.columns])
+            data = buf.getvalue() if PY2 else buf.getvalue().encode('utf-8')
+        if self.compress:
+            with gzip.open(self.path, 'ab') as stream_file:
+                stream_file.write(data)
+        else:
+            with open(self.path, 'ab') as stream_file:
+                stream_file.write(data)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _csv_cell(value):
+    """A CSV cell as the csv module of this Python version expects it"""
+    if PY2 and isinstance(value, unicode):  # noqa
+        return value.encode('utf-8')
+    return value
+
+
+def read_export(directory, stream, compress=None):
+    """
+    Iterate over the objects of a stream of a JSONL export, without loading
+    the whole file.
+
+    :directory: directory of the export
+    :stream: name of the stream, eg. 'cards'
+    :compress: whether the export is gzipped, guessed from the files if None
+    """
+    path = os.path.join(directory, stream + '.jsonl')
+    if compress or (compress is None and not os.path.exists(path)):
+        path += '.gz'
+    if not os.path.exists(path):
+        return
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as stream_file:
+        for line in stream_file:
+            if line.strip():
+                yield json.loads(line.decode('utf-8'))
@@ -0,0 +1,1356 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory stand-in for the Trello API, to run code written against this
+library offline: tests, load tests and benchmarks.
+
+FakeTrello implements the endpoints used by the library (boards, lists,
+cards, checklists, labels, members, organizations, actions, custom fields,
+notifications, search, batch and webhooks) on in-memory data. It plugs
+into TrelloClient as its http_service, and can simulate per-token rate
+limits and network latency.
+
+    server = FakeTrello(latency=0.05, rate_limit=(100, 10.0))
+    board_id = server.add_synthetic_board('Load test', cards=10000)
+    client = TrelloClient('key', token='token', http_service=server)
+    client.get_board(board_id).all_cards()
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+import datetime
+import io
+import itertools
+import json
+import random
+import re
+import threading
+import time
+
+try:
+    from urllib.parse import urlparse, parse_qsl
+except ImportError:  # Python 2
+    from urlparse import urlparse, parse_qsl
+
+from trello.ratelimit import RateLimiter
+
+
+class FakeResponse(object):
+    """Minimal requests.Response look-alike"""
+
+    def __init__(self, status_code, body=None, content=None, headers=None):
+        self.status_code = status_code
+        if content is None:
+            content = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.content = content
+        self.headers = headers or {}
+        self.headers.setdefault('Content-Length', str(len(content)))
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+    def json(self):
+        # Decoded from the content, like requests, so that callers cannot
+        # modify the state of the server
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise IOError('HTTP %s' % self.status_code)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code, message):
+        Exception.__init__(self, message)
+        self.status_code = status_code
+        self.message = message
+
+
+def _not_found(what='id'):
+    return _HTTPError(404, 'invalid %s' % what)
+
+
+def _api_path(path):
+    """Path relative to the API root, eg. 'boards/<id>' for '/1/boards/<id>/'"""
+    path = path.strip('/')
+    if path.startswith('1/'):
+        path = path[2:]
+    return path.strip('/')
+
+
+def _parse_multipart(data, content_type):
+    """Form fields and files of a multipart/form-data body (bytes or a file-like object)"""
+    if hasattr(data, 'read'):
+        # Read by blocks, like http.client sends file-like bodies
+        chunks = []
+        while True:
+            chunk = data.read(8192)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        data = b''.join(chunks)
+    boundary = content_type.split('boundary=', 1)[1].strip('"').encode('ascii')
+    fields, files = {}, {}
+    for part in data.split(b'--' + boundary)[1:]:
+        if part.startswith(b'--'):
+            break
+        head, _, body = part[2:].partition(b'\r\n\r\n')
+        body = body[:-2] if body.endswith(b'\r\n') else body
+        headers = dict(line.split(': ', 1) for line in head.decode('utf-8').split('\r\n') if ': ' in line)
+        disposition = dict(re.findall(r'(\w+)="([^"]*)"', headers.get('Content-Disposition', '')))
+        if 'filename' in disposition:
+            files[disposition['name']] = (disposition['filename'], io.BytesIO(body),
+                                          headers.get('Content-Type'))
+        else:
+            fields[disposition['name']] = body.decode('utf-8')
+    return fields, files
+
+
+def _cursor(value):
+    """Id-like key of a before/since parameter, which is an id or a date"""
+    if re.match(r'^[0-9a-f]{24}$', value):
+        return value
+    date = datetime.datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S')
+    return '%08x' % int((date - datetime.datetime(1970, 1, 1)).total_seconds()) + '0' * 16
+
+
+def _true(value):
+    return value in (True, 'true', 'True', '1', 1)
+
+
+def _project(obj, fields):
+    """Keep only the requested fields of a json object (and its id)"""
+    if fields is None or fields == 'all':
+        return obj
+    keep = set(fields.split(',')) if not isinstance(fields, list) else set(fields)
+    return dict((key, value) for key, value in obj.items() if key in keep or key == 'id')
+
+
+class FakeTrello(object):
+    """
+    In-memory Trello API, usable as the http_service of a TrelloClient.
+
+    :latency: seconds each request takes, or a callable returning it
+    :rate_limit: (requests, period) allowed per token, None for no limit.
+        Requests over the limit get a 429 response.
+    :tokens: if given, only these tokens are accepted (401 otherwise)
+    :clock: function returning the current time, for the action dates
+    """
+
+    API_ROOT = 'https://api.trello.com/1/'
+
+    def __init__(self, latency=0.0, rate_limit=None, tokens=None, clock=time.time):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.tokens = set(tokens) if tokens is not None else None
+        self.clock = clock
+        self.request_count = 0
+        self.requests_by_token = {}
+        self._buckets = {}
+        self._lock = threading.RLock()
+        self._files = None
+        self._headers = {}
+        self._card_counts = {}
+        self._comment_counts = {}
+        self._counter = itertools.count(1)
+        self._routes = self._build_routes()
+
+        self.boards = {}
+        self.lists = {}
+        self.cards = {}
+        self.checklists = {}
+        self.labels = {}
+        self.members = {}
+        self.organizations = {}
+        self.actions = []
+        self.custom_fields = {}
+        self.custom_field_items = {}
+        self.attachments = {}
+        self.attachment_contents = {}
+        self.notifications = {}
+        self.webhooks = {}
+        self.stars = {}
+        self.token_members = {}
+
+        self.me = self.add_member('me', 'Fake User')
+
+    # Data helpers
+
+    def new_id(self):
+        """New id, embedding the creation time like Trello ids do"""
+        return '%08x%016x' % (int(self.clock()), next(self._counter))
+
+    def now(self):
+        date = datetime.datetime.utcfromtimestamp(self.clock())
+        return date.strftime('%Y-%m-%dT%H:%M:%S.') + '%03dZ' % (date.microsecond // 1000)
+
+    def add_member(self, username, full_name):
+        """Create a member, the first one is the user of every token"""
+        member_id = self.new_id()
+        self.members[member_id] = {
+            'id': member_id, 'username': username, 'fullName': full_name,
+            'initials': ''.join(part[0] for part in full_name.split()).upper(),
+            'status': 'active', 'bio': '', 'url': 'https://trello.com/' + username,
+            'memberType': 'normal', 'idBoards': [], 'idOrganizations': [],
+            'badges': {'comments': 0},
+        }
+        return member_id
+
+    def add_organization(self, name):
+        organization_id = self.new_id()
+        self.organizations[organization_id] = {
+            'id': organization_id, 'name': name, 'displayName': name, 'desc': '',
+            'url': 'https://trello.com/' + name,
+        }
+        self.members[self.me]['idOrganizations'].append(organization_id)
+        return organization_id
+
+    def add_synthetic_board(self, name='Synthetic board', lists=5, cards=1000, labels=6,
+                            custom_fields=2, checklists=1, check_items=4, members=3,
+                            organization_id=None, seed=0):
+        """
+        Fill a board with generated lists, labels, custom fields, members,
+        cards and checklists, for load tests and benchmarks.
+
+        :return: the id of the board
+        """
+        rnd = random.Random(seed)
+        with self._lock:
+            board = self._create_board({'name': name, 'idOrganization': organization_id,
+                                        'defaultLists': False, 'defaultLabels': False})
+            board_id = board['id']
+            member_ids = [self.me] + [self.add_member('member%d' % i, 'Member %d' % i)
+                                      for i in range(members - 1)]
+            self.boards[board_id]['memberships'] = [{'idMember': m, 'memberType': 'normal'}
+                                                    for m in member_ids]
+            list_ids = [self._create_list({'name': 'List %d' % i, 'idBoard': board_id,
+                                           'pos': (i + 1) * 1024})['id'] for i in range(lists)]
+            colors = ['green', 'yellow', 'orange', 'red', 'purple', 'blue', 'sky', 'lime', 'pink', 'black']
+            label_ids = [self._create_label({'name': 'Label %d' % i, 'idBoard': board_id,
+                                             'color': colors[i % len(colors)]})['id']
+                         for i in range(labels)]
+            field_ids = []
+            for i in range(custom_fields):
+                field_type = ('number', 'text', 'checkbox', 'list', 'date')[i % 5]
+                options = [{'value': {'text': 'Option %d' % j}} for j in range(3)] if field_type == 'list' else []
+                field_ids.append(self._create_custom_field({
+                    'idModel': board_id, 'modelType': 'board', 'name': 'Field %d' % i,
+                    'type': field_type, 'options': options})['id'])
+            for i in range(cards):
+                card = self._create_card({
+                    'name': 'Card %d' % i,
+                    'desc': 'Description of card %d' % i,
+                    'idList': rnd.choice(list_ids),
+                    'idLabels': ','.join(rnd.sample(label_ids, min(len(label_ids), rnd.randint(0, 2)))),
+                    'idMembers': ','.join(rnd.sample(member_ids, min(len(member_ids), rnd.randint(0, 2)))),
+                    'pos': (i + 1) * 1024,
+                    'due': self.now() if rnd.random() < 0.3 else None,
+                }, record=False)
+                for field_id in field_ids:
+                    field = self.custom_fields[field_id]
+                    value = {
+                        'number': {'value': {'number': str(rnd.randint(1, 100))}},
+                        'text': {'value': {'text': 'Text %d' % i}},
+                        'checkbox': {'value': {'checked': 'true'}},
+                        'date': {'value': {'date': '2020-01-01T00:00:00.000Z'}},
+                        'list': {'idValue': field['options'][0]['id'] if field['options'] else None},
+                    }[field['type']]
+                    self._set_custom_field_item(card['id'], field_id, value)
+                for j in range(checklists):
+                    checklist = self._create_checklist({'idCard': card['id'], 'name': 'Checklist %d' % j})
+                    for k in range(check_items):
+                        self._create_check_item(checklist['id'], {'name': 'Item %d' % k,
+                                                                  'checked': rnd.random() < 0.5})
+        return board_id
+
+    # HTTP interface
+
+    def request(self, method, url, params=None, headers=None, data=None, auth=None, files=None,
+                stream=False, **kwargs):
+        """Entry point with the signature of requests.request"""
+        parsed = urlparse(url)
+        path = _api_path(parsed.path)
+        args = dict(parse_qsl(parsed.query))
+        args.update(params or {})
+        content_type = (headers or {}).get('Content-Type', '')
+        if content_type.startswith('multipart/form-data') and data is not None:
+            fields, files = _parse_multipart(data, content_type)
+            args.update(fields)
+        elif isinstance(data, dict):
+            args.update(data)
+        elif data:
+            try:
+                body = json.loads(data)
+            except (TypeError, ValueError):
+                body = None
+            if isinstance(body, dict):
+                args.update(body)
+        token = args.get('token')
+        if auth is not None and getattr(auth, 'client', None) is not None:
+            token = auth.client.resource_owner_key
+        return self.handle(method.upper(), path, args, token=token, files=files,
+                           headers=headers or {})
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def handle(self, method, path, args, token=None, files=None, headers=None):
+        """Serve a request for the path relative to the API root"""
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+
+        with self._lock:
+            self.request_count += 1
+            self.requests_by_token[token] = self.requests_by_token.get(token, 0) + 1
+            if self.tokens is not None and token not in self.tokens:
+                return FakeResponse(401, content=b'invalid token')
+            if self.rate_limit is not None:
+                bucket = self._buckets.get(token)
+                if bucket is None:
+                    bucket = self._buckets[token] = RateLimiter(*self.rate_limit)
+                if not bucket.try_acquire():
+                    return FakeResponse(429, content=b'API_TOKEN_LIMIT_EXCEEDED')
+
+            self._files, self._headers = files, headers or {}
+            try:
+                return self._dispatch(method, path, args)
+            except _HTTPError as e:
+                return FakeResponse(e.status_code, content=e.message.encode('utf-8'))
+
+    def _dispatch(self, method, path, args):
+        for route_method, pattern, handler in self._routes:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match:
+                result = handler(args, *match.groups())
+                if isinstance(result, FakeResponse):
+                    return result
+                return FakeResponse(200, result)
+        raise _HTTPError(404, 'Cannot %s /1/%s' % (method, path))
+
+    def _build_routes(self):
+        id_ = r'([^/]+)'
+        routes = [
+            ('GET', 'batch', self._batch),
+            ('GET', 'search', self._search),
+            # Boards
+            ('POST', 'boards', lambda args: self._board_json(self._create_board(args)['id'])),
+            ('GET', 'boards/%s' % id_, lambda args, b: self._board_json(b, args.get('fields'))),
+            ('PUT', 'boards/%s' % id_, self._update_board),
+            ('DELETE', 'boards/%s' % id_, self._delete_board),
+            ('GET', 'boards/%s/dateLastActivity' % id_, self._board_last_activity),
+            ('PUT', 'boards/%s/(name|desc|closed|idOrganization)' % id_, self._set_board_attribute),
+            ('GET', 'boards/%s/lists(?:/(all|open|closed))?' % id_, self._board_lists),
+            ('GET', 'boards/%s/cards(?:/(all|open|closed|visible))?' % id_, self._board_cards),
+            ('GET', 'boards/%s/labels' % id_, self._board_labels),
+            ('GET', 'boards/%s/checklists' % id_, self._board_checklists),
+            ('GET', 'boards/%s/customFields' % id_, self._board_custom_fields),
+            ('GET', 'boards/%s/members' % id_, self._board_members),
+            ('PUT', 'boards/%s/members/%s' % (id_, id_), self._add_board_member),
+            ('DELETE', 'boards/%s/members/%s' % (id_, id_), self._remove_board_member),
+            ('GET', 'boards/%s/actions' % id_, lambda args, b: self._actions(args, board=b)),
+            # Lists
+            ('POST', 'lists', lambda args: self._list_json(self._create_list(args)['id'])),
+            ('GET', 'lists/%s' % id_, lambda args, l: self._list_json(l, args.get('fields'))),
+            ('PUT', 'lists/%s' % id_, self._update_list),
+            ('PUT', 'lists/%s/(name|closed|pos|subscribed|idBoard)' % id_, self._set_list_attribute),
+            ('GET', 'lists/%s/cards(?:/(all|open|closed))?' % id_, self._list_cards),
+            ('GET', 'lists/%s/actions' % id_, lambda args, l: self._actions(args, list_=l)),
+            ('POST', 'lists/%s/archiveAllCards' % id_, self._archive_all_cards),
+            ('POST', 'lists/%s/moveAllCards' % id_, self._move_all_cards),
+            # Cards
+            ('POST', 'cards', lambda args: self._card_json(self._create_card(args)['id'])),
+            ('GET', 'cards/%s' % id_, self._get_card),
+            ('PUT', 'cards/%s' % id_, lambda args, c: self._update_card(c, args)),
+            ('DELETE', 'cards/%s' % id_, self._delete_card),
+            ('PUT', 'cards/%s/(name|desc|due|dueComplete|pos|closed|idList|idBoard|subscribed)' % id_,
+             self._set_card_attribute),
+            ('GET', 'cards/%s/actions' % id_, lambda args, c: self._actions(args, card=self._card(c)['id'])),
+            ('POST', 'cards/%s/actions/comments' % id_, self._add_comment),
+            ('DELETE', 'cards/%s/actions/%s/comments' % (id_, id_), self._delete_comment),
+            ('GET', 'cards/%s/checklists' % id_, lambda args, c: self._card_checklists(c)),
+            ('POST', 'cards/%s/checklists' % id_, lambda args, c: self._checklist_json(
+                self._create_checklist(dict(args, idCard=c))['id'])),
+            ('PUT', 'cards?/%s/checklist/%s/checkItem/%s' % (id_, id_, id_), self._update_check_item),
+            ('GET', 'cards/%s/pluginData' % id_, lambda args, c: self._card(c).get('pluginData', [])),
+            ('GET', 'cards/%s/attachments' % id_, lambda args, c: self._card_attachments(c)),
+            ('POST', 'cards/%s/attachments' % id_, self._add_attachment),
+            ('DELETE', 'cards/%s/attachments/%s' % (id_, id_), self._remove_attachment),
+            ('GET', 'cards/%s/attachments/%s/download/(.+)' % (id_, id_), self._download_attachment),
+            ('GET', 'cards/%s/members' % id_, lambda args, c: [
+                self._member_json(m) for m in self._card(c)['idMembers']]),
+            ('POST', 'cards/%s/(?:idMembers|members)' % id_, self._add_card_member),
+            ('DELETE', 'cards/%s/idMembers/%s' % (id_, id_), self._remove_card_member),
+            ('POST', 'cards/%s/idLabels' % id_, self._add_card_label),
+            ('DELETE', 'cards/%s/idLabels/%s' % (id_, id_), self._remove_card_label),
+            ('POST', 'cards/%s/labels' % id_, self._create_card_label),
+            ('PUT', 'cards?/%s/customField/%s/item' % (id_, id_), self._put_custom_field_item),
+            ('GET', 'cards/%s/customFieldItems' % id_, lambda args, c: self._card_custom_field_items(c)),
+            # Actions
+            ('GET', 'actions/%s' % id_, lambda args, a: self._action(a)),
+            ('PUT', 'actions/%s' % id_, self._update_action),
+            # Checklists
+            ('POST', 'checklists', lambda args: self._checklist_json(self._create_checklist(args)['id'])),
+            ('GET', 'checklists/%s' % id_, lambda args, c: self._checklist_json(c)),
+            ('DELETE', 'checklists/%s' % id_, self._delete_checklist),
+            ('PUT', 'checklists/%s/name' % id_, self._rename_checklist),
+            ('POST', 'checklists/%s/checkItems' % id_, lambda args, c: self._create_check_item(c, args)),
+            ('DELETE', 'checklists/%s/checkItems/%s' % (id_, id_), self._delete_check_item),
+            # Labels
+            ('POST', 'labels', lambda args: self._create_label(args)),
+            ('GET', 'labels/%s' % id_, lambda args, l: self._label(l)),
+            ('PUT', 'labels/%s/(name|color)' % id_, self._set_label_attribute),
+            ('DELETE', 'labels/%s' % id_, self._delete_label),
+            # Custom fields
+            ('POST', 'customFields', lambda args: self._create_custom_field(args)),
+            ('GET', 'customFields/%s' % id_, lambda args, f: self._custom_field(f)),
+            # Members
+            ('GET', 'members/%s' % id_, lambda args, m: self._member_json(self._member_id(m, args))),
+            ('GET', 'members/%s/boards(?:/(all|open|closed))?' % id_, self._member_boards),
+            ('GET', 'members/%s/organizations' % id_, self._member_organizations),
+            ('GET', 'members/%s/cards' % id_, self._member_cards),
+            ('GET', 'members/%s/actions' % id_, lambda args, m: self._actions(
+                args, member=self._member_id(m, args))),
+            ('GET', 'members/%s/notifications' % id_, self._member_notifications),
+            ('GET', 'members/%s/boardStars' % id_, lambda args, m: list(self.stars.values())),
+            ('POST', 'members/%s/boardStars' % id_, self._add_star),
+            ('DELETE', 'members/%s/boardStars/%s' % (id_, id_), self._delete_star),
+            # Notifications
+            ('POST', 'notifications/all/read', self._read_all_notifications),
+            ('PUT', 'notifications/%s(?:/unread)?' % id_, self._update_notification),
+            # Organizations
+            ('GET', 'organizations/%s' % id_, lambda args, o: self._organization(o)),
+            ('GET', 'organizations/%s/boards(?:/(all|open|closed))?' % id_, self._organization_boards),
+            ('GET', 'organizations/%s/members' % id_, lambda args, o: [
+                self._member_json(m) for m in self.members
+                if o in self.members[m]['idOrganizations']]),
+            ('PUT', 'organizations/%s/members/%s' % (id_, id_), self._add_organization_member),
+            ('DELETE', 'organizations/%s/members/%s' % (id_, id_), self._remove_organization_member),
+            # Webhooks
+            ('GET', 'tokens/%s/webhooks' % id_, lambda args, t: [
+                w for w in self.webhooks.values() if w['token'] == t]),
+            ('POST', 'tokens/%s/webhooks' % id_, self._create_webhook),
+            ('POST', 'webhooks', lambda args: self._create_webhook(args, args.get('token'))),
+            ('DELETE', 'webhooks/%s' % id_, self._delete_webhook),
+        ]
+        return [(method, re.compile('^%s$' % pattern), handler) for method, pattern, handler in routes]
+
+    # Lookups
+
+    def _get(self, collection, object_id, what='id'):
+        try:
+            return collection[object_id]
+        except KeyError:
+            raise _not_found(what)
+
+    def _board(self, board_id):
+        return self._get(self.boards, board_id)
+
+    def _list(self, list_id):
+        return self._get(self.lists, list_id)
+
+    def _card(self, card_id):
+        card = self.cards.get(card_id)
+        if card is None:
+            # Short links work too
+            for candidate in self.cards.values():
+                if candidate['shortLink'] == card_id:
+                    return candidate
+            raise _not_found()
+        return card
+
+    def _label(self, label_id):
+        return self._get(self.labels, label_id)
+
+    def _checklist(self, checklist_id):
+        return self._get(self.checklists, checklist_id)
+
+    def _custom_field(self, field_id):
+        return self._get(self.custom_fields, field_id)
+
+    def _organization(self, organization_id):
+        return self._get(self.organizations, organization_id)
+
+    def _action(self, action_id):
+        for action in self.actions:
+            if action['id'] == action_id:
+                return action
+        raise _not_found()
+
+    def _member_id(self, member_id, args=None):
+        if member_id == 'me':
+            return self.token_members.get((args or {}).get('token'), self.me)
+        if member_id in self.members:
+            return member_id
+        for candidate in self.members.values():
+            if candidate['username'] == member_id:
+                return candidate['id']
+        raise _not_found()
+
+    # Json representations
+
+    def _board_json(self, board_id, fields=None):
+        return _project(dict(self._board(board_id)), fields)
+
+    def _list_json(self, list_id, fields=None):
+        return _project(dict(self._list(list_id)), fields)
+
+    def _member_json(self, member_id):
+        return dict(self._get(self.members, member_id))
+
+    def _checklist_json(self, checklist_id):
+        checklist = dict(self._checklist(checklist_id))
+        checklist['checkItems'] = [dict(item) for item in checklist['checkItems']]
+        return checklist
+
+    def _card_json(self, card_id, fields=None):
+        card = dict(self._card(card_id))
+        card['labels'] = [dict(self.labels[l]) for l in card['idLabels'] if l in self.labels]
+        checklists = [self.checklists[c] for c in card['idChecklists'] if c in self.checklists]
+        items = [item for checklist in checklists for item in checklist['checkItems']]
+        card['checkItemStates'] = [{'idCheckItem': item['id'], 'state': 'complete'}
+                                   for item in items if item['state'] == 'complete']
+        card['badges'] = {
+            'comments': self._comment_counts.get(card_id, 0),
+            'attachments': len(card['idAttachments']),
+            'checkItems': len(items),
+            'checkItemsChecked': len(card['checkItemStates']),
+        }
+        card.pop('idAttachments')
+        card.pop('pluginData', None)
+        return _project(card, fields)
+
+    def _nested_card_json(self, card_id, args):
+        """Card json with the nested resources requested in args"""
+        card = self._card_json(card_id, args.get('fields', 'all'))
+        if _true(args.get('customFieldItems')):
+            card['customFieldItems'] = self._card_custom_field_items(card_id)
+        if args.get('checklists') in ('all', 'open'):
+            card['checklists'] = self._card_checklists(card_id)
+        if _true(args.get('attachments')):
+            card['attachments'] = self._card_attachments(card_id)
+        if _true(args.get('members')):
+            card['members'] = [self._member_json(m) for m in self.cards[card_id]['idMembers']]
+        if _true(args.get('pluginData')):
+            card['pluginData'] = self.cards[card_id].get('pluginData', [])
+        if args.get('actions'):
+            card['actions'] = self._actions({'filter': args['actions'],
+                                             'limit': args.get('actions_limit', 50)}, card=card_id)
+        return card
+
+    def _card_checklists(self, card_id):
+        card = self._card(card_id)
+        return [self._checklist_json(c) for c in card['idChecklists'] if c in self.checklists]
+
+    def _card_attachments(self, card_id):
+        card = self._card(card_id)
+        return [dict(self.attachments[a]) for a in card['idAttachments']]
+
+    def _card_custom_field_items(self, card_id):
+        return [dict(item) for item in self.custom_field_items.get(self._card(card_id)['id'], {}).values()]
+
+    # Actions
+
+    def _record(self, action_type, data, member_id=None):
+        action = {
+            'id': self.new_id(),
+            'type': action_type,
+            'date': self.now(),
+            'idMemberCreator': member_id or self.me,
+            'data': data,
+            'memberCreator': {'id': member_id or self.me},
+        }
+        self.actions.insert(0, action)
+        return action
+
+    def _card_ref(self, card):
+        return {'id': card['id'], 'name': card['name'], 'idShort': card['idShort'],
+                'shortLink': card['shortLink']}
+
+    def _list_ref(self, list_id):
+        list_ = self.lists.get(list_id, {'id': list_id, 'name': ''})
+        return {'id': list_['id'], 'name': list_['name']}
+
+    def _board_ref(self, board_id):
+        board = self.boards.get(board_id, {'id': board_id, 'name': ''})
+        return {'id': board['id'], 'name': board['name']}
+
+    @staticmethod
+    def _matches_filter(action, filters):
+        if filters is None or 'all' in filters:
+            return True
+        for action_filter in filters:
+            action_type, _, field = action_filter.partition(':')
+            if action['type'] != action_type:
+                continue
+            if not field or field in action['data'].get('old', {}):
+                return True
+        return False
+
+    def _actions(self, args, board=None, list_=None, card=None, member=None):
+        filters = [f for f in args.get('filter', 'all').split(',') if f] or None
+        limit = int(args.get('limit', 50))
+        before, since = args.get('before'), args.get('since')
+        result = []
+        for action in self.actions:
+            data = action['data']
+            if board is not None and data.get('board', {}).get('id') != board:
+                continue
+            if list_ is not None and list_ not in (data.get('list', {}).get('id'),
+                                                   data.get('listBefore', {}).get('id'),
+                                                   data.get('listAfter', {}).get('id')):
+                continue
+            if card is not None and data.get('card', {}).get('id') != card:
+                continue
+            if member is not None and action['idMemberCreator'] != member:
+                continue
+            if not self._matches_filter(action, filters):
+                continue
+            if before and not action['id'] < _cursor(before):
+                continue
+            if since and not action['id'] > _cursor(since):
+                continue
+            result.append(action)
+            if len(result) >= limit:
+                break
+        return [dict(action) for action in result]
+
+    def _add_comment(self, args, card_id):
+        card = self._card(card_id)
+        self._comment_counts[card['id']] = self._comment_counts.get(card['id'], 0) + 1
+        return self._record('commentCard', {
+            'text': args['text'], 'card': self._card_ref(card),
+            'board': self._board_ref(card['idBoard']), 'list': self._list_ref(card['idList'])})
+
+    def _delete_comment(self, args, card_id, action_id):
+        action = self._action(action_id)
+        self.actions.remove(action)
+        card_id = action['data']['card']['id']
+        self._comment_counts[card_id] = self._comment_counts.get(card_id, 1) - 1
+        return {}
+
+    def _update_action(self, args, action_id):
+        action = self._action(action_id)
+        if 'text' in args:
+            action['data']['text'] = args['text']
+        return dict(action)
+
+    # Boards
+
+    def _create_board(self, args):
+        board_id = self.new_id()
+        self.boards[board_id] = {
+            'id': board_id,
+            'name': args['name'],
+            'desc': args.get('desc') or '',
+            'closed': False,
+            'idOrganization': args.get('idOrganization'),
+            'url': 'https://trello.com/b/%s' % board_id[-8:],
+            'shortUrl': 'https://trello.com/b/%s' % board_id[-8:],
+            'dateLastActivity': self.now(),
+            'memberships': [{'idMember': self.me, 'memberType': 'admin'}],
+            'prefs': {'permissionLevel': args.get('prefs_permissionLevel', 'private')},
+        }
+        self.members[self.me]['idBoards'].append(board_id)
+        if args.get('idBoardSource'):
+            self._copy_board(args['idBoardSource'], board_id)
+        elif args.get('defaultLists', True) not in (False, 'false'):
+            for i, name in enumerate(('To Do', 'Doing', 'Done')):
+                self._create_list({'name': name, 'idBoard': board_id, 'pos': (i + 1) * 1024})
+        if args.get('defaultLabels', True) not in (False, 'false') and not args.get('idBoardSource'):
+            for color in ('green', 'yellow', 'orange', 'red', 'purple', 'blue'):
+                self._create_label({'name': '', 'color': color, 'idBoard': board_id})
+        return self.boards[board_id]
+
+    def _copy_board(self, source_id, board_id):
+        self._board(source_id)
+        for list_ in sorted(self.lists.values(), key=lambda l: l['pos']):
+            if list_['idBoard'] != source_id:
+                continue
+            new_list = self._create_list({'name': list_['name'], 'idBoard': board_id, 'pos': list_['pos']})
+            for card in list(self.cards.values()):
+                if card['idList'] == list_['id']:
+                    self._create_card({'name': card['name'], 'desc': card['desc'],
+                                       'idList': new_list['id'], 'pos': card['pos']})
+        for label in list(self.labels.values()):
+            if label['idBoard'] == source_id:
+                self._create_label({'name': label['name'], 'color': label['color'], 'idBoard': board_id})
+
+    def _update_board(self, args, board_id):
+        board = self._board(board_id)
+        for field in ('name', 'desc', 'idOrganization'):
+            if field in args:
+                board[field] = args[field]
+        if 'closed' in args:
+            board['closed'] = _true(args['closed'])
+        return dict(board)
+
+    def _set_board_attribute(self, args, board_id, attribute):
+        return self._update_board({attribute: args.get('value')}, board_id)
+
+    def _delete_board(self, args, board_id):
+        self._board(board_id)
+        del self.boards[board_id]
+        return {'_value': None}
+
+    def _board_last_activity(self, args, board_id):
+        return {'_value': self._board(board_id)['dateLastActivity']}
+
+    def _board_lists(self, args, board_id, list_filter=None):
+        self._board(board_id)
+        list_filter = list_filter or args.get('filter', 'open')
+        lists = sorted((l for l in self.lists.values() if l['idBoard'] == board_id),
+                       key=lambda l: l['pos'])
+        lists = [l for l in lists if list_filter == 'all' or l['closed'] == (list_filter == 'closed')]
+        result = []
+        for list_ in lists:
+            list_json = self._list_json(list_['id'], args.get('fields'))
+            if args.get('cards') in ('open', 'all', 'closed'):
+                list_json['cards'] = self._list_cards({'filter': args['cards']}, list_['id'])
+            result.append(list_json)
+        return result
+
+    def _filter_cards(self, cards, card_filter, args):
+        if card_filter in ('open', 'visible'):
+            cards = [c for c in cards if not c['closed']]
+        elif card_filter == 'closed':
+            cards = [c for c in cards if c['closed']]
+        if 'limit' in args or 'before' in args or 'since' in args:
+            # Paged listings are sorted by id, newest first
+            cards = sorted(cards, key=lambda c: c['id'], reverse=True)
+            if args.get('before'):
+                cards = [c for c in cards if c['id'] < args['before']]
+            if args.get('since'):
+                cards = [c for c in cards if c['id'] > args['since']]
+            cards = cards[:int(args.get('limit', 1000))]
+        else:
+            cards = sorted(cards, key=lambda c: (self.lists[c['idList']]['pos'], c['pos']))
+        return [self._nested_card_json(c['id'], args) for c in cards]
+
+    def _board_cards(self, args, board_id, card_filter=None):
+        self._board(board_id)
+        cards = [c for c in self.cards.values() if c['idBoard'] == board_id]
+        return self._filter_cards(cards, card_filter or args.get('filter', 'visible'), args)
+
+    def _board_labels(self, args, board_id):
+        self._board(board_id)
+        labels = [dict(l) for l in self.labels.values() if l['idBoard'] == board_id]
+        return [_project(l, args.get('fields')) for l in labels[:int(args.get('limit', 50))]]
+
+    def _board_checklists(self, args, board_id):
+        self._board(board_id)
+        card_filter = args.get('cards', 'none')
+        result = []
+        for checklist in self.checklists.values():
+            if checklist['idBoard'] != board_id:
+                continue
+            checklist_json = self._checklist_json(checklist['id'])
+            card = self.cards[checklist['idCard']]
+            if card_filter == 'open' and card['closed']:
+                continue
+            if card_filter == 'closed' and not card['closed']:
+                continue
+            checklist_json['checkItemStates'] = [
+                {'idCheckItem': i['id'], 'state': 'complete'}
+                for i in checklist_json['checkItems'] if i['state'] == 'complete']
+            result.append(checklist_json)
+        return result
+
+    def _board_custom_fields(self, args, board_id):
+        self._board(board_id)
+        return [dict(f) for f in self.custom_fields.values() if f['idModel'] == board_id]
+
+    def _board_members(self, args, board_id):
+        board = self._board(board_id)
+        member_filter = args.get('filter', 'all')
+        result = []
+        for membership in board['memberships']:
+            if member_filter in ('admins', 'owners') and membership['memberType'] != 'admin':
+                continue
+            if member_filter == 'normal' and membership['memberType'] != 'normal':
+                continue
+            member = self._member_json(membership['idMember'])
+            member['memberType'] = membership['memberType']
+            result.append(_project(member, args.get('fields')))
+        return result
+
+    def _add_board_member(self, args, board_id, member_id):
+        board = self._board(board_id)
+        self._get(self.members, member_id)
+        board['memberships'] = [m for m in board['memberships'] if m['idMember'] != member_id]
+        board['memberships'].append({'idMember': member_id, 'memberType': args.get('type', 'normal')})
+        return dict(board)
+
+    def _remove_board_member(self, args, board_id, member_id):
+        board = self._board(board_id)
+        board['memberships'] = [m for m in board['memberships'] if m['idMember'] != member_id]
+        return dict(board)
+
+    # Lists
+
+    def _create_list(self, args):
+        board_id = args['idBoard']
+        self._board(board_id)
+        list_id = self.new_id()
+        pos = self._position(args.get('pos', 'bottom'),
+                             lambda: [l['pos'] for l in self.lists.values() if l['idBoard'] == board_id])
+        self.lists[list_id] = {'id': list_id, 'name': args['name'], 'closed': False,
+                               'pos': pos, 'idBoard': board_id, 'subscribed': False}
+        self._record('createList', {'list': self._list_ref(list_id), 'board': self._board_ref(board_id)})
+        return self.lists[list_id]
+
+    @staticmethod
+    def _position(pos, siblings):
+        """Numeric position for pos, siblings() returns the positions of
+        the other objects, only computed for 'top' and 'bottom'"""
+        if pos in (None, 'bottom'):
+            return max(siblings() or [0]) + 16384
+        if pos == 'top':
+            return min(siblings() or [16384]) / 2.0
+        return float(pos)
+
+    def _update_list(self, args, list_id):
+        list_ = self._list(list_id)
+        if 'name' in args:
+            list_['name'] = args['name']
+        if 'closed' in args:
+            list_['closed'] = _true(args['closed'])
+        if 'subscribed' in args:
+            list_['subscribed'] = _true(args['subscribed'])
+        if 'idBoard' in args:
+            list_['idBoard'] = args['idBoard']
+        if 'pos' in args:
+            list_['pos'] = self._position(args['pos'], lambda: [l['pos'] for l in self.lists.values()
+                                                                if l['idBoard'] == list_['idBoard']])
+        return dict(list_)
+
+    def _set_list_attribute(self, args, list_id, attribute):
+        return self._update_list({attribute: args.get('value')}, list_id)
+
+    def _list_cards(self, args, list_id, card_filter=None):
+        self._list(list_id)
+        cards = [c for c in self.cards.values() if c['idList'] == list_id]
+        return self._filter_cards(cards, card_filter or args.get('filter', 'open'), args)
+
+    def _archive_all_cards(self, args, list_id):
+        for card in list(self.cards.values()):
+            if card['idList'] == list_id and not card['closed']:
+                self._update_card(card['id'], {'closed': True})
+        return {}
+
+    def _move_all_cards(self, args, list_id):
+        for card in list(self.cards.values()):
+            if card['idList'] == list_id:
+                self._update_card(card['id'], {'idBoard': args['idBoard'], 'idList': args['idList']})
+        return {}
+
+    # Cards
+
+    def _create_card(self, args, record=True):
+        list_ = self._list(args['idList'])
+        card_id = self.new_id()
+        board_id = list_['idBoard']
+        source = self._card(args['idCardSource']) if args.get('idCardSource') else {}
+        siblings = lambda: [c['pos'] for c in self.cards.values() if c['idList'] == list_['id']]
+        self._card_counts[board_id] = id_short = self._card_counts.get(board_id, 0) + 1
+        due = args.get('due', source.get('due'))
+        self.cards[card_id] = {
+            'id': card_id,
+            'name': args.get('name') or source.get('name', ''),
+            'desc': args.get('desc') or source.get('desc', ''),
+            'due': None if due in (None, 'null', '') else due,
+            'dueComplete': _true(args.get('dueComplete', False)),
+            'closed': False,
+            'url': 'https://trello.com/c/%s' % card_id[-8:],
+            'shortUrl': 'https://trello.com/c/%s' % card_id[-8:],
+            'shortLink': card_id[-8:],
+            'pos': self._position(args.get('pos', 'bottom'), siblings),
+            'idMembers': [m for m in (args.get('idMembers') or '').split(',') if m],
+            'idLabels': [l for l in (args.get('idLabels') or '').split(',') if l],
+            'idBoard': board_id,
+            'idList': list_['id'],
+            'idShort': id_short,
+            'idChecklists': [],
+            'idAttachments': [],
+            'dateLastActivity': self.now(),
+            'subscribed': False,
+            'pluginData': [],
+        }
+        card = self.cards[card_id]
+        if record:
+            self._record('createCard', {'card': self._card_ref(card), 'list': self._list_ref(list_['id']),
+                                        'board': self._board_ref(board_id)})
+        return card
+
+    def _get_card(self, args, card_id):
+        return self._nested_card_json(self._card(card_id)['id'], args)
+
+    def _update_card(self, card_id, args):
+        card = self._card(card_id)
+        old = {}
+        for field in ('name', 'desc', 'due', 'dueComplete', 'closed', 'subscribed',
+                      'idList', 'idBoard', 'idMembers', 'idLabels', 'pos'):
+            if field not in args:
+                continue
+            value = args[field]
+            if field in ('dueComplete', 'closed', 'subscribed'):
+                value = _true(value)
+            elif field == 'due' and value in ('', 'null'):
+                value = None
+            elif field in ('idMembers', 'idLabels') and not isinstance(value, list):
+                value = [v for v in (value or '').split(',') if v]
+            elif field == 'pos':
+                value = self._position(value, lambda: [c['pos'] for c in self.cards.values()
+                                                       if c['idList'] == args.get('idList', card['idList'])
+                                                       and c['id'] != card['id']])
+            if card[field] != value:
+                old[field] = card[field]
+                card[field] = value
+        if 'idBoard' in old and 'idList' not in args:
+            lists = sorted((l for l in self.lists.values() if l['idBoard'] == card['idBoard']),
+                           key=lambda l: l['pos'])
+            if lists:
+                old['idList'] = card['idList']
+                card['idList'] = lists[0]['id']
+        card['dateLastActivity'] = self.now()
+
+        if 'idBoard' in old:
+            self._record('moveCardFromBoard', {'card': self._card_ref(card),
+                                               'board': self._board_ref(old['idBoard']),
+                                               'boardTarget': {'id': card['idBoard']}})
+            self._record('moveCardToBoard', {'card': self._card_ref(card),
+                                             'board': self._board_ref(card['idBoard']),
+                                             'boardSource': {'id': old['idBoard']},
+                                             'list': self._list_ref(card['idList'])})
+        elif 'idList' in old:
+            self._record('updateCard', {'card': dict(self._card_ref(card), idList=card['idList']),
+                                        'old': {'idList': old['idList']},
+                                        'listBefore': self._list_ref(old['idList']),
+                                        'listAfter': self._list_ref(card['idList']),
+                                        'board': self._board_ref(card['idBoard'])})
+        for field in ('closed', 'name', 'desc', 'due', 'pos', 'dueComplete'):
+            if field in old:
+                self._record('updateCard', {'card': dict(self._card_ref(card), **{field: card[field]}),
+                                            'old': {field: old[field]},
+                                            'list': self._list_ref(card['idList']),
+                                            'board': self._board_ref(card['idBoard'])})
+        return self._card_json(card['id'])
+
+    def _set_card_attribute(self, args, card_id, attribute):
+        value = args.get('value')
+        update = {attribute: value}
+        if attribute == 'idBoard' and 'idList' in args:
+            update['idList'] = args['idList']
+        return self._update_card(card_id, update)
+
+    def _delete_card(self, args, card_id):
+        card = self._card(card_id)
+        del self.cards[card['id']]
+        self._record('deleteCard', {'card': {'id': card['id'], 'idShort': card['idShort']},
+                                    'list': self._list_ref(card['idList']),
+                                    'board': self._board_ref(card['idBoard'])})
+        return {'limits': {}}
+
+    def _add_card_member(self, args, card_id):
+        card = self._card(card_id)
+        if args['value'] not in card['idMembers']:
+            card['idMembers'].append(args['value'])
+        return [self._member_json(m) for m in card['idMembers']]
+
+    def _remove_card_member(self, args, card_id, member_id):
+        card = self._card(card_id)
+        card['idMembers'] = [m for m in card['idMembers'] if m != member_id]
+        return [self._member_json(m) for m in card['idMembers']]
+
+    def _add_card_label(self, args, card_id):
+        card = self._card(card_id)
+        self._label(args['value'])
+        if args['value'] not in card['idLabels']:
+            card['idLabels'].append(args['value'])
+        return list(card['idLabels'])
+
+    def _remove_card_label(self, args, card_id, label_id):
+        card = self._card(card_id)
+        card['idLabels'] = [l for l in card['idLabels'] if l != label_id]
+        return list(card['idLabels'])
+
+    def _create_card_label(self, args, card_id):
+        card = self._card(card_id)
+        label = self._create_label({'name': args.get('name', ''), 'color': args.get('color'),
+                                    'idBoard': card['idBoard']})
+        card['idLabels'].append(label['id'])
+        return list(card['idLabels'])
+
+    # Attachments
+
+    def _add_attachment(self, args, card_id):
+        card = self._card(card_id)
+        files = self._files
+        attachment_id = self.new_id()
+        content, name, mime_type, is_upload = b'', args.get('name'), args.get('mimeType'), False
+        if files and 'file' in files:
+            file_name, file_obj, file_type = (tuple(files['file']) + (None, None))[:3]
+            content = file_obj.read() if hasattr(file_obj, 'read') else file_obj
+            name = name or file_name
+            mime_type = mime_type or file_type
+            is_upload = True
+        elif 'file' in args and isinstance(args['file'], bytes):
+            content, is_upload = args['file'], True
+        url = args.get('url') or (self.API_ROOT + 'cards/%s/attachments/%s/download/%s' % (
+            card['id'], attachment_id, name or 'file'))
+        self.attachments[attachment_id] = {
+            'id': attachment_id, 'bytes': len(content) if is_upload else None, 'date': self.now(),
+            'edgeColor': None, 'idMember': self.me, 'isUpload': is_upload,
+            'mimeType': mime_type, 'name': name or url, 'previews': [], 'url': url, 'pos': 0,
+        }
+        self.attachment_contents[attachment_id] = content
+        card['idAttachments'].append(attachment_id)
+        return dict(self.attachments[attachment_id])
+
+    def _remove_attachment(self, args, card_id, attachment_id):
+        card = self._card(card_id)
+        if attachment_id not in card['idAttachments']:
+            raise _not_found()
+        card['idAttachments'].remove(attachment_id)
+        del self.attachments[attachment_id]
+        self.attachment_contents.pop(attachment_id, None)
+        return {}
+
+    def _download_attachment(self, args, card_id, attachment_id, name):
+        self._card(card_id)
+        content = self._get(self.attachment_contents, attachment_id)
+        range_header = self._headers.get('Range')
+        match = re.match(r'bytes=(\d+)-(\d*)$', range_header or '')
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(content) - 1
+            if start >= len(content):
+                return FakeResponse(416, content=b'')
+            return FakeResponse(206, content=content[start:end + 1], headers={
+                'Content-Range': 'bytes %d-%d/%d' % (start, end, len(content))})
+        return FakeResponse(200, content=content)
+
+    # Checklists
+
+    def _create_checklist(self, args):
+        card = self._card(args['idCard'])
+        checklist_id = self.new_id()
+        siblings = lambda: [self.checklists[c]['pos'] for c in card['idChecklists']]
+        self.checklists[checklist_id] = {
+            'id': checklist_id, 'name': args.get('name', 'Checklist'), 'idCard': card['id'],
+            'idBoard': card['idBoard'], 'pos': self._position(args.get('pos', 'bottom'), siblings),
+            'checkItems': [],
+        }
+        card['idChecklists'].append(checklist_id)
+        return self.checklists[checklist_id]
+
+    def _delete_checklist(self, args, checklist_id):
+        checklist = self._checklist(checklist_id)
+        del self.checklists[checklist_id]
+        card = self.cards.get(checklist['idCard'])
+        if card is not None:
+            card['idChecklists'].remove(checklist_id)
+        return {}
+
+    def _rename_checklist(self, args, checklist_id):
+        checklist = self._checklist(checklist_id)
+        checklist['name'] = args['value']
+        return self._checklist_json(checklist_id)
+
+    def _create_check_item(self, checklist_id, args):
+        checklist = self._checklist(checklist_id)
+        item = {
+            'id': self.new_id(), 'name': args['name'], 'idChecklist': checklist_id,
+            'state': 'complete' if _true(args.get('checked', False)) else 'incomplete',
+            'pos': self._position(args.get('pos', 'bottom'),
+                                  lambda: [i['pos'] for i in checklist['checkItems']]),
+        }
+        checklist['checkItems'].append(item)
+        return dict(item)
+
+    def _delete_check_item(self, args, checklist_id, item_id):
+        checklist = self._checklist(checklist_id)
+        checklist['checkItems'] = [i for i in checklist['checkItems'] if i['id'] != item_id]
+        return {}
+
+    def _update_check_item(self, args, card_id, checklist_id, item_id):
+        checklist = self._checklist(checklist_id)
+        for item in checklist['checkItems']:
+            if item['id'] == item_id:
+                if 'state' in args:
+                    item['state'] = args['state']
+                if 'name' in args:
+                    item['name'] = args['name']
+                if 'pos' in args:
+                    item['pos'] = float(args['pos'])
+                return dict(item)
+        raise _not_found()
+
+    # Labels
+
+    def _create_label(self, args):
+        self._board(args['idBoard'])
+        label_id = self.new_id()
+        self.labels[label_id] = {'id': label_id, 'name': args.get('name') or '',
+                                 'color': args.get('color'), 'idBoard': args['idBoard']}
+        return dict(self.labels[label_id])
+
+    def _set_label_attribute(self, args, label_id, attribute):
+        label = self._label(label_id)
+        label[attribute] = args.get('value')
+        return dict(label)
+
+    def _delete_label(self, args, label_id):
+        self._label(label_id)
+        del self.labels[label_id]
+        for card in self.cards.values():
+            if label_id in card['idLabels']:
+                card['idLabels'].remove(label_id)
+        return {}
+
+    # Custom fields
+
+    def _create_custom_field(self, args):
+        self._board(args['idModel'])
+        field_id = self.new_id()
+        options = []
+        for i, option in enumerate(args.get('options') or []):
+            options.append({'id': self.new_id(), 'idCustomField': field_id, 'value': option['value'],
+                            'color': option.get('color', 'none'), 'pos': (i + 1) * 1024})
+        siblings = lambda: [f['pos'] for f in self.custom_fields.values() if f['idModel'] == args['idModel']]
+        self.custom_fields[field_id] = {
+            'id': field_id, 'idModel': args['idModel'], 'modelType': 'board',
+            'fieldGroup': field_id, 'name': args['name'], 'type': args['type'],
+            'pos': self._position(args.get('pos', 'bottom'), siblings), 'options': options,
+            'display': {'cardFront': _true(args.get('display_cardFront', False))},
+        }
+        return dict(self.custom_fields[field_id])
+
+    def _set_custom_field_item(self, card_id, field_id, value):
+        items = self.custom_field_items.setdefault(card_id, {})
+        if not value.get('value') and not value.get('idValue'):
+            items.pop(field_id, None)
+            return {}
+        item = items.get(field_id) or {'id': self.new_id(), 'idCustomField': field_id,
+                                       'idModel': card_id, 'modelType': 'card'}
+        item.pop('value', None)
+        item.pop('idValue', None)
+        item.update(value)
+        items[field_id] = item
+        return dict(item)
+
+    def _put_custom_field_item(self, args, card_id, field_id):
+        card = self._card(card_id)
+        self._custom_field(field_id)
+        value = {}
+        if 'idValue' in args:
+            value['idValue'] = args['idValue']
+        elif 'value' in args:
+            value['value'] = args['value']
+        return self._set_custom_field_item(card['id'], field_id, value)
+
+    # Members
+
+    def _member_boards(self, args, member_id, board_filter=None):
+        member_id = self._member_id(member_id, args)
+        board_filter = board_filter or args.get('filter', 'all')
+        boards = [b for b in self.boards.values()
+                  if any(m['idMember'] == member_id for m in b['memberships'])]
+        if board_filter == 'open':
+            boards = [b for b in boards if not b['closed']]
+        elif board_filter == 'closed':
+            boards = [b for b in boards if b['closed']]
+        return [_project(dict(b), args.get('fields')) for b in boards]
+
+    def _member_organizations(self, args, member_id):
+        member = self._get(self.members, self._member_id(member_id, args))
+        return [dict(self.organizations[o]) for o in member['idOrganizations'] if o in self.organizations]
+
+    def _member_cards(self, args, member_id):
+        member_id = self._member_id(member_id, args)
+        cards = [c for c in self.cards.values() if member_id in c['idMembers']]
+        return self._filter_cards(cards, args.get('filter', 'visible'), args)
+
+    def add_notification(self, member_id=None, notification_type='commentCard', data=None, unread=True):
+        """Create a notification for a member (the token user by default)"""
+        notification_id = self.new_id()
+        self.notifications[notification_id] = {
+            'id': notification_id, 'type': notification_type, 'date': self.now(),
+            'unread': unread, 'data': data or {}, 'idMember': member_id or self.me,
+            'idMemberCreator': self.me,
+        }
+        return notification_id
+
+    def _member_notifications(self, args, member_id):
+        member_id = self._member_id(member_id, args)
+        filters = [f for f in args.get('filter', 'all').split(',') if f]
+        read_filter = args.get('read_filter', 'all')
+        limit = int(args.get('limit', 50))
+        notifications = sorted((n for n in self.notifications.values() if n['idMember'] == member_id),
+                               key=lambda n: n['id'], reverse=True)
+        result = []
+        for notification in notifications:
+            if filters and 'all' not in filters and notification['type'] not in filters:
+                continue
+            if read_filter == 'unread' and not notification['unread']:
+                continue
+            if read_filter == 'read' and notification['unread']:
+                continue
+            if args.get('before') and not notification['id'] < args['before']:
+                continue
+            if args.get('since') and not notification['id'] > args['since']:
+                continue
+            result.append(dict(notification))
+            if len(result) >= limit:
+                break
+        return result
+
+    def _read_all_notifications(self, args):
+        ids = args.get('ids')
+        if isinstance(ids, str):
+            ids = [i for i in ids.split(',') if i]
+        read = _true(args.get('read', True))
+        for notification in self.notifications.values():
+            if ids is None or notification['id'] in ids:
+                notification['unread'] = not read
+        return {}
+
+    def _update_notification(self, args, notification_id):
+        notification = self._get(self.notifications, notification_id)
+        if 'unread' in args:
+            notification['unread'] = _true(args['unread'])
+        elif 'value' in args:
+            notification['unread'] = _true(args['value'])
+        return dict(notification)
+
+    def _add_star(self, args, member_id):
+        star_id = self.new_id()
+        self.stars[star_id] = {'id': star_id, 'idBoard': args['idBoard'], 'pos': args.get('pos', 'bottom')}
+        return dict(self.stars[star_id])
+
+    def _delete_star(self, args, member_id, star_id):
+        self._get(self.stars, star_id)
+        del self.stars[star_id]
+        return {}
+
+    # Organizations
+
+    def _organization_boards(self, args, organization_id, board_filter=None):
+        self._organization(organization_id)
+        board_filter = board_filter or args.get('filter', 'all')
+        boards = [b for b in self.boards.values() if b['idOrganization'] == organization_id]
+        if board_filter == 'open':
+            boards = [b for b in boards if not b['closed']]
+        elif board_filter == 'closed':
+            boards = [b for b in boards if b['closed']]
+        return [_project(dict(b), args.get('fields')) for b in boards]
+
+    def _add_organization_member(self, args, organization_id, member_id):
+        self._organization(organization_id)
+        member = self._get(self.members, member_id)
+        if organization_id not in member['idOrganizations']:
+            member['idOrganizations'].append(organization_id)
+        return self._organization(organization_id)
+
+    def _remove_organization_member(self, args, organization_id, member_id):
+        member = self._get(self.members, member_id)
+        if organization_id in member['idOrganizations']:
+            member['idOrganizations'].remove(organization_id)
+        return self._organization(organization_id)
+
+    # Webhooks
+
+    def _create_webhook(self, args, token):
+        hook_id = self.new_id()
+        self.webhooks[hook_id] = {'id': hook_id, 'description': args.get('description'),
+                                  'idModel': args['idModel'], 'callbackURL': args['callbackURL'],
+                                  'active': True, 'token': token}
+        return dict(self.webhooks[hook_id])
+
+    def _delete_webhook(self, args, hook_id):
+        self._get(self.webhooks, hook_id)
+        del self.webhooks[hook_id]
+        return {}
+
+    # Search and batch
+
+    def _search(self, args):
+        words = [w.lower() for w in args.get('query', '').split() if w]
+        partial = _true(args.get('partial', False))
+
+        def matches(*texts):
+            tokens = ' '.join(t or '' for t in texts).lower().split()
+            for word in words:
+                if not any(token.startswith(word) if partial else token == word for token in tokens):
+                    return False
+            return bool(words)
+
+        def as_list(value):
+            if not value:
+                return []
+            if isinstance(value, list):
+                return value
+            return value.split(',')
+
+        model_types = as_list(args.get('modelTypes')) or ['all']
+        board_ids = as_list(args.get('idBoards'))
+        result = {'boards': [], 'cards': [], 'members': [], 'organizations': [], 'actions': []}
+        if 'all' in model_types or 'cards' in model_types:
+            for card in self.cards.values():
+                if board_ids and card['idBoard'] not in board_ids:
+                    continue
+                if matches(card['name'], card['desc']):
+                    result['cards'].append(self._card_json(card['id']))
+            result['cards'] = result['cards'][:int(args.get('cards_limit', 10))]
+        if 'all' in model_types or 'boards' in model_types:
+            result['boards'] = [dict(b) for b in self.boards.values() if matches(b['name'], b['desc'])]
+        if 'all' in model_types or 'members' in model_types:
+            result['members'] = [self._member_json(m['id']) for m in self.members.values()
+                                 if matches(m['fullName'], m['username'])]
+        if 'all' in model_types or 'organizations' in model_types:
+            result['organizations'] = [dict(o) for o in self.organizations.values()
+                                       if matches(o['name'], o['desc'])]
+        return result
+
+    def _batch(self, args):
+        urls = args.get('urls', '')
+        if not isinstance(urls, list):
+            urls = [u for u in urls.split(',') if u]
+        if len(urls) > 10:
+            raise _HTTPError(400, 'Too many URLs')
+        results = []
+        for url in urls:
+            parsed = urlparse(url)
+            try:
+                response = self._dispatch('GET', _api_path(parsed.path), dict(parse_qsl(parsed.query)))
+            except _HTTPError as e:
+                response = FakeResponse(e.status_code, content=e.message.encode('utf-8'))
+            if response.status_code == 200:
+                results.append({'200': response.json()})
+            else:
+                results.append({'name': 'error', 'message': response.text,
+                                'statusCode': response.status_code})
+        return results
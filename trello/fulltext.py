@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import bisect
+import heapq
+import math
+import re
+from collections import defaultdict, namedtuple
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Lowercase words of a text"""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+SearchHit = namedtuple('SearchHit', ['card_id', 'name', 'score'])
+
+
+class CardSearchIndex(object):
+    """
+    Local full-text index of cards: their name, description, checklist
+    items and comments. Queries are answered from memory, words are matched
+    by prefix (so 'deplo' finds 'deployment') and results are ranked by
+    relevance, matches in names weighing more than in the other fields.
+
+        index = CardSearchIndex.from_board(board)
+        index.search('deploy staging')
+        index.update_from_board(board)  # apply what changed since
+
+    The index is kept current either by passing updated cards to add(), or
+    from the actions of the board with update_from_board().
+    """
+
+    WEIGHTS = {'name': 3.0, 'desc': 1.0, 'items': 1.5, 'comments': 1.0}
+
+    # Actions that change the indexed text
+    ACTION_FILTER = ','.join([
+        'createCard', 'copyCard', 'updateCard', 'deleteCard', 'moveCardToBoard',
+        'moveCardFromBoard', 'convertToCardFromCheckItem', 'commentCard', 'updateComment',
+        'deleteComment', 'createCheckItem', 'updateCheckItem', 'deleteCheckItem',
+        'removeChecklistFromCard',
+    ])
+
+    def __init__(self, cards=(), client=None):
+        """
+        :cards: Card objects to index. Their checklists and comments are
+            indexed when already loaded (eg. with the prefetch option of
+            Board.get_cards), no request is made for them.
+        :client: TrelloClient used by search() to fall back on the Trello
+            search
+        """
+        self.client = client
+        self.last_action_id = None
+        self._docs = {}
+        self._terms = {}
+        self._postings = defaultdict(dict)
+        self._vocabulary = []
+        self.add_all(cards)
+
+    @classmethod
+    def from_board(cls, board, card_filter='open'):
+        """
+        Index the cards of a board with their checklists and comments. The
+        index can then be kept current with update_from_board().
+
+        :rtype: CardSearchIndex
+        """
+        actions = board.client.fetch_json('/boards/' + board.id + '/actions',
+                                          query_params={'limit': 1, 'fields': 'id'})
+        cards = board.get_cards({'filter': card_filter, 'fields': 'all'},
+                                prefetch=['checklists', 'comments'])
+        index = cls(cards, client=board.client)
+        if actions:
+            index.last_action_id = actions[0]['id']
+        return index
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, card_id):
+        return card_id in self._docs
+
+    # Indexing
+
+    def add(self, card, _keep_sorted=True):
+        """Index a card, replacing its previous version if it was indexed"""
+        doc = {'name': card.name or '', 'desc': card.desc or '', 'items': {}, 'comments': {}}
+        for checklist in card._checklists or []:
+            for item in checklist.items:
+                doc['items'][item['id']] = (checklist.id, item['name'])
+        for comment in card._comments or []:
+            doc['comments'][comment['id']] = comment['data'].get('text', '')
+        self._docs[card.id] = doc
+        self._reindex(card.id, _keep_sorted)
+
+    update = add
+
+    def add_all(self, cards):
+        """Index many cards, faster than adding them one by one"""
+        for card in cards:
+            self.add(card, _keep_sorted=False)
+        self._vocabulary = sorted(self._postings)
+
+    def remove(self, card_id):
+        """Remove a card from the index, if it is indexed"""
+        if self._docs.pop(card_id, None) is not None:
+            self._reindex(card_id)
+
+    def _reindex(self, card_id, keep_sorted=True):
+        for term in self._terms.pop(card_id, ()):
+            postings = self._postings[term]
+            del postings[card_id]
+            if not postings:
+                del self._postings[term]
+                i = bisect.bisect_left(self._vocabulary, term)
+                if i < len(self._vocabulary) and self._vocabulary[i] == term:
+                    del self._vocabulary[i]
+        doc = self._docs.get(card_id)
+        if doc is None:
+            return
+        weights = defaultdict(float)
+        texts = [('name', doc['name']), ('desc', doc['desc'])]
+        texts.extend(('items', text) for _, text in doc['items'].values())
+        texts.extend(('comments', text) for text in doc['comments'].values())
+        for field, text in texts:
+            for term in tokenize(text):
+                weights[term] += self.WEIGHTS[field]
+        self._terms[card_id] = list(weights)
+        for term, weight in weights.items():
+            if keep_sorted and term not in self._postings:
+                bisect.insort(self._vocabulary, term)
+            self._postings[term][card_id] = weight
+
+    # Incremental updates
+
+    def update_from_board(self, board):
+        """Apply the actions of the board since the last update"""
+        query_params = {'filter': self.ACTION_FILTER}
+        if self.last_action_id:
+            query_params['since'] = self.last_action_id
+        self.update_from_actions(list(board.client.fetch_json_paged(
+            '/boards/' + board.id + '/actions', query_params=query_params)))
+
+    def update_from_actions(self, actions):
+        """
+        Apply card actions (in any order) to the index. Cards created by the
+        actions are indexed with what the actions tell about them, and
+        unarchived cards are fetched (when the index has a client).
+        """
+        for action in sorted(actions, key=lambda action: action['id']):
+            self._apply(action)
+            if self.last_action_id is None or action['id'] > self.last_action_id:
+                self.last_action_id = action['id']
+
+    def _apply(self, action):
+        action_type, data = action['type'], action['data']
+        card = data.get('card') or {}
+        card_id = card.get('id')
+        doc = self._docs.get(card_id)
+
+        if action_type in ('deleteCard', 'moveCardFromBoard') or \
+                (action_type == 'updateCard' and card.get('closed') and 'closed' in data.get('old', {})):
+            self.remove(card_id)
+            return
+        if doc is None:
+            if action_type == 'updateCard':
+                # A card not indexed, eg. archived: only its unarchiving
+                # brings it (back) in, with all its text
+                if 'closed' in data.get('old', {}) and self.client is not None:
+                    self._fetch_doc(card_id)
+                return
+            if action_type not in ('createCard', 'copyCard', 'moveCardToBoard',
+                                   'convertToCardFromCheckItem'):
+                return
+            doc = self._docs[card_id] = {'name': card.get('name', ''), 'desc': card.get('desc', ''),
+                                         'items': {}, 'comments': {}}
+
+        if action_type == 'updateCard':
+            for field in ('name', 'desc'):
+                if field in data.get('old', {}):
+                    doc[field] = card.get(field) or ''
+        elif action_type == 'commentCard':
+            doc['comments'][action['id']] = data.get('text', '')
+        elif action_type == 'updateComment':
+            doc['comments'][data['action']['id']] = data['action'].get('text', '')
+        elif action_type == 'deleteComment':
+            doc['comments'].pop(data['action']['id'], None)
+        elif action_type in ('createCheckItem', 'updateCheckItem'):
+            item = data['checkItem']
+            doc['items'][item['id']] = (data.get('checklist', {}).get('id'), item.get('name', ''))
+        elif action_type == 'deleteCheckItem':
+            doc['items'].pop(data['checkItem']['id'], None)
+        elif action_type == 'removeChecklistFromCard':
+            checklist_id = data['checklist']['id']
+            doc['items'] = dict((item_id, item) for item_id, item in doc['items'].items()
+                                if item[0] != checklist_id)
+        self._reindex(card_id)
+
+    def _fetch_doc(self, card_id):
+        """Index a card from its current version, fetched in one request"""
+        json_obj = self.client.fetch_json('/cards/' + card_id, query_params={
+            'fields': 'name,desc,closed', 'checklists': 'all',
+            'actions': 'commentCard', 'actions_limit': 1000})
+        if json_obj.get('closed'):
+            return
+        doc = {'name': json_obj.get('name') or '', 'desc': json_obj.get('desc') or '',
+               'items': {}, 'comments': {}}
+        for checklist in json_obj.get('checklists', []):
+            for item in checklist['checkItems']:
+                doc['items'][item['id']] = (checklist['id'], item['name'])
+        for comment in json_obj.get('actions', []):
+            doc['comments'][comment['id']] = comment['data'].get('text', '')
+        self._docs[card_id] = doc
+        self._reindex(card_id)
+
+    # Queries
+
+    def _expand(self, word):
+        """Indexed terms starting with word"""
+        i = bisect.bisect_left(self._vocabulary, word)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(word):
+            yield self._vocabulary[i]
+            i += 1
+
+    def search(self, query, limit=10, prefix=True, fallback=False, board_ids=None):
+        """
+        Cards containing all the words of the query, best matches first.
+
+        :query: the words to look for
+        :limit: maximum number of results
+        :prefix: match the indexed words starting with the query words,
+            otherwise only identical words
+        :fallback: when nothing matches locally, search with the Trello API
+            (requires the client), the score of these results is 0
+        :board_ids: boards searched by the fallback
+        :rtype: list of SearchHit (card_id, name, score)
+        """
+        words = tokenize(query)
+        count = float(len(self._docs) or 1)
+        matches = []
+        for word in set(words):
+            terms = self._expand(word) if prefix else [word]
+            postings = [self._postings[term] for term in terms if term in self._postings]
+            matches.append((sum(len(p) for p in postings), postings))
+        # Start with the rarest word, the others only score its cards
+        matches.sort(key=lambda match: match[0])
+        scores = None
+        for _, postings in matches:
+            word_scores = defaultdict(float)
+            for term_postings in postings:
+                idf = math.log(1 + count / len(term_postings))
+                if scores is None:
+                    for card_id, weight in term_postings.items():
+                        word_scores[card_id] += weight * idf
+                else:
+                    for card_id in scores:
+                        weight = term_postings.get(card_id)
+                        if weight is not None:
+                            word_scores[card_id] += weight * idf
+            if scores is not None:
+                for card_id in word_scores:
+                    word_scores[card_id] += scores[card_id]
+            scores = word_scores
+            if not scores:
+                break
+
+        hits = [SearchHit(card_id, self._docs[card_id]['name'], score)
+                for score, card_id in heapq.nlargest(limit, ((score, card_id)
+                                                             for card_id, score in (scores or {}).items()))]
+        if not hits and fallback and self.client is not None and words:
+            cards = self.client.search(query, partial_match=prefix, models=['cards'],
+                                       board_ids=board_ids or [], cards_limit=limit)
+            hits = [SearchHit(card.id, card.name, 0.0) for card in cards]
+        return hits
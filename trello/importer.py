@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from trello.checkpoint import Checkpoint
+from trello.export import read_export
+from trello.ratelimit import call_with_retries
+
+
+class BoardImporter(object):
+    """
+    Rebuild a board from a JSONL export bundle (see trello.export) in
+    dependency order: the board, then labels, lists and custom field
+    definitions, then cards, then checklists, then checklist items and
+    custom field values. The objects of a stage are created in parallel.
+
+    The mapping from the exported ids to the new ones is saved in a
+    checkpoint after each chunk of objects, so an interrupted import resumes
+    where it stopped when run again. When a creation fails, the other
+    objects of its chunk are saved before the error is raised.
+
+    Requests go through the client, give it a trello.ratelimit.RateLimiter
+    to stay under Trello's rate limits; requests rejected anyway are retried.
+
+        client = TrelloClient(api_key, token=token, rate_limiter=RateLimiter())
+        board = BoardImporter(client, 'backup/').run()
+    """
+
+    CHECKPOINT_NAME = 'import-checkpoint.json'
+
+    def __init__(self, client, directory, board_name=None, organization_id=None,
+                 max_workers=8, chunk_size=100, max_retries=5):
+        """
+        :client: the TrelloClient the board is created with
+        :directory: directory of the export bundle
+        :board_name: name of the new board, defaults to the exported one
+        :organization_id: organization the new board belongs to
+        :max_workers: number of requests made in parallel
+        :chunk_size: number of objects submitted to the workers at a time,
+            and saved in the checkpoint together
+        :max_retries: number of retries of a request rejected by the rate limit
+        """
+        self.client = client
+        self.directory = directory
+        self.board_name = board_name
+        self.organization_id = organization_id
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.checkpoint = Checkpoint(os.path.join(directory, self.CHECKPOINT_NAME))
+        self.ids = self.checkpoint.get('ids', {})
+
+    def run(self):
+        """
+        Import the bundle, resuming a previous interrupted import if any.
+
+        :return: the new board
+        :rtype: Board
+        """
+        stages = [
+            ('board', self._board_objects, self._create_board),
+            ('labels', lambda: self._read('labels'), self._create_label),
+            ('lists', lambda: self._read('lists'), self._create_list),
+            ('custom_fields', lambda: self._read('custom_fields'), self._create_custom_field),
+            ('cards', lambda: self._read('cards'), self._create_card),
+            ('checklists', lambda: self._read('checklists'), self._create_checklist),
+            ('check_items', self._check_items, self._create_check_item),
+            ('custom_field_items', lambda: self._read('custom_field_items'),
+             self._set_custom_field_item),
+        ]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for name, objects, create in stages:
+                if name in self.checkpoint.get('done', []):
+                    continue
+                self._run_stage(executor, objects(), create)
+                self.checkpoint.update(ids=self.ids, done=self.checkpoint.get('done', []) + [name])
+        return self.client.get_board(self.board_id)
+
+    @property
+    def board_id(self):
+        return self.ids['board']
+
+    def _read(self, stream):
+        return read_export(self.directory, stream)
+
+    def _run_stage(self, executor, objects, create):
+        objects = (obj for obj in objects if obj['id'] not in self.ids)
+        while True:
+            chunk = list(itertools.islice(objects, self.chunk_size))
+            if not chunk:
+                break
+            futures = dict((executor.submit(self._call, create, obj), obj) for obj in chunk)
+            error = None
+            for future in as_completed(futures):
+                try:
+                    new_id = future.result()
+                except Exception as e:
+                    # Save the other objects of the chunk before raising
+                    error = error or e
+                    continue
+                # Only this thread writes the ids, the workers return theirs
+                if isinstance(new_id, tuple):
+                    new_id, nested_ids = new_id
+                    self.ids.update(nested_ids)
+                self.ids[futures[future]['id']] = new_id
+            self.checkpoint.update(ids=self.ids)
+            if error is not None:
+                raise error
+
+    def _call(self, function, *args):
+        return call_with_retries(self.client, function, args, self.max_retries)
+
+    def _board_objects(self):
+        board = next(self._read('board'), {'name': 'Imported board'})
+        # The new board id is stored under 'board'
+        return [dict(board, id='board', desc=board.get('desc', ''))]
+
+    def _create_board(self, board_json):
+        post_args = {'name': self.board_name or board_json['name'],
+                     'desc': board_json['desc'], 'defaultLists': False,
+                     'defaultLabels': False}
+        if self.organization_id:
+            post_args['idOrganization'] = self.organization_id
+        return self.client.fetch_json('/boards', http_method='POST', post_args=post_args)['id']
+
+    def _create_label(self, label_json):
+        return self.client.fetch_json(
+            '/labels', http_method='POST',
+            post_args={'name': label_json['name'], 'color': label_json['color'],
+                       'idBoard': self.board_id})['id']
+
+    def _create_list(self, list_json):
+        new_id = self.client.fetch_json(
+            '/lists', http_method='POST',
+            post_args={'name': list_json['name'], 'pos': list_json['pos'],
+                       'idBoard': self.board_id})['id']
+        if list_json.get('closed'):
+            self.client.fetch_json('/lists/' + new_id + '/closed', http_method='PUT',
+                                   post_args={'value': True})
+        return new_id
+
+    def _create_custom_field(self, field_json):
+        """Create a custom field definition, return its id and the ids of
+        its options by exported id"""
+        post_args = {'idModel': self.board_id, 'modelType': 'board',
+                     'name': field_json['name'], 'type': field_json['type'],
+                     'pos': field_json.get('pos', 'bottom'), 'display_cardFront': True}
+        options = field_json.get('options') or []
+        if options:
+            post_args['options'] = [{'value': option['value'], 'color': option.get('color', 'none'),
+                                     'pos': option.get('pos', 'bottom')} for option in options]
+        json_obj = self.client.fetch_json('/customFields', http_method='POST', post_args=post_args)
+        # Options are created in the same order
+        option_ids = dict((option['id'], new_option['id'])
+                          for option, new_option in zip(options, json_obj.get('options') or []))
+        return json_obj['id'], option_ids
+
+    def _create_card(self, card_json):
+        post_args = {
+            'name': card_json['name'],
+            'desc': card_json.get('desc', ''),
+            'idList': self.ids[card_json['idList']],
+            'pos': card_json.get('pos', 'bottom'),
+            'idLabels': ','.join(self.ids[label_id] for label_id in card_json.get('idLabels', [])
+                                 if label_id in self.ids),
+        }
+        if card_json.get('due'):
+            post_args['due'] = card_json['due']
+            post_args['dueComplete'] = card_json.get('dueComplete', False)
+        new_id = self.client.fetch_json('/cards', http_method='POST', post_args=post_args)['id']
+        if card_json.get('closed'):
+            self.client.fetch_json('/cards/' + new_id, http_method='PUT',
+                                   post_args={'closed': True})
+        return new_id
+
+    def _create_checklist(self, checklist_json):
+        return self.client.fetch_json(
+            '/checklists', http_method='POST',
+            post_args={'idCard': self.ids[checklist_json['idCard']],
+                       'name': checklist_json['name'],
+                       'pos': checklist_json.get('pos', 'bottom')})['id']
+
+    def _check_items(self):
+        for checklist_json in self._read('checklists'):
+            for item in checklist_json.get('checkItems', []):
+                yield dict(item, idChecklist=checklist_json['id'])
+
+    def _create_check_item(self, item_json):
+        return self.client.fetch_json(
+            '/checklists/' + self.ids[item_json['idChecklist']] + '/checkItems',
+            http_method='POST',
+            post_args={'name': item_json['name'], 'pos': item_json.get('pos', 'bottom'),
+                       'checked': item_json.get('state') == 'complete'})['id']
+
+    def _set_custom_field_item(self, item_json):
+        if item_json.get('idValue'):
+            post_args = {'idValue': self.ids[item_json['idValue']]}
+        else:
+            post_args = {'value': item_json['value']}
+        json_obj = self.client.fetch_json(
+            '/cards/' + self.ids[item_json['idModel']] +
+            '/customField/' + self.ids[item_json['idCustomField']] + '/item',
+            http_method='PUT',
+            post_args=post_args)
+        return json_obj.get('id', item_json['id'])
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import bisect
+import calendar
+import datetime
+from collections import defaultdict
+
+from dateutil import parser as dateparser
+
+
+def _timestamp(value):
+    """
+    UTC timestamp of a datetime (naive ones are taken as UTC) or of a date
+    string. Sorted indexes use timestamps, which compare much faster than
+    timezone aware datetimes.
+    """
+    if not isinstance(value, datetime.datetime):
+        try:
+            value = datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%fZ')
+        except ValueError:
+            value = dateparser.parse(value)
+    return calendar.timegm(value.utctimetuple()) + value.microsecond / 1e6
+
+
+class _SortedIndex(object):
+    """(key, card id) pairs kept sorted, for range queries"""
+
+    def __init__(self):
+        self._entries = []
+
+    def add(self, key, card_id, keep_sorted=True):
+        if keep_sorted:
+            bisect.insort(self._entries, (key, card_id))
+        else:
+            self._entries.append((key, card_id))
+
+    def sort(self):
+        self._entries.sort()
+
+    def remove(self, key, card_id):
+        i = bisect.bisect_left(self._entries, (key, card_id))
+        if i < len(self._entries) and self._entries[i] == (key, card_id):
+            del self._entries[i]
+
+    def bounds(self, after=None, before=None):
+        """Slice of the entries whose key is in [after, before)"""
+        start = 0 if after is None else bisect.bisect_left(self._entries, (_timestamp(after),))
+        end = len(self._entries) if before is None else bisect.bisect_left(self._entries, (_timestamp(before),))
+        return start, max(start, end)
+
+    def range(self, after=None, before=None):
+        """Ids of the cards whose key is in [after, before), sorted by key"""
+        start, end = self.bounds(after, before)
+        return [card_id for _, card_id in self._entries[start:end]]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CardIndex(object):
+    """
+    In-memory index of cards, to query them without scanning every card.
+
+    Cards are indexed by list, labels, members, custom field values and
+    closed state with hash indexes, and by due date and date of last
+    activity with sorted indexes. A query intersects the sets of card ids
+    matching each criterion, starting with the smallest.
+
+        index = CardIndex.from_board(board)
+        cards = index.query(list_id=doing.id, label_ids=[bug.id],
+                            due_before=datetime.now(pytz.utc))
+
+    The index is not updated by the API calls made on the cards; call
+    add() (which replaces the previous version of a card) and remove() as
+    the cards change.
+    """
+
+    def __init__(self, cards=()):
+        """
+        :cards: the Card objects to index
+        """
+        self._cards = {}
+        self._entries = {}
+        self._by_list = defaultdict(set)
+        self._by_label = defaultdict(set)
+        self._by_member = defaultdict(set)
+        self._by_field = defaultdict(set)
+        self._by_closed = defaultdict(set)
+        self._due = _SortedIndex()
+        self._activity = _SortedIndex()
+        self._field_ids = {}
+        self._known_fields = set()
+        self.add_all(cards)
+
+    @classmethod
+    def from_board(cls, board, card_filter='open'):
+        """
+        Index the cards of a board, fetched with their custom fields in one
+        request.
+
+        :card_filter: 'open', 'closed' or 'all'
+        :rtype: CardIndex
+        """
+        return cls(board.get_cards({'filter': card_filter, 'fields': 'all', 'customFieldItems': 'true'}))
+
+    def __len__(self):
+        return len(self._cards)
+
+    def __contains__(self, card_id):
+        return card_id in self._cards
+
+    def get(self, card_id):
+        return self._cards.get(card_id)
+
+    def _entry(self, card):
+        fields = []
+        for custom_field in card.customFields or []:
+            if custom_field.definition_id not in self._known_fields:
+                # Allow querying by name, the name is looked up once
+                self._known_fields.add(custom_field.definition_id)
+                self._field_ids[custom_field.name] = custom_field.definition_id
+            fields.append((custom_field.definition_id, _hashable(custom_field.value)))
+        due = _timestamp(card.due) if card.due else None
+        activity = getattr(card, 'dateLastActivity', None)
+        return {
+            'list': card.idList,
+            'labels': tuple(card.idLabels or ()),
+            'members': tuple(card.idMembers or ()),
+            'fields': tuple(fields),
+            'closed': bool(card.closed),
+            'due': due,
+            'activity': _timestamp(activity) if activity else None,
+        }
+
+    def add(self, card, _keep_sorted=True):
+        """Index a card, replacing its previous version if it was indexed"""
+        if card.id in self._cards:
+            self.remove(card.id)
+        entry = self._entry(card)
+        self._cards[card.id] = card
+        self._entries[card.id] = entry
+        self._by_list[entry['list']].add(card.id)
+        for label_id in entry['labels']:
+            self._by_label[label_id].add(card.id)
+        for member_id in entry['members']:
+            self._by_member[member_id].add(card.id)
+        for field in entry['fields']:
+            self._by_field[field].add(card.id)
+        self._by_closed[entry['closed']].add(card.id)
+        if entry['due'] is not None:
+            self._due.add(entry['due'], card.id, _keep_sorted)
+        if entry['activity'] is not None:
+            self._activity.add(entry['activity'], card.id, _keep_sorted)
+
+    update = add
+
+    def add_all(self, cards):
+        """Index many cards, faster than adding them one by one"""
+        for card in cards:
+            self.add(card, _keep_sorted=False)
+        self._due.sort()
+        self._activity.sort()
+
+    def remove(self, card_id):
+        """Remove a card from the index, if it is indexed"""
+        entry = self._entries.pop(card_id, None)
+        if entry is None:
+            return
+        del self._cards[card_id]
+        _discard(self._by_list, entry['list'], card_id)
+        for label_id in entry['labels']:
+            _discard(self._by_label, label_id, card_id)
+        for member_id in entry['members']:
+            _discard(self._by_member, member_id, card_id)
+        for field in entry['fields']:
+            _discard(self._by_field, field, card_id)
+        _discard(self._by_closed, entry['closed'], card_id)
+        if entry['due'] is not None:
+            self._due.remove(entry['due'], card_id)
+        if entry['activity'] is not None:
+            self._activity.remove(entry['activity'], card_id)
+
+    def query_ids(self, list_id=None, label_ids=None, member_ids=None, custom_fields=None,
+                  closed=None, due_after=None, due_before=None, active_after=None,
+                  active_before=None):
+        """
+        Ids of the cards matching all the given criteria.
+
+        :list_id: id of the list of the cards, or a list of ids (any of them)
+        :label_ids: ids of labels the cards all have
+        :member_ids: ids of members the cards are all assigned to
+        :custom_fields: dict of custom field values by definition id or name
+        :closed: True or False to select archived or open cards
+        :due_after: the cards due at or after this datetime
+        :due_before: the cards due before this datetime
+        :active_after: the cards whose last activity is at or after this datetime
+        :active_before: the cards whose last activity is before this datetime
+        :rtype: set of card ids
+        """
+        candidates = []
+        if list_id is not None:
+            if isinstance(list_id, (list, tuple, set, frozenset)):
+                candidates.append(set().union(*[self._by_list.get(i, ()) for i in list_id]))
+            else:
+                candidates.append(self._by_list.get(list_id, set()))
+        for label_id in label_ids or ():
+            candidates.append(self._by_label.get(label_id, set()))
+        for member_id in member_ids or ():
+            candidates.append(self._by_member.get(member_id, set()))
+        for field, value in (custom_fields or {}).items():
+            field_id = self._field_ids.get(field, field)
+            candidates.append(self._by_field.get((field_id, _hashable(value)), set()))
+        if closed is not None:
+            candidates.append(self._by_closed.get(bool(closed), set()))
+
+        # A range is only turned into a set of ids when it is smaller than
+        # the other candidates, otherwise the candidates are filtered
+        range_filters = []
+        for name, index, after, before in (('due', self._due, due_after, due_before),
+                                           ('activity', self._activity, active_after, active_before)):
+            if after is None and before is None:
+                continue
+            start, end = index.bounds(after, before)
+            if candidates and min(len(ids) for ids in candidates) < end - start:
+                range_filters.append((name, after, before))
+            else:
+                candidates.append(set(card_id for _, card_id in index._entries[start:end]))
+
+        if not candidates:
+            return set(self._cards)
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for ids in candidates[1:]:
+            if not result:
+                break
+            result &= ids
+        for name, after, before in range_filters:
+            low = float('-inf') if after is None else _timestamp(after)
+            high = float('inf') if before is None else _timestamp(before)
+            result = set(card_id for card_id in result
+                         if self._entries[card_id][name] is not None and
+                         low <= self._entries[card_id][name] < high)
+        return result
+
+    def query(self, **criteria):
+        """
+        Cards matching all the given criteria, see query_ids.
+
+        :rtype: list of Card
+        """
+        return [self._cards[card_id] for card_id in self.query_ids(**criteria)]
+
+    def due_between(self, after=None, before=None):
+        """
+        Cards due in [after, before), sorted by due date.
+
+        :rtype: list of Card
+        """
+        return [self._cards[card_id] for card_id in self._due.range(after, before)]
+
+
+def _hashable(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _discard(index, key, card_id):
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(card_id)
+        if not ids:
+            del index[key]
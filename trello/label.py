@@ -26,8 +26,8 @@ class Label(TrelloBase):
         """
         label = Label(board.client,
                       label_id=json_obj['id'],
-                      name=json_obj['name'],
-                      color=json_obj['color'])
+                      name=json_obj.get('name', ''),
+                      color=json_obj.get('color'))
         return label
 
     @classmethod
@@ -37,6 +37,14 @@ class Label(TrelloBase):
     def __repr__(self):
         return force_str(u'<Label %s>' % self.name)
 
+    def set_color(self, color):
+        """Change the color of this label"""
+        self.client.fetch_json(
+            '/labels/' + self.id + '/color',
+            http_method='PUT',
+            post_args={'value': color})
+        self.color = color
+
     def fetch(self):
         """Fetch all attributes for this label"""
         json_obj = self.client.fetch_json('/labels/' + self.id)
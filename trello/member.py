@@ -55,6 +55,59 @@ class Member(TrelloBase):
             query_params={'filter': ",".join(filters)})
         return sorted(notifications, key=lambda notification: notification['date'])
 
+    def iter_notifications(self, since=None, read_filter='all', filters=(), checkpoint_path=None,
+                           page_size=1000):
+        """Iterate over the notifications of this member, newest first,
+        fetching them page by page as they are consumed
+
+        :since: id or datetime, only the notifications after it are returned
+        :read_filter: 'all', 'read' or 'unread'
+        :filters: notification types, eg. ['commentCard', 'mentionedOnCard']
+        :checkpoint_path: file recording the newest notification seen for
+            these filters, used as the since cursor when since is not given.
+            It is updated once all the notifications have been consumed, so a
+            poll only fetches the new notifications.
+        :page_size: number of notifications per request
+        :rtype: iterator of notification json objects
+        """
+        from trello.checkpoint import Checkpoint
+        checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+        # One cursor per query: the newest notification of one filter says
+        # nothing about the others
+        cursor_key = 'notifications:%s:%s:%s' % (self.id, read_filter, ','.join(sorted(filters)))
+        if since is None and checkpoint is not None:
+            since = checkpoint.get(cursor_key)
+        query_params = {'read_filter': read_filter}
+        if filters:
+            query_params['filter'] = ','.join(filters)
+        if since:
+            query_params['since'] = since.isoformat() if hasattr(since, 'isoformat') else since
+
+        newest = None
+        for page in self.client.fetch_json_pages('/members/' + self.id + '/notifications',
+                                                 query_params=query_params, page_size=page_size):
+            if newest is None:
+                newest = page[0]['id']
+            for notification in page:
+                yield notification
+        if checkpoint is not None and newest is not None:
+            checkpoint.update({cursor_key: newest})
+
+    def mark_notifications_read(self, notifications=None, read=True):
+        """Mark notifications as read (or unread) with a single request
+
+        :notifications: notification json objects or ids, all the
+            notifications of the member if None
+        :read: False to mark them as unread
+        """
+        post_args = {'read': 'true' if read else 'false'}
+        if notifications is not None:
+            ids = [n['id'] if isinstance(n, dict) else n for n in notifications]
+            if not ids:
+                return
+            post_args['ids'] = ','.join(ids)
+        self.client.fetch_json('/notifications/all/read', http_method='POST', post_args=post_args)
+
     def get_boards(self, list_filter):
         """Get boards using filter
 
@@ -77,7 +130,7 @@ class Member(TrelloBase):
         :json_obj: the member json object
         """
 
-        member = Member(trello_client, json_obj['id'], full_name=json_obj['fullName'])
+        member = Member(trello_client, json_obj['id'], full_name=json_obj.get('fullName', ''))
         member.username = json_obj.get('username', '')
         member.initials = json_obj.get('initials', '')
         # cannot close an organization
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import bisect
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+try:
+    timer = time.perf_counter
+except AttributeError:  # Python 2
+    timer = time.time
+
+_ID_RE = re.compile(r'^[0-9a-fA-F]{24}$')
+
+# Path segments followed by the id of an object
+_COLLECTIONS = frozenset([
+    'actions', 'attachments', 'boards', 'boardStars', 'card', 'cards', 'checkItem',
+    'checkItems', 'checklist', 'checklists', 'customField', 'customFields', 'download', 'idLabels',
+    'idMembers', 'labels', 'lists', 'members', 'notifications', 'organizations',
+    'tokens', 'webhooks',
+])
+
+# Segments following a collection that are not ids, eg. /boards/<id>/cards/open
+_NOT_IDS = frozenset(['all', 'open', 'closed', 'visible', 'none', 'comments'])
+
+# Modules of the request path, skipped when looking for the caller
+_CLIENT_FILES = ('trelloclient.py', 'metrics.py', 'singleflight.py')
+
+
+def endpoint_template(uri_path):
+    """
+    Normalize a request path, replacing the ids by {id}, eg.
+    '/cards/5a1b.../checklists' gives '/cards/{id}/checklists'
+    """
+    segments = uri_path.split('?', 1)[0].strip('/').split('/')
+    if segments and segments[0] == '1':
+        segments = segments[1:]
+    template = []
+    for i, segment in enumerate(segments):
+        if _ID_RE.match(segment) or (i > 0 and segments[i - 1] in _COLLECTIONS and
+                                     segment not in _NOT_IDS and segment not in _COLLECTIONS):
+            segment = '{id}'
+        template.append(segment)
+    return '/' + '/'.join(template)
+
+
+def _caller():
+    """Name of the first function up the stack outside of the client"""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.endswith(_CLIENT_FILES):
+        frame = frame.f_back
+    if frame is None:
+        return None
+    instance = frame.f_locals.get('self', frame.f_locals.get('cls'))
+    if instance is None:
+        return frame.f_code.co_name
+    owner = instance if isinstance(instance, type) else type(instance)
+    return owner.__name__ + '.' + frame.f_code.co_name
+
+
+class RequestRecord(object):
+    """
+    A request made by TrelloClient.fetch_json, as passed to the hooks.
+
+    :method: HTTP method
+    :uri_path: path of the request, eg. '/cards/<id>/checklists'
+    :endpoint: the path with the ids replaced, eg. '/cards/{id}/checklists'
+    :query_params: dict of the query parameters
+    :post_args: dict of the body of the request
+    :caller: name of the function that made the request, eg. 'Card.fetch'
+    :response: the response, None before the request and on errors
+    :error: the exception raised by the http_service, if any
+    :elapsed: duration of the request in seconds
+    :size: size of the response body in bytes
+    """
+
+    __slots__ = ('method', 'uri_path', 'endpoint', 'query_params', 'post_args', 'caller',
+                 'response', 'error', 'elapsed', 'size')
+
+    def __init__(self, method, uri_path, query_params, post_args):
+        self.method = method
+        self.uri_path = uri_path
+        self.endpoint = endpoint_template(uri_path)
+        self.query_params = query_params
+        self.post_args = post_args
+        self.caller = _caller()
+        self.response = None
+        self.error = None
+        self.elapsed = None
+        self.size = None
+
+    @property
+    def status_code(self):
+        return self.response.status_code if self.response is not None else None
+
+    @property
+    def failed(self):
+        """Whether the request raised or got a non-2xx status"""
+        return self.error is not None or not (200 <= (self.status_code or 0) < 300)
+
+    def __repr__(self):
+        return '<RequestRecord %s %s %s>' % (self.method, self.endpoint, self.status_code)
+
+
+class _EndpointStats(object):
+
+    def __init__(self, buckets):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.histogram = [0] * (len(buckets) + 1)
+
+    def as_dict(self, buckets):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'bytes': self.bytes,
+            'total_time': self.total_time,
+            'mean_time': self.total_time / self.count if self.count else 0.0,
+            'max_time': self.max_time,
+            'histogram': dict(zip([str(bucket) for bucket in buckets] + ['+Inf'], self.histogram)),
+        }
+
+
+class RequestMetrics(object):
+    """
+    Counters and latency histograms of requests, by method and endpoint
+    template. Every TrelloClient records its requests in client.metrics.
+
+        client.metrics.report()['GET /boards/{id}/cards']['mean_time']
+    """
+
+    BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=BUCKETS):
+        """
+        :buckets: upper bounds in seconds of the latency histogram buckets
+        """
+        self.buckets = tuple(buckets)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, record):
+        """Account for a finished request (a RequestRecord)"""
+        key = record.method + ' ' + record.endpoint
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _EndpointStats(self.buckets)
+            stats.count += 1
+            if record.failed:
+                stats.errors += 1
+            stats.bytes += record.size or 0
+            elapsed = record.elapsed or 0.0
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            stats.histogram[bisect.bisect_left(self.buckets, elapsed)] += 1
+
+    def report(self):
+        """
+        :return: dict of the statistics by '<method> <endpoint>': count,
+            errors, bytes, total_time, mean_time, max_time and histogram
+            (number of requests by bucket upper bound)
+        """
+        with self._lock:
+            return dict((key, stats.as_dict(self.buckets)) for key, stats in self._stats.items())
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+
+class RequestTracker(object):
+    """
+    Context manager counting the requests a client makes during a block of
+    code (in any thread).
+
+        with client.track_requests() as tracker:
+            card.fetch()
+        print(tracker.count, tracker.time, tracker.by_endpoint)
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.time = 0.0
+        self.wall_time = None
+        self.by_endpoint = Counter()
+        self.by_caller = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        with self._lock:
+            self.count += 1
+            if record.failed:
+                self.errors += 1
+            self.bytes += record.size or 0
+            self.time += record.elapsed or 0.0
+            self.by_endpoint[record.method + ' ' + record.endpoint] += 1
+            self.by_caller[record.caller] += 1
+
+    def __enter__(self):
+        self._started = timer()
+        self.client.response_hooks.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.client.response_hooks.remove(self)
+        self.wall_time = timer() - self._started
+
+    def __repr__(self):
+        return '<RequestTracker %d requests in %.3fs>' % (self.count, self.time)
@@ -27,9 +27,9 @@ class Organization(TrelloBase):
         :trello_client: the trello client
         :json_obj: the board json object
         """
-        organization = Organization(trello_client, json_obj['id'], name=json_obj['name'])
+        organization = Organization(trello_client, json_obj['id'], name=json_obj.get('name', ''))
         organization.description = json_obj.get('desc', '')
-        organization.url = json_obj['url']
+        organization.url = json_obj.get('url')
         return organization
 
     def __repr__(self):
@@ -42,19 +42,24 @@ class Organization(TrelloBase):
         self.description = json_obj.get('desc', '')
         self.url = json_obj['url']
 
-    def all_boards(self):
+    def all_boards(self, fields=None):
         """Returns all boards on this organization"""
-        return self.get_boards('all')
+        return self.get_boards('all', fields=fields)
 
-    def get_boards(self, list_filter):
+    def get_boards(self, list_filter, fields=None):
         """Get boards using filter
 
+        :fields: comma separated board fields to load, eg. 'name,closed'
+            (Trello's default fields by default)
         :rtype: list of Board
         """
         from trello.board import Board
+        query_params = {'lists': 'none', 'filter': list_filter}
+        if fields:
+            query_params['fields'] = fields
         json_obj = self.client.fetch_json(
             '/organizations/' + self.id + '/boards',
-            query_params={'lists': 'none', 'filter': list_filter})
+            query_params=query_params)
         return [Board.from_json(organization=self, json_obj=obj) for obj in json_obj]
 
     def get_board(self, field_name):
@@ -68,11 +73,27 @@ class Organization(TrelloBase):
             query_params={'filter': 'open', 'fields': field_name})
         return [Board.from_json(organization=self, json_obj=obj) for obj in json_obj]
 
-    def get_members(self):
+    def crawl(self, sink, checkpoint_path=None, max_workers=8, board_filter='open',
+              actions_filter='all', progress=None):
+        """Snapshot all the boards of this organization in parallel, see
+        trello.crawl.OrganizationCrawler for the parameters
+
+        :sink: function called with the snapshot of each board, eg. a
+            trello.crawl.DirectorySink
+        :checkpoint_path: file recording the boards already crawled, so an
+            interrupted crawl resumes where it stopped
+        :rtype: CrawlProgress
+        """
+        from trello.crawl import OrganizationCrawler
+        return OrganizationCrawler(self, sink, checkpoint_path=checkpoint_path,
+                                   max_workers=max_workers, board_filter=board_filter,
+                                   actions_filter=actions_filter, progress=progress).run()
+
+    def get_members(self, fields='id,fullName,username,initials'):
         json_obj = self.client.fetch_json(
             '/organizations/' + self.id + '/members',
             query_params={'filter': 'all',
-                          'fields': 'id,fullName,username,initials'})
+                          'fields': fields})
         return [Member.from_json(trello_client=self.client, json_obj=obj) for obj in json_obj]
 
     def add_member(self, member, member_type="normal"):
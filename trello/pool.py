@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import threading
+
+from trello.ratelimit import RateLimiter
+from trello.trelloclient import TrelloClient
+
+
+class TrelloClientPool(TrelloClient):
+    """
+    TrelloClient spreading its requests over several tokens, each with its
+    own rate limiter, to make more requests than the limit of one token
+    allows. It is used like a TrelloClient: boards, lists and cards fetched
+    with it make their requests through the pool.
+
+        client = TrelloClientPool(api_key, tokens=[token1, token2, token3])
+        board = client.get_board(board_id)
+
+    Reads go to the token with the most requests left in its bucket.
+    Writes go to the first token, or to the token that last had the
+    permission to change the object: when a request is refused (401) or
+    rejected by the rate limit (429, for reads only), it is made again with
+    the next token, and the token that succeeded is remembered for the
+    writes to that object.
+    """
+
+    def __init__(self, api_key, tokens, api_secret=None, http_service=None, rate=100,
+                 period=10.0, coalesce_requests=False):
+        """
+        :api_key: API key generated at https://trello.com/1/appKey/generate
+        :tokens: the tokens, or (token, token secret) tuples
+        :api_secret: the secret component of api_key
+        :rate: number of requests allowed per period for each token
+        :period: length of the rate limit period in seconds
+        """
+        credentials = [token if isinstance(token, (tuple, list)) else (token, None) for token in tokens]
+        if not credentials:
+            raise ValueError('TrelloClientPool needs at least one token')
+        super(TrelloClientPool, self).__init__(api_key, api_secret=api_secret, token=credentials[0][0],
+                                               token_secret=credentials[0][1], http_service=http_service,
+                                               coalesce_requests=coalesce_requests)
+        self.clients = []
+        for token, token_secret in credentials:
+            client = TrelloClient(api_key, api_secret=api_secret, token=token, token_secret=token_secret,
+                                  http_service=http_service, rate_limiter=RateLimiter(rate, period),
+                                  coalesce_requests=False)
+            # The requests are seen by the hooks and metrics of the pool
+            client.request_hooks = self.request_hooks
+            client.response_hooks = self.response_hooks
+            client.metrics = self.metrics
+            self.clients.append(client)
+        self.requests_by_token = dict((token, 0) for token, _ in credentials)
+        self._in_flight = [0] * len(self.clients)
+        self._write_clients = {}
+        self._lock = threading.Lock()
+
+    def _pick(self, exclude):
+        """Index of the least loaded client"""
+        with self._lock:
+            candidates = [i for i in range(len(self.clients)) if i not in exclude]
+            return max(candidates, key=lambda i: self.clients[i].rate_limiter.available - self._in_flight[i])
+
+    def _send(self, http_method, uri_path, url, headers, query_params, post_args, data, files,
+              stream=False):
+        write = http_method != 'GET'
+        key = _object_key(uri_path)
+        tried = set()
+        while True:
+            if write:
+                with self._lock:
+                    i = self._write_clients.get(key, 0)
+                if i in tried:
+                    i = min(set(range(len(self.clients))) - tried)
+            else:
+                i = self._pick(tried)
+            tried.add(i)
+            client = self.clients[i]
+            with self._lock:
+                self._in_flight[i] += 1
+                self.requests_by_token[client.resource_owner_key] += 1
+            try:
+                if hasattr(data, 'reset') and len(tried) > 1:
+                    data.reset()
+                response = client._send(http_method, uri_path, url, headers, dict(query_params), post_args,
+                                        data, files, stream=stream)
+            finally:
+                with self._lock:
+                    self._in_flight[i] -= 1
+
+            retry = response.status_code == 401 or (response.status_code == 429 and not write)
+            if not retry or len(tried) == len(self.clients):
+                if write and key is not None and response.status_code == 200:
+                    with self._lock:
+                        self._write_clients[key] = i
+                return response
+            if response.status_code == 429:
+                client.rate_limiter.penalize(1.0)
+            response.close()
+
+
+def _object_key(uri_path):
+    """'cards/<id>' for '/cards/<id>/checklists', None for '/cards'"""
+    segments = uri_path.strip('/').split('/')
+    if segments and segments[0] == '1':
+        segments = segments[1:]
+    return '/'.join(segments[:2]) if len(segments) >= 2 else None
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Reordering cards and lists from their cached positions.
+
+To put the cards of a list in a new order, only the cards outside the
+longest run already in that order need to move. plan_order finds them with
+the positions the objects already have (no request), and gives each of them
+a position between its new neighbours. The moves are then made in
+parallel, each with a single request:
+
+    plan = plan_order(cards, sorted(cards, key=lambda card: card.due_date))
+    plan.apply(client)
+
+When a gap between two neighbours is too small to put a card in it (after
+many moves to the same place, positions run out of float precision), all
+the objects are given evenly spaced positions again instead.
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+import bisect
+
+from trello.ratelimit import call_with_retries
+
+# Space between two positions, the one Trello uses
+DEFAULT_GAP = 65536.0
+
+# Smallest gap a position is put in, relative to the positions around it
+MIN_RELATIVE_GAP = 1e-9
+
+
+def longest_increasing_subsequence(values):
+    """
+    Indexes of a longest strictly increasing subsequence of values, in
+    O(n log n). None values are never part of it.
+
+    :rtype: list of int
+    """
+    tails = []  # Smallest last value of an increasing run of each length
+    tail_indexes = []
+    previous = [-1] * len(values)
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        length = bisect.bisect_left(tails, value)
+        if length == len(tails):
+            tails.append(value)
+            tail_indexes.append(i)
+        else:
+            tails[length] = value
+            tail_indexes[length] = i
+        previous[i] = tail_indexes[length - 1] if length else -1
+
+    indexes = []
+    i = tail_indexes[-1] if tail_indexes else -1
+    while i != -1:
+        indexes.append(i)
+        i = previous[i]
+    indexes.reverse()
+    return indexes
+
+
+class PositionPlan(object):
+    """
+    Moves putting objects in a new order.
+
+    :order: the objects, in their new order
+    :positions: new position of each object, in the same order
+    :moves: (object, new position) of the objects that move
+    :rebalanced: whether all the objects are given new positions because
+        there was no room left between two of them
+    """
+
+    def __init__(self, order, positions, moves, rebalanced):
+        self.order = order
+        self.positions = positions
+        self.moves = moves
+        self.rebalanced = rebalanced
+
+    def __len__(self):
+        return len(self.moves)
+
+    def __repr__(self):
+        return '<PositionPlan %d moves of %d%s>' % (
+            len(self.moves), len(self.order), ', rebalanced' if self.rebalanced else '')
+
+    def apply(self, client, kind=None, max_workers=8, max_retries=5):
+        """
+        Make the moves, in parallel. Each object is given the position
+        Trello stored, as its pos attribute (or 'pos' key for json objects).
+
+        :client: the TrelloClient
+        :kind: 'cards' or 'lists', by default 'lists' if the objects are
+            Lists and 'cards' otherwise
+        :max_workers: number of requests made in parallel
+        :max_retries: number of retries of a request rejected by the rate limit
+        :rtype: list of the updated json objects
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        if kind is None:
+            from trello.trellolist import List
+            kind = 'lists' if self.order and isinstance(self.order[0], List) else 'cards'
+
+        def move(obj_pos):
+            obj, pos = obj_pos
+            uri_path = '/' + kind + '/' + _id(obj)
+            json_obj = call_with_retries(client, lambda: client.fetch_json(
+                uri_path, http_method='PUT', post_args={'pos': pos}), max_retries=max_retries)
+            # Trello may not keep the exact position asked for
+            _set_position(obj, json_obj.get('pos', pos) if isinstance(json_obj, dict) else pos)
+            return json_obj
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(move, self.moves))
+
+
+def plan_order(objects, order, gap=DEFAULT_GAP):
+    """
+    Plan the moves putting objects in the given order, from their current
+    positions.
+
+    :objects: the Cards or Lists (or card or list json objects) to
+        reorder, with their current positions, eg. the cards of a list.
+        Objects whose position is unknown or not a number are moved.
+    :order: the same objects or their ids, in the new order
+    :gap: space between the positions given to objects placed after the
+        last one, or to all the objects when rebalancing
+    :rtype: PositionPlan
+    """
+    by_id = dict((_id(obj), obj) for obj in objects)
+    order = [by_id.get(_id(obj)) for obj in order]
+    if any(obj is None for obj in order) or len(order) != len(by_id) or len(set(_id(obj) for obj in order)) != len(order):
+        raise ValueError('The order must hold each of the objects once')
+
+    current = [_position(obj) for obj in order]
+    positions = [None] * len(order)
+    for i in longest_increasing_subsequence(current):
+        positions[i] = current[i]
+
+    # Spread the objects that move between the ones that stay
+    rebalanced = False
+    i = 0
+    while i < len(order):
+        if positions[i] is not None:
+            i += 1
+            continue
+        end = i
+        while end < len(order) and positions[end] is None:
+            end += 1
+        low = positions[i - 1] if i > 0 else None
+        high = positions[end] if end < len(order) else None
+        run = _spread(low, high, end - i, gap)
+        if run is None:
+            rebalanced = True
+            break
+        positions[i:end] = run
+        i = end
+
+    if rebalanced:
+        positions = [gap * (i + 1) for i in range(len(order))]
+    moves = [(obj, pos) for obj, pos, old in zip(order, positions, current) if pos != old]
+    return PositionPlan(order, positions, moves, rebalanced)
+
+
+def _spread(low, high, count, gap):
+    """count increasing positions between low and high (None for no bound),
+    None if they do not fit"""
+    if high is None:
+        start = low or 0.0
+        return [start + gap * (k + 1) for k in range(count)]
+    low = low or 0.0
+    step = (high - low) / (count + 1)
+    if step <= MIN_RELATIVE_GAP * max(abs(high), 1.0):
+        return None
+    run = [low + step * (k + 1) for k in range(count)]
+    bounds = [low] + run + [high]
+    if any(a >= b for a, b in zip(bounds, bounds[1:])):
+        return None
+    return run
+
+
+def _id(obj):
+    if isinstance(obj, dict):
+        return obj['id']
+    return getattr(obj, 'id', obj)
+
+
+def _position(obj):
+    pos = obj.get('pos') if isinstance(obj, dict) else getattr(obj, 'pos', None)
+    try:
+        return float(pos)
+    except (TypeError, ValueError):
+        return None
+
+
+def _set_position(obj, pos):
+    if isinstance(obj, dict):
+        obj['pos'] = pos
+    else:
+        obj.pos = pos
+
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import threading
+import time
+
+from trello.exceptions import RateLimitExceeded
+
+
+class RateLimiter(object):
+    """
+    Thread-safe token bucket. Trello allows 100 requests per 10 seconds per
+    token (and 300 per 10 seconds per API key), which is the default.
+
+        client = TrelloClient(api_key, token=token, rate_limiter=RateLimiter())
+    """
+
+    def __init__(self, rate=100, period=10.0, clock=time.time, sleep=time.sleep):
+        """
+        :rate: number of requests allowed per period
+        :period: length of the period in seconds
+        """
+        self.rate = rate
+        self.period = float(period)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(rate)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(float(self.rate),
+                           self._tokens + (now - self._updated) * self.rate / self.period)
+        self._updated = now
+
+    @property
+    def available(self):
+        """Number of requests that can be made right now"""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self):
+        """Take a token if one is available, without waiting
+
+        :return: True if a token was taken
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self):
+        """Take a token, waiting until one is available"""
+        with self._lock:
+            self._refill()
+            # The token is reserved now, so the wait is computed once (waiting
+            # in a loop until a refill could spin on float rounding)
+            self._tokens -= 1
+            wait = -self._tokens * self.period / self.rate
+        if wait > 0:
+            self._sleep(wait)
+
+    def penalize(self, delay):
+        """Empty the bucket so no request is made for delay seconds, eg.
+        after the server answered that the limit was exceeded"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0) - delay * self.rate / self.period
+
+
+def call_with_retries(client, function, args=(), max_retries=5):
+    """
+    Call function(*args), retrying with an exponential backoff when Trello
+    rejects a request because of the rate limit. The backoff empties the
+    client's rate limiter if it has one, so other threads wait too.
+
+    :client: the TrelloClient making the requests
+    :max_retries: number of retries before RateLimitExceeded is raised
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return function(*args)
+        except RateLimitExceeded:
+            if attempt == max_retries:
+                raise
+            delay = 2 ** attempt
+            if client.rate_limiter is not None:
+                client.rate_limiter.penalize(delay)
+            else:
+                time.sleep(delay)
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+Synchronization of a board with another one (eg. a template board).
+
+Both boards are loaded into BoardModel objects, where lists, labels, cards,
+checklists and custom field values are keyed by name rather than by id.
+diff() compares two models and returns the operations that make the
+target look like the source; MutationPlan.apply() performs them through
+the Board, List, Card, Label and Checklist methods. Objects that did not
+change cost no request. Lists and cards are compared by their order rather
+than their positions, and only the ones out of order are moved (see
+trello.positions).
+
+    plan = diff(BoardModel.from_board(template), BoardModel.from_board(board))
+    plan.apply(max_workers=8)
+"""
+from __future__ import with_statement, print_function, absolute_import
+
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from trello.checklist import Checklist
+from trello.positions import plan_order
+
+
+class Operation(namedtuple('Operation', ['action', 'kind', 'key', 'changes'])):
+    """
+    A mutation of the target board.
+
+    :action: 'create', 'update', 'move', 'archive' (lists and cards) or
+        'delete' (labels and checklists)
+    :kind: 'list', 'label', 'card', 'checklist' or 'custom_field'
+    :key: stable key of the object (a name, or a (card key, name) pair for
+        checklists and custom field values)
+    :changes: dict of the new values of the fields
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<Operation %s %s %r %r>' % (self.action, self.kind, self.key, self.changes)
+
+
+def _label_key(name, color):
+    return name if name else 'color:' + (color or '')
+
+
+def _unique_key(keys, name):
+    """Key of an object named name, disambiguating duplicated names"""
+    key, i = name, 1
+    while key in keys:
+        i += 1
+        key = u'%s #%d' % (name, i)
+    return key
+
+
+class BoardModel(object):
+    """
+    Snapshot of the state of a board, keyed by stable keys. Each entry is a
+    dict of the compared fields, plus the Trello object under 'obj' when
+    the model was loaded from a board. custom_fields is the set of the
+    names of the custom fields defined on the board, None when unknown.
+    """
+
+    def __init__(self, board=None):
+        self.board = board
+        self.lists = OrderedDict()
+        self.labels = OrderedDict()
+        self.cards = OrderedDict()
+        self.custom_fields = None
+
+    @classmethod
+    def from_board(cls, board, card_filter='open'):
+        """
+        Load a board with four requests: lists, labels, custom field
+        definitions and cards along with their checklists and custom fields.
+
+        :card_filter: cards to compare, 'open' or 'all'
+        """
+        model = cls(board)
+        lists_by_id = {}
+        for list_ in board.get_lists('open'):
+            key = _unique_key(model.lists, list_.name)
+            model.lists[key] = {'name': list_.name, 'pos': list_.pos, 'obj': list_}
+            lists_by_id[list_.id] = key
+
+        labels_by_id = {}
+        for label in board.get_labels(limit=1000):
+            key = _label_key(label.name, label.color)
+            model.labels[key] = {'name': label.name, 'color': label.color, 'obj': label}
+            labels_by_id[label.id] = key
+
+        definitions = dict((definition.id, definition.name)
+                           for definition in board.get_custom_field_definitions())
+        model.custom_fields = set(definitions.values())
+
+        filters = {'filter': card_filter, 'fields': 'all', 'customFieldItems': 'true'}
+        for card in board.get_cards(filters, prefetch=['checklists']):
+            if card.idList not in lists_by_id:
+                continue
+            key = _unique_key(model.cards, card.name)
+            checklists = OrderedDict()
+            for checklist in card.checklists:
+                checklists[_unique_key(checklists, checklist.name)] = {
+                    'items': [(item['name'], bool(item.get('checked') or item.get('state') == 'complete'))
+                              for item in checklist.items],
+                    'obj': checklist,
+                }
+            model.cards[key] = {
+                'name': card.name,
+                'desc': card.desc,
+                'list': lists_by_id[card.idList],
+                'pos': card.pos,
+                'closed': card.closed,
+                'due': card.due or None,
+                'dueComplete': card.is_due_complete,
+                'labels': frozenset(labels_by_id[i] for i in card.idLabels if i in labels_by_id),
+                'custom_fields': dict((definitions[cf.definition_id], cf.value)
+                                      for cf in card.customFields
+                                      if cf.definition_id in definitions),
+                'checklists': checklists,
+                'obj': card,
+            }
+        return model
+
+
+CARD_FIELDS = ('desc', 'list', 'closed', 'due', 'dueComplete', 'labels')
+
+
+def _changes(source, target, fields):
+    return dict((field, source[field]) for field in fields
+                if target is None or source[field] != target[field])
+
+
+def _in_order(entries):
+    """Keys of the entries, by position"""
+    return [key for key, entry in sorted(entries.items(), key=lambda item: item[1]['pos'])]
+
+
+def _new_positions(order, target_positions):
+    """
+    Positions of the objects to move so the target is in the given order.
+
+    :order: keys in the order of the source
+    :target_positions: position of the keys already in place in the target
+    :return: dict {key: new position} of the objects to move or create
+    """
+    objects = [{'id': key, 'pos': target_positions.get(key)} for key in order]
+    return dict((obj['id'], pos) for obj, pos in plan_order(objects, order).moves)
+
+
+def diff(source, target, archive=True, delete=False):
+    """
+    Operations making the target board look like the source board.
+
+    :source: BoardModel of the reference board
+    :target: BoardModel of the board to update
+    :archive: archive the lists and cards of the target that are not in the
+        source
+    :delete: delete the labels and checklists of the target that are not in
+        the source. Deleting a label removes it from every card, so it is
+        not done by default.
+
+    The values of the custom fields not defined on the target board are
+    not compared.
+
+    :rtype: MutationPlan
+    """
+    operations = []
+
+    list_positions = _new_positions(_in_order(source.lists), dict(
+        (key, target_list['pos']) for key, target_list in target.lists.items() if key in source.lists))
+    for key, source_list in source.lists.items():
+        if key not in target.lists:
+            operations.append(Operation('create', 'list', key,
+                                        {'name': source_list['name'], 'pos': list_positions[key]}))
+        elif key in list_positions:
+            operations.append(Operation('update', 'list', key, {'pos': list_positions[key]}))
+
+    for key, source_label in source.labels.items():
+        target_label = target.labels.get(key)
+        if target_label is None:
+            operations.append(Operation('create', 'label', key,
+                                        {'name': source_label['name'], 'color': source_label['color']}))
+        elif target_label['color'] != source_label['color']:
+            operations.append(Operation('update', 'label', key, {'color': source_label['color']}))
+
+    card_positions = {}
+    for list_key in source.lists:
+        cards = dict((key, card) for key, card in source.cards.items() if card['list'] == list_key)
+        # Cards moved from another list are placed like new ones
+        card_positions.update(_new_positions(_in_order(cards), dict(
+            (key, target.cards[key]['pos']) for key in cards
+            if key in target.cards and target.cards[key]['list'] == list_key)))
+
+    for key, source_card in source.cards.items():
+        target_card = target.cards.get(key)
+        changes = _changes(source_card, target_card, CARD_FIELDS)
+        if key in card_positions:
+            changes['pos'] = card_positions[key]
+        if target_card is None:
+            operations.append(Operation('create', 'card', key, dict(changes, name=source_card['name'])))
+        elif changes:
+            action = 'move' if 'list' in changes else 'update'
+            operations.append(Operation(action, 'card', key, changes))
+
+        target_checklists = target_card['checklists'] if target_card else {}
+        for name, source_checklist in source_card['checklists'].items():
+            target_checklist = target_checklists.get(name)
+            if target_checklist is None:
+                operations.append(Operation('create', 'checklist', (key, name),
+                                            {'items': source_checklist['items']}))
+            elif dict(target_checklist['items']) != dict(source_checklist['items']):
+                operations.append(Operation('update', 'checklist', (key, name),
+                                            {'items': source_checklist['items']}))
+        if delete:
+            for name in target_checklists:
+                if name not in source_card['checklists']:
+                    operations.append(Operation('delete', 'checklist', (key, name), {}))
+
+        target_fields = target_card['custom_fields'] if target_card else {}
+        for name, value in source_card['custom_fields'].items():
+            if target.custom_fields is not None and name not in target.custom_fields:
+                # The field is not defined on the target board
+                continue
+            if target_fields.get(name) != value:
+                operations.append(Operation('update', 'custom_field', (key, name), {'value': value}))
+
+    if archive:
+        for key in target.lists:
+            if key not in source.lists:
+                operations.append(Operation('archive', 'list', key, {}))
+        for key, target_card in target.cards.items():
+            if key not in source.cards and not target_card['closed']:
+                operations.append(Operation('archive', 'card', key, {}))
+    if delete:
+        for key in target.labels:
+            if key not in source.labels:
+                operations.append(Operation('delete', 'label', key, {}))
+
+    return MutationPlan(source, target, operations)
+
+
+class MutationPlan(object):
+    """
+    Operations to apply to a target board, as returned by diff(). They are
+    applied in stages (lists and labels, then cards, then checklists and
+    custom field values), the operations of a stage in parallel.
+    """
+
+    STAGES = (('list', 'label'), ('card',), ('checklist', 'custom_field'))
+
+    def __init__(self, source, target, operations):
+        self.source = source
+        self.target = target
+        self.operations = operations
+
+    def __len__(self):
+        return len(self.operations)
+
+    def __iter__(self):
+        return iter(self.operations)
+
+    def __repr__(self):
+        return '<MutationPlan %d operations>' % len(self.operations)
+
+    def apply(self, max_workers=8):
+        """
+        Perform the operations on the target board.
+
+        :max_workers: number of operations performed in parallel
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for kinds in self.STAGES:
+                operations = [op for op in self.operations if op.kind in kinds]
+                for _ in executor.map(self._apply, operations):
+                    pass
+
+    def _apply(self, op):
+        getattr(self, '_%s_%s' % (op.action if op.action != 'move' else 'update', op.kind))(op)
+
+    def _create_list(self, op):
+        list_ = self.target.board.add_list(op.changes['name'], pos=op.changes['pos'])
+        self.target.lists[op.key] = dict(op.changes, obj=list_)
+
+    def _update_list(self, op):
+        self.target.lists[op.key]['obj'].move(op.changes['pos'])
+
+    def _archive_list(self, op):
+        self.target.lists[op.key]['obj'].close()
+
+    def _create_label(self, op):
+        label = self.target.board.add_label(op.changes['name'], op.changes['color'])
+        self.target.labels[op.key] = dict(op.changes, obj=label)
+
+    def _update_label(self, op):
+        self.target.labels[op.key]['obj'].set_color(op.changes['color'])
+
+    def _delete_label(self, op):
+        self.target.board.delete_label(self.target.labels[op.key]['obj'].id)
+
+    def _card_fields(self, changes):
+        """Card fields by their Trello name, with the keys resolved to ids"""
+        fields = {}
+        for field, value in changes.items():
+            if field == 'list':
+                fields['idList'] = self.target.lists[value]['obj'].id
+            elif field == 'labels':
+                fields['idLabels'] = [self.target.labels[key]['obj'].id for key in sorted(value)]
+            elif field != 'name':
+                fields[field] = value
+        return fields
+
+    def _create_card(self, op):
+        list_ = self.target.lists[op.changes['list']]['obj']
+        fields = self._card_fields(op.changes)
+        labels = [self.target.labels[key]['obj'] for key in sorted(op.changes['labels'])]
+        card = list_.add_card(op.changes['name'], desc=fields['desc'], labels=labels,
+                              due=fields['due'] or 'null', position=fields['pos'])
+        if fields['closed'] or fields['dueComplete']:
+            card.update(closed=fields['closed'], dueComplete=fields['dueComplete'])
+        self.target.cards[op.key] = dict(op.changes, checklists={}, custom_fields={}, obj=card)
+
+    def _update_card(self, op):
+        self.target.cards[op.key]['obj'].update(**self._card_fields(op.changes))
+
+    def _archive_card(self, op):
+        self.target.cards[op.key]['obj'].set_closed(True)
+
+    def _create_checklist(self, op):
+        card_key, name = op.key
+        card = self.target.cards[card_key]['obj']
+        json_obj = card.client.fetch_json(
+            '/cards/' + card.id + '/checklists',
+            http_method='POST',
+            post_args={'name': name})
+        checklist = Checklist(card.client, [], json_obj, trello_card=card.id)
+        for item_name, checked in op.changes['items']:
+            checklist.add_checklist_item(item_name, checked)
+
+    def _update_checklist(self, op):
+        card_key, name = op.key
+        checklist = self.target.cards[card_key]['checklists'][name]['obj']
+        wanted = OrderedDict(op.changes['items'])
+        for item in list(checklist.items):
+            if item['name'] not in wanted:
+                checklist.delete_checklist_item(item['name'])
+        existing = dict((item['name'], bool(item.get('checked') or item.get('state') == 'complete'))
+                        for item in checklist.items)
+        for item_name, checked in wanted.items():
+            if item_name not in existing:
+                checklist.add_checklist_item(item_name, checked)
+            elif existing[item_name] != checked:
+                checklist.set_checklist_item(item_name, checked)
+
+    def _delete_checklist(self, op):
+        card_key, name = op.key
+        self.target.cards[card_key]['checklists'][name]['obj'].delete()
+
+    def _update_custom_field(self, op):
+        card_key, name = op.key
+        card = self.target.cards[card_key]['obj']
+        try:
+            custom_field = card.get_custom_field_by_name(name)
+        except ValueError:
+            # The field is not defined on the target board
+            return
+        custom_field.value = op.changes['value']
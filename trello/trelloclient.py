@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import with_statement, print_function, absolute_import
+import functools
 import json
-import requests
-from requests_oauthlib import OAuth1
+try:
+    from urllib.parse import urlparse
+except ImportError:  # Python 2
+    from urlparse import urlparse
 from trello.board import Board
 from trello.card import Card
 from trello.trellolist import List
@@ -12,23 +15,37 @@ from trello.webhook import WebHook
 from trello.exceptions import *
 from trello.label import Label
 from trello.star import Star
+from trello.metrics import RequestMetrics, RequestRecord, RequestTracker, timer
+from trello.ratelimit import call_with_retries
+from trello.singleflight import SingleFlight
 
-try:
-    # PyOpenSSL works around some issues in python ssl modules
-    # In particular in python < 2.7.9 and python < 3.2
-    # It is not a hard requirement, so it's not listed in requirements.txt
-    # More info https://urllib3.readthedocs.org/en/latest/security.html#insecureplatformwarning
-    import urllib3.contrib.pyopenssl
 
-    urllib3.contrib.pyopenssl.inject_into_urllib3()
-except:
-    pass
+def inject_pyopenssl():
+    """
+    Make urllib3 (and so requests) use PyOpenSSL instead of the ssl module.
+
+    PyOpenSSL works around some issues in python ssl modules, in particular
+    in python < 2.7.9 and python < 3.2. It is not a hard requirement, so
+    it's not listed in requirements.txt, and it is no longer injected when
+    trello is imported: call this function once, before making requests.
+    More info https://urllib3.readthedocs.org/en/latest/security.html#insecureplatformwarning
+
+    :return: True if PyOpenSSL is used, False if it is not installed
+    """
+    try:
+        import urllib3.contrib.pyopenssl
+
+        urllib3.contrib.pyopenssl.inject_into_urllib3()
+    except ImportError:
+        return False
+    return True
 
 
 class TrelloClient(object):
     """ Base class for Trello API access """
 
-    def __init__(self, api_key, api_secret=None, token=None, token_secret=None, http_service=requests):
+    def __init__(self, api_key, api_secret=None, token=None, token_secret=None, http_service=None,
+                 rate_limiter=None, coalesce_requests=False):
         """
         Constructor
 
@@ -37,10 +54,29 @@ class TrelloClient(object):
         :token: OAuth token generated by the user in
                     trello.util.create_oauth_token
         :token_secret: the OAuth client secret for the given OAuth token
+        :http_service: object making the HTTP requests, the requests
+                    module by default
+        :rate_limiter: optional trello.ratelimit.RateLimiter every request
+                    waits for
+        :coalesce_requests: when a GET identical to one in progress in
+                    another thread is made, wait for the result of the
+                    first one instead of sending it again. The number of
+                    such requests is counted in coalesced_requests. Off
+                    by default: the coalesced callers get the same
+                    response (each parses its own json objects), and
+                    their requests are not seen by the hooks.
+
+        Each request made by fetch_json is described by a
+        trello.metrics.RequestRecord, passed to the functions of
+        request_hooks before it is sent and of response_hooks once it
+        completed (or failed). Requests are also counted in metrics.
         """
 
         # client key and secret for oauth1 session
+        # requests and requests_oauthlib are slow to import, they are only
+        # imported once a client is created
         if token or token_secret:
+            from requests_oauthlib import OAuth1
             self.oauth = OAuth1(client_key=api_key, client_secret=api_secret,
                                 resource_owner_key=token, resource_owner_secret=token_secret)
         else:
@@ -51,7 +87,15 @@ class TrelloClient(object):
         self.api_secret = api_secret
         self.resource_owner_key = token
         self.resource_owner_secret = token_secret
+        if http_service is None:
+            import requests as http_service
         self.http_service = http_service
+        self.rate_limiter = rate_limiter
+        self.request_hooks = []
+        self.response_hooks = []
+        self.metrics = RequestMetrics()
+        self.coalesce_requests = coalesce_requests
+        self._single_flight = SingleFlight()
 
     def info_for_all_boards(self, actions):
         """
@@ -70,10 +114,12 @@ class TrelloClient(object):
         # TODO: This function.
         raise NotImplementedError()
 
-    def list_boards(self, board_filter="all"):
+    def list_boards(self, board_filter="all", fields=None):
         """
         Returns all boards for your Trello user
 
+        :fields: comma separated board fields to load, eg. 'name,closed'
+            (Trello's default fields by default)
         :return: a list of Python objects representing the Trello boards.
         :rtype: list of Board
 
@@ -85,7 +131,10 @@ class TrelloClient(object):
             - closed: Boolean representing whether this board is closed or not
             - url: URL to the board
         """
-        json_obj = self.fetch_json('/members/me/boards/?filter=%s' % board_filter)
+        query_params = {'filter': board_filter}
+        if fields:
+            query_params['fields'] = fields
+        json_obj = self.fetch_json('/members/me/boards', query_params=query_params)
         return [Board.from_json(self, json_obj=obj) for obj in json_obj]
 
     def list_organizations(self):
@@ -187,8 +236,13 @@ class TrelloClient(object):
             headers=None,
             query_params=None,
             post_args=None,
-            files=None):
-        """ Fetch some JSON from Trello """
+            files=None,
+            data=None):
+        """ Fetch some JSON from Trello
+
+        :data: raw body of the request, sent instead of post_args, eg. a
+            trello.upload.MultipartFile. Its Content-Type is given in headers.
+        """
 
         # explicit values here to avoid mutable default values
         if headers is None:
@@ -198,14 +252,13 @@ class TrelloClient(object):
         if post_args is None:
             post_args = {}
 
-        # if files specified, we don't want any data
-        data = None
-        if files is None:
+        # if files or a raw body are specified, post_args are not sent
+        if data is None and files is None:
             data = json.dumps(post_args)
 
-        # set content type and accept headers to handle JSON
-        if http_method in ("POST", "PUT", "DELETE") and not files:
-            headers['Content-Type'] = 'application/json; charset=utf-8'
+            # set content type and accept headers to handle JSON
+            if http_method in ("POST", "PUT", "DELETE"):
+                headers['Content-Type'] = 'application/json; charset=utf-8'
 
         headers['Accept'] = 'application/json'
 
@@ -218,18 +271,156 @@ class TrelloClient(object):
             query_params['key'] = self.api_key
             query_params['token'] = self.api_secret
 
-        # perform the HTTP requests, if possible uses OAuth authentication
-        response = self.http_service.request(http_method, url, params=query_params,
-                                             headers=headers, data=data,
-                                             auth=self.oauth, files=files)
+        send = lambda: self._send(http_method, uri_path, url, headers, query_params, post_args, data, files)
+        if self.coalesce_requests and http_method == 'GET':
+            # Identical GETs in progress in other threads share one request
+            key = (url, tuple(sorted((name, str(value)) for name, value in query_params.items())))
+            response = self._single_flight.do(key, send)
+        else:
+            response = send()
 
         if response.status_code == 401:
             raise Unauthorized("%s at %s" % (response.text, url), response)
+        if response.status_code == 429:
+            raise RateLimitExceeded("%s at %s" % (response.text, url), response)
         if response.status_code != 200:
             raise ResourceUnavailable("%s at %s" % (response.text, url), response)
 
         return response.json()
 
+    @property
+    def coalesced_requests(self):
+        """Number of GETs that were answered by an identical request in progress"""
+        return self._single_flight.coalesced
+
+    def fetch_json_async(self, uri_path, loop=None, **kwargs):
+        """
+        fetch_json for asyncio code: the request is made in the default
+        executor of the event loop. With coalesce_requests, it is coalesced
+        with identical requests in progress like the ones made by threads.
+
+            cards = await client.fetch_json_async('/boards/<id>/cards')
+
+        :loop: the event loop, the running one by default
+        :rtype: asyncio.Future
+        """
+        import asyncio
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except AttributeError:
+                # Python < 3.7
+                loop = asyncio.get_event_loop()
+        return loop.run_in_executor(None, functools.partial(self.fetch_json, uri_path, **kwargs))
+
+    def _send(self, http_method, uri_path, url, headers, query_params, post_args, data, files,
+              stream=False):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        record = RequestRecord(http_method, '/' + uri_path, query_params, post_args)
+        for hook in self.request_hooks:
+            hook(record)
+
+        # perform the HTTP requests, if possible uses OAuth authentication
+        kwargs = {'stream': True} if stream else {}
+        started = timer()
+        try:
+            response = self.http_service.request(http_method, url, params=query_params,
+                                                 headers=headers, data=data,
+                                                 auth=self.oauth, files=files, **kwargs)
+        except Exception as e:
+            record.error = e
+            raise
+        else:
+            record.response = response
+            if stream:
+                # The body is not read yet, it is left to the caller
+                record.size = int(response.headers.get('Content-Length') or 0)
+            else:
+                record.size = len(getattr(response, 'content', None) or b'')
+        finally:
+            record.elapsed = timer() - started
+            self._request_done(record)
+        return response
+
+    def open_download(self, url, offset=0):
+        """
+        Start downloading a file stored by Trello, such as the url of an
+        uploaded attachment, without reading the body: the caller reads it
+        in chunks with iter_content and closes the response.
+
+        :url: full url of the file
+        :offset: first byte to download, to resume a partial download
+        :return: the response, its status is 206 when the download starts
+            at offset and 200 when it starts from the beginning
+        """
+        headers = {}
+        if offset:
+            headers['Range'] = 'bytes=%d-' % offset
+        if self.oauth is None:
+            headers['Authorization'] = 'OAuth oauth_consumer_key="%s", oauth_token="%s"' % (
+                self.api_key, self.api_secret)
+
+        response = self._send('GET', urlparse(url).path.lstrip('/'), url, headers, {}, {}, None, None,
+                              stream=True)
+        if response.status_code in (200, 206):
+            return response
+        response.close()
+        if response.status_code == 401:
+            raise Unauthorized("%s at %s" % (response.text, url), response)
+        if response.status_code == 429:
+            raise RateLimitExceeded("%s at %s" % (response.text, url), response)
+        raise ResourceUnavailable("%s at %s" % (response.text, url), response)
+
+    def _request_done(self, record):
+        self.metrics.record(record)
+        for hook in list(self.response_hooks):
+            hook(record)
+
+    def track_requests(self):
+        """
+        Context manager counting the requests made during a block of code,
+        see trello.metrics.RequestTracker.
+
+        :rtype: RequestTracker
+        """
+        return RequestTracker(self)
+
+    def fetch_json_pages(self, uri_path, query_params=None, page_size=1000, max_retries=0):
+        """
+        Iterate over the pages of a listing paged with the ``before``
+        parameter, such as actions or notifications, newest first. Each page
+        is only requested when the previous one has been consumed.
+
+        :uri_path: path of the listing, eg. '/boards/<id>/actions'
+        :query_params: extra query parameters, eg. {'filter': 'commentCard'}.
+            A 'before' value is used as the starting cursor.
+        :page_size: number of objects per request (Trello allows up to 1000)
+        :max_retries: number of retries of a page rejected by the rate limit,
+            see trello.ratelimit.call_with_retries
+        :rtype: iterator of lists of json objects
+        """
+        query_params = dict(query_params or {})
+        query_params['limit'] = page_size
+        while True:
+            page = call_with_retries(self, lambda: self.fetch_json(uri_path, query_params=dict(query_params)),
+                                     max_retries=max_retries)
+            if page:
+                yield page
+            if len(page) < page_size:
+                break
+            query_params['before'] = page[-1]['id']
+
+    def fetch_json_paged(self, uri_path, query_params=None, page_size=1000, max_retries=0):
+        """
+        Iterate over all the objects of a listing paged with the ``before``
+        parameter, see fetch_json_pages.
+        """
+        for page in self.fetch_json_pages(uri_path, query_params, page_size, max_retries):
+            for obj in page:
+                yield obj
+
     def list_hooks(self, token=None):
         """
         Returns a list of all hooks associated with a specific token. If you don't pass in a token,
@@ -34,9 +34,9 @@ class List(TrelloBase):
         :board: the board object that the list belongs to
         :json_obj: the json list object
         """
-        list = List(board, json_obj['id'], name=json_obj['name'])
-        list.closed = json_obj['closed']
-        list.pos = json_obj['pos']
+        list = List(board, json_obj['id'], name=json_obj.get('name', ''))
+        list.closed = json_obj.get('closed')
+        list.pos = json_obj.get('pos')
 	#this method is also called from board.py with a different json object, so we need to make sure 'subscribed' is there
         if 'subscribed' in json_obj:
             list.subscribed = json_obj['subscribed']
@@ -53,17 +53,32 @@ class List(TrelloBase):
         self.pos = json_obj['pos']
         self.subscribed = json_obj['subscribed']
 		
-    def list_cards(self, card_filter="open", actions=None, query={}):
-        """Lists all cards in this list"""
-        query_params = query
+    def list_cards(self, card_filter="open", actions=None, query={}, prefetch=None, fields=None):
+        """Lists all cards in this list
+
+        :prefetch: card resources to load for all the cards at once, see
+            Board.get_cards
+        :fields: comma separated card fields to load, eg. 'name,pos'
+            (Trello's default fields by default)
+        """
+        query_params = dict(query)
+        if fields:
+            query_params['fields'] = fields
         if card_filter:
             query_params['filter'] = card_filter
         if actions:
             query_params['actions'] = actions
         query_params['customFieldItems'] = 'true'
+        query_params.update(Card.prefetch_query_params(prefetch))
         json_obj = self.client.fetch_json('/lists/' + self.id + '/cards',
                                           query_params=query_params)
-        return [Card.from_json(self, c) for c in json_obj]
+        cards = [Card.from_json(self, c) for c in json_obj]
+        if prefetch and 'comments' in prefetch:
+            comments = self.client.fetch_json_paged(
+                '/lists/' + self.id + '/actions',
+                query_params={'filter': 'commentCard'})
+            Card.set_prefetched_comments(cards, comments)
+        return cards
 
     def add_card(self, name, desc=None, labels=None, due="null", source=None, position=None, assign=None):
         """Add a card to this list
@@ -178,8 +193,17 @@ class List(TrelloBase):
             post_args={'value': 'false', }, )
         self.subscribed = False		
 	
+    def card_ids(self, card_filter="open"):
+        """Ids of the cards in this list, listed without any other field
+
+        :rtype: list of str
+        """
+        json_obj = self.client.fetch_json('/lists/' + self.id + '/cards',
+                                          query_params={'filter': card_filter, 'fields': 'id'})
+        return [card['id'] for card in json_obj]
+
     def cardsCnt(self):
-        return len(self.list_cards())
+        return len(self.card_ids())
 
     # Change the name of the list
     def set_name(self, name):
@@ -193,4 +217,27 @@ class List(TrelloBase):
     def set_pos(self, position):
         self.move(position)
 
+    def reorder_cards(self, order, cards=None, max_workers=8):
+        """
+        Put the cards of this list in a new order, moving as few of them as
+        possible, in parallel (see trello.positions).
+
+        :order: the Cards of this list or their ids, in the new order
+        :cards: the Cards of this list with their current positions. By
+            default the Cards of order, or if it holds ids, the ids and
+            positions of the open cards fetched with one request.
+        :max_workers: number of cards moved in parallel
+        :rtype: trello.positions.PositionPlan
+        """
+        from trello.positions import plan_order
+        if cards is None:
+            if any(isinstance(card, (str, type(u''))) for card in order):
+                cards = self.client.fetch_json('/lists/' + self.id + '/cards',
+                                               query_params={'fields': 'pos'})
+            else:
+                cards = order
+        plan = plan_order(cards, order)
+        plan.apply(self.client, 'cards', max_workers=max_workers)
+        return plan
+
 from trello.card import Card
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, print_function, absolute_import
+
+import mimetypes
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from trello.exceptions import ResourceUnavailable
+from trello.ratelimit import call_with_retries
+
+
+class MultipartFile(object):
+    """
+    multipart/form-data body holding one file, read in chunks from its
+    source as it is sent instead of being built in memory. It can be
+    passed as the data of a request: requests then sends it with a
+    Content-Length, read by blocks.
+
+    :source: path of the file, or a seekable binary file object, such as
+        an open file or an mmap
+    """
+
+    def __init__(self, source, name=None, mime_type=None, fields=None, field_name='file',
+                 chunk_size=64 * 1024, progress=None):
+        """
+        :source: path of the file or seekable binary file object
+        :name: file name sent, the base name of the source by default
+        :mime_type: mime type of the file, guessed from the name by default
+        :fields: dict of other form fields
+        :field_name: name of the form field of the file
+        :chunk_size: largest number of bytes read from the source at a time
+        :progress: function called with (bytes sent, total bytes) as the
+            file is read. When the body is reset to be sent again, the
+            bytes sent restart from 0.
+        """
+        if isinstance(source, (str, type(u''))):
+            self._file = open(source, 'rb')
+            self._owned = True
+            name = name or os.path.basename(source)
+        else:
+            self._file = source
+            self._owned = False
+            name = name or os.path.basename(getattr(source, 'name', '') or '') or 'file'
+        try:
+            self._setup(name, mime_type, fields, field_name, chunk_size, progress)
+        except Exception:
+            self.close()
+            raise
+
+    def _setup(self, name, mime_type, fields, field_name, chunk_size, progress):
+        self.name = name
+        self.mime_type = mime_type or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.boundary = uuid.uuid4().hex
+        self.content_type = 'multipart/form-data; boundary=' + self.boundary
+
+        self._start = self._file.tell() if hasattr(self._file, 'tell') else 0
+        self._file.seek(0, os.SEEK_END)
+        self.size = self._file.tell() - self._start
+
+        parts = []
+        for field, value in sorted((fields or {}).items()):
+            if value is not None:
+                parts.append(self._part_header(field) + _encode(value) + b'\r\n')
+        parts.append(self._part_header(field_name, self.name, self.mime_type))
+        self._head = b''.join(parts)
+        self._tail = b'\r\n--' + self.boundary.encode('ascii') + b'--\r\n'
+        self.reset()
+
+    def _part_header(self, field, file_name=None, mime_type=None):
+        disposition = 'form-data; name="%s"' % field
+        if file_name is not None:
+            disposition += '; filename="%s"' % file_name.replace('"', '%22')
+        header = '--%s\r\nContent-Disposition: %s\r\n' % (self.boundary, disposition)
+        if mime_type is not None:
+            header += 'Content-Type: %s\r\n' % mime_type
+        return _encode(header + '\r\n')
+
+    def __len__(self):
+        return len(self._head) + self.size + len(self._tail)
+
+    def reset(self):
+        """Rewind the body, to send it again"""
+        self._file.seek(self._start)
+        self._position = 0
+        self._sent = 0
+
+    def read(self, size=-1):
+        """Next bytes of the body, at most size (or chunk_size) bytes"""
+        if size is None or size < 0 or size > self.chunk_size:
+            size = self.chunk_size
+        head, body_end = len(self._head), len(self._head) + self.size
+        if self._position < head:
+            data = self._head[self._position:self._position + size]
+        elif self._position < body_end:
+            data = self._file.read(min(size, body_end - self._position))
+            if not data:
+                raise IOError('%s: the file is shorter than when the upload started' % self.name)
+            self._sent += len(data)
+            if self.progress is not None:
+                self.progress(self._sent, self.size)
+        else:
+            offset = self._position - body_end
+            data = self._tail[offset:offset + size]
+        self._position += len(data)
+        return data
+
+    def __iter__(self):
+        while True:
+            data = self.read()
+            if not data:
+                return
+            yield data
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _encode(value):
+    return value if isinstance(value, bytes) else (u'%s' % value).encode('utf-8')
+
+
+def upload_attachment(client, card_id, source, name=None, mime_type=None, chunk_size=64 * 1024,
+                      progress=None, max_retries=5):
+    """
+    Attach a file to a card, streaming it from its source.
+
+    :source: path of the file, or a seekable binary file object (an open
+        file, an mmap...)
+    :name: name of the attachment, the base name of the file by default
+    :mime_type: mime type of the attachment
+    :progress: function called with (bytes sent, total bytes). An upload
+        rejected by the rate limit is sent again from the start, so after
+        a retry the bytes sent go back to 0.
+    :max_retries: number of retries of an upload rejected by the rate limit
+    :return: the attachment json object
+    """
+    with MultipartFile(source, name, mime_type, fields={'name': name, 'mimeType': mime_type},
+                       chunk_size=chunk_size, progress=progress) as body:
+        def send():
+            body.reset()
+            return client.fetch_json('/cards/' + card_id + '/attachments', http_method='POST',
+                                     headers={'Content-Type': body.content_type}, data=body)
+        return call_with_retries(client, send, max_retries=max_retries)
+
+
+class UploadResult(object):
+    """
+    Outcome of the upload of a file.
+
+    :card_id: id of the card
+    :source: the path or file object uploaded
+    :attachment: the attachment json object, None if the upload failed
+    :error: the exception of a failed upload
+    """
+
+    def __init__(self, card_id, source, attachment=None, error=None):
+        self.card_id = card_id
+        self.source = source
+        self.attachment = attachment
+        self.error = error
+
+    def __repr__(self):
+        return '<UploadResult %s %s>' % (self.card_id, 'failed' if self.error else 'uploaded')
+
+
+class AttachmentUploader(object):
+    """
+    Upload files to cards, several at a time, each streamed from disk.
+
+        uploader = AttachmentUploader(client, progress=report)
+        uploader.upload([(card, 'build/app.tar.gz'), (other_card, 'build/app.zip')])
+    """
+
+    def __init__(self, client, max_workers=4, chunk_size=64 * 1024, max_retries=5, progress=None):
+        """
+        :client: the TrelloClient
+        :max_workers: number of files uploaded in parallel
+        :chunk_size: largest number of bytes read from a file at a time
+        :max_retries: number of retries of an upload rejected by the rate limit
+        :progress: function called with (source, bytes sent, total bytes)
+            as the files are read, from the uploading threads. The bytes
+            sent go back to 0 when an upload is retried.
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.progress = progress
+        self._lock = threading.Lock()
+
+    def upload(self, uploads):
+        """
+        Upload files in parallel.
+
+        :uploads: (card or card id, source) or (card or card id, source,
+            name, mime type) tuples, the source being a path or a seekable
+            binary file object
+        :rtype: list of UploadResult, in the order of the uploads
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda upload: self.upload_one(*upload), uploads))
+
+    def upload_one(self, card, source, name=None, mime_type=None):
+        """
+        :card: Card or card id
+        :rtype: UploadResult
+        """
+        card_id = getattr(card, 'id', card)
+        progress = None
+        if self.progress is not None:
+            def progress(sent, total):
+                with self._lock:
+                    self.progress(source, sent, total)
+        try:
+            attachment = upload_attachment(self.client, card_id, source, name, mime_type,
+                                           chunk_size=self.chunk_size, progress=progress,
+                                           max_retries=self.max_retries)
+        except (ResourceUnavailable, IOError) as e:
+            return UploadResult(card_id, source, error=e)
+        return UploadResult(card_id, source, attachment)
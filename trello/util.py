@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 from __future__ import with_statement, print_function, absolute_import
 import os
-from requests_oauthlib import OAuth1Session
 
 
 def create_oauth_token(expiration=None, scope=None, key=None, secret=None, name=None, output=True):
@@ -15,6 +14,8 @@ def create_oauth_token(expiration=None, scope=None, key=None, secret=None, name=
     More info on token scope here:
         https://trello.com/docs/gettingstarted/#getting-a-token-from-a-user
     """
+    from requests_oauthlib import OAuth1Session
+
     request_token_url = 'https://trello.com/1/OAuthGetRequestToken'
     authorize_url = 'https://trello.com/1/OAuthAuthorizeToken'
     access_token_url = 'https://trello.com/1/OAuthGetAccessToken'